@@ -0,0 +1,67 @@
+import argparse
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+SAMPLE_BLOCKS = [
+    "## A section heading",
+    "```\nnum1 = 1\nnum2 = 2\nprint(num1 + num2)\n```",
+    "> a quote\n> that spans\n> three lines",
+    "* first item\n- second item\n* third item\n- fourth item",
+    "1. one\n2. two\n3. three\n4. four\n5. five",
+    "A paragraph with **bold**, *italic* and a [link](https://example.com) that runs on for a while "
+    "so the classifier has a realistic amount of text to look at.\nIt also wraps onto a second line.",
+]
+
+
+def load_textnode(revision: str = None):
+    if revision is None:
+        import textnode
+        return textnode
+    # load textnode.py as it was at another revision, next to the current htmlnode module
+    source = subprocess.run(
+        ["git", "show", f"{revision}:src/textnode.py"],
+        check=True, capture_output=True, text=True, cwd=SRC_DIR,
+    ).stdout
+    path = Path(tempfile.mkdtemp()) / "textnode_baseline.py"
+    path.write_text(source, encoding="utf-8")
+    spec = importlib.util.spec_from_file_location("textnode_baseline", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_per_block(module, repeat: int, number: int) -> float:
+    classify = module.block_to_block_type
+
+    def run():
+        for block in SAMPLE_BLOCKS:
+            classify(block)
+
+    best = min(timeit.repeat(run, repeat=repeat, number=number))
+    return best / (number * len(SAMPLE_BLOCKS)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-block cost of block_to_block_type")
+    parser.add_argument("--against", type=str, help="Git revision to compare against, e.g. HEAD~1")
+    parser.add_argument("--number", type=int, help="Classification rounds per timing", default=2000)
+    parser.add_argument("--repeat", type=int, help="Timings to take the best of", default=5)
+    args = parser.parse_args()
+
+    current = time_per_block(load_textnode(), args.repeat, args.number)
+    print(f"current: {current:9.0f} ns/block")
+    if args.against:
+        baseline = time_per_block(load_textnode(args.against), args.repeat, args.number)
+        print(f"{args.against}: {baseline:9.0f} ns/block")
+        print(f"speedup: {baseline / current:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
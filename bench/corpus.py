@@ -0,0 +1,131 @@
+import argparse
+import random
+from pathlib import Path
+
+TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8">
+    <title> {{ Title }} </title>
+    <link href="/index.css" rel="stylesheet">
+</head>
+<body>
+    <article>
+        {{ Content }}
+    </article>
+</body>
+</html>
+"""
+
+WORDS = (
+    "static site generator markdown block inline parser node tree render template page link image list "
+    "quote code heading paragraph content build cache output source directory index throughput latency"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def synthetic_page(
+    rng: random.Random,
+    title: str,
+    sections: int = 8,
+    list_items: int = 50,
+    links: int = 20,
+    code_lines: int = 80,
+) -> str:
+    blocks = [f"# {title}"]
+    for idx in range(sections):
+        blocks.append(f"## Section {idx} {sentence(rng, 3)}")
+        # link-dense paragraphs mix every inline type so the tokenizer can't take a shortcut
+        spans = []
+        for link in range(links):
+            spans.append(sentence(rng, rng.randint(3, 12)))
+            spans.append(rng.choice((
+                f"[{sentence(rng, 2)}](/pages/{rng.randrange(1000)}/)",
+                f"![{sentence(rng, 2)}](/img/{link}.png)",
+                f"**{sentence(rng, 2)}**",
+                f"*{sentence(rng, 2)}*",
+                f"`{rng.choice(WORDS)}()`",
+            )))
+        blocks.append(" ".join(spans) + ".")
+        blocks.append("\n".join(
+            f"* {sentence(rng, rng.randint(2, 8))} [more](/items/{item})" for item in range(list_items)
+        ))
+        blocks.append("\n".join(f"{item}. {sentence(rng, 5)}" for item in range(1, list_items // 5 + 2)))
+        blocks.append("\n".join(f"> {sentence(rng, 10)}" for _ in range(3)))
+        code = "\n".join(f"    {rng.choice(WORDS)} = {rng.choice(WORDS)}({item})" for item in range(code_lines))
+        blocks.append(f"```\ndef section_{idx}():\n{code}\n```")
+    return "\n\n".join(blocks)
+
+
+def synthetic_document(sections: int) -> str:
+    # a single large page with a fixed seed, so repeated runs measure the same input
+    return synthetic_page(random.Random(0), "Synthetic document", sections, list_items=20, links=5, code_lines=3)
+
+
+def page_path(idx: int, depth: int) -> Path:
+    # pages are spread over directories up to depth levels deep, with a few siblings per level
+    levels = idx % (depth + 1)
+    parts = [f"dir{(idx >> (2 * level)) % 4}" for level in range(levels)]
+    return Path(*parts, f"page-{idx}", "index.md")
+
+
+def generate_site(
+    root: Path,
+    pages: int = 200,
+    depth: int = 3,
+    seed: int = 0,
+    **page_options,
+) -> list[Path]:
+    rng = random.Random(seed)
+    content = root / "content"
+    content.mkdir(parents=True, exist_ok=True)
+    (root / "template.html").write_text(TEMPLATE, encoding="utf-8")
+    (content / "index.css").write_text("body { font-family: sans-serif; }\n" * 64, encoding="utf-8")
+
+    paths = []
+    for idx in range(pages):
+        path = content / page_path(idx, depth)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(synthetic_page(rng, f"Page {idx}", **page_options), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def add_corpus_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--pages", type=int, help="Number of pages in the synthetic site", default=200)
+    parser.add_argument("--depth", type=int, help="Deepest directory nesting of pages", default=3)
+    parser.add_argument("--sections", type=int, help="Sections per page", default=8)
+    parser.add_argument("--list-items", type=int, help="Items in each unordered list", default=50)
+    parser.add_argument("--links", type=int, help="Inline links and spans per paragraph", default=20)
+    parser.add_argument("--code-lines", type=int, help="Lines in each code block", default=80)
+    parser.add_argument("--seed", type=int, help="Random seed, the same seed always gives the same site", default=0)
+
+
+def corpus_options(args: argparse.Namespace) -> dict:
+    return {
+        'pages': args.pages,
+        'depth': args.depth,
+        'seed': args.seed,
+        'sections': args.sections,
+        'list_items': args.list_items,
+        'links': args.links,
+        'code_lines': args.code_lines,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic site for benchmarking")
+    parser.add_argument("root", type=Path, help="Directory that receives content/ and template.html")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    paths = generate_site(args.root, **corpus_options(args))
+    size = sum(path.stat().st_size for path in paths)
+    print(f"Wrote {len(paths)} pages ({size / 2**20:.2f} MiB of markdown) to {args.root / 'content'}")
+
+
+if __name__ == "__main__":
+    main()
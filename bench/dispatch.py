@@ -0,0 +1,68 @@
+import argparse
+import timeit
+
+from block_type import SAMPLE_BLOCKS, load_textnode
+
+
+def sample_nodes(module) -> list:
+    TextType, TextNode = module.TextType, module.TextNode
+    return [
+        TextNode("plain text", TextType.TEXT),
+        TextNode("bold", TextType.BOLD),
+        TextNode("italic", TextType.ITALIC),
+        TextNode("code", TextType.CODE),
+        TextNode("link", TextType.LINK, "https://example.com"),
+        TextNode("alt", TextType.IMAGE, "/img.png"),
+    ]
+
+
+def best_per_call(run, calls: int, repeat: int, number: int) -> float:
+    return min(timeit.repeat(run, repeat=repeat, number=number)) / (number * calls) * 1e9
+
+
+def measure(module, repeat: int, number: int) -> dict[str, float]:
+    nodes = sample_nodes(module)
+    convert = module.text_node_to_html_node
+    TextType, TextNode = module.TextType, module.TextNode
+    blocks = [(block, module.block_to_block_type(block)) for block in SAMPLE_BLOCKS]
+    route = module.markdown_router
+
+    def convert_nodes():
+        for node in nodes:
+            convert(node)
+
+    def create_nodes():
+        for node in nodes:
+            TextNode(node.text, node.text_type, node.url)
+
+    def route_blocks():
+        for block, block_type in blocks:
+            route(block, block_type)
+
+    # routing includes building the block's tree, so its number is dominated by the converters themselves
+    return {
+        'text_node_to_html_node': best_per_call(convert_nodes, len(nodes), repeat, number),
+        'TextNode()': best_per_call(create_nodes, len(nodes), repeat, number),
+        'markdown_router': best_per_call(route_blocks, len(blocks), repeat, max(1, number // 10)),
+        'TextType ==': best_per_call(lambda: TextType.BOLD == TextType.BOLD, 1, repeat, number),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-node cost of text type and block type dispatch")
+    parser.add_argument("--against", type=str, help="Git revision to compare against, e.g. HEAD~1")
+    parser.add_argument("--number", type=int, help="Rounds per timing", default=20000)
+    parser.add_argument("--repeat", type=int, help="Timings to take the best of", default=5)
+    args = parser.parse_args()
+
+    current = measure(load_textnode(), args.repeat, args.number)
+    baseline = measure(load_textnode(args.against), args.repeat, args.number) if args.against else None
+    for name, nanoseconds in current.items():
+        line = f"{name:<24} {nanoseconds:9.0f} ns/call"
+        if baseline is not None:
+            line += f"   {args.against}: {baseline[name]:9.0f} ns/call   speedup: {baseline[name] / nanoseconds:5.2f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import http.client
+import random
+import statistics
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+def site_paths(directory: Path) -> list[str]:
+    paths = []
+    for path in sorted(directory.rglob('*')):
+        if path.is_file():
+            url = '/' + path.relative_to(directory).as_posix()
+            paths.append(url[:-len('index.html')] if url.endswith('/index.html') else url)
+    return paths
+
+
+def client(host: str, port: int, paths: list[str], deadline: float, latencies: list[float], errors: list[int]):
+    # one persistent connection per client, so the server's keep-alive handling is what gets measured
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        path = rng.choice(paths)
+        started = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors.append(1)
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - started)
+        if response.status >= 400:
+            errors.append(1)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure requests per second and latency of server.py")
+    parser.add_argument("--url", type=str, help="Base URL of the running server", default="http://localhost:8888")
+    parser.add_argument("--dir", type=str, help="Local copy of the served site to pick paths from", default="public")
+    parser.add_argument("--connections", type=int, help="Concurrent keep-alive connections", default=32)
+    parser.add_argument("--duration", type=float, help="Seconds to run for", default=10.0)
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    paths = site_paths(Path(args.dir))
+    if not paths:
+        raise SystemExit(f"No files found in {args.dir}")
+
+    deadline = time.perf_counter() + args.duration
+    results = [([], []) for _ in range(args.connections)]
+    threads = [
+        threading.Thread(target=client, args=(url.hostname, url.port or 80, paths, deadline, *result))
+        for result in results
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for result, _ in results for latency in result)
+    errors = sum(len(result_errors) for _, result_errors in results)
+    if not latencies:
+        raise SystemExit(f"No successful requests, {errors} errors")
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"requests:   {len(latencies)} ({errors} errors) over {elapsed:.1f}s")
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency:    p50 {statistics.median(latencies) * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
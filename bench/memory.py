@@ -0,0 +1,40 @@
+import argparse
+import resource
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from corpus import synthetic_document
+from textnode import markdown_to_html_node
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory used to build the node tree of a large page")
+    parser.add_argument("--sections", type=int, help="Number of sections in the synthetic page", default=2000)
+    args = parser.parse_args()
+
+    markdown = synthetic_document(args.sections)
+
+    tracemalloc.start()
+    node = markdown_to_html_node(markdown)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    live_blocks = sum(stat.count for stat in snapshot.statistics('filename'))
+    live_bytes = sum(stat.size for stat in snapshot.statistics('filename'))
+    html_size = len(node.to_html())
+    # ru_maxrss is reported in KiB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    print(f"markdown size:     {len(markdown) / 2**20:10.2f} MiB")
+    print(f"html size:         {html_size / 2**20:10.2f} MiB")
+    print(f"node tree size:    {live_bytes / 2**20:10.2f} MiB in {live_blocks} allocations")
+    print(f"peak traced:       {peak / 2**20:10.2f} MiB")
+    print(f"peak RSS:          {peak_rss / 2**20:10.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import add_corpus_arguments, corpus_options, generate_site
+
+MAIN = Path(__file__).resolve().parent.parent / "src" / "main.py"
+
+
+def time_command(command: list[str], runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def slowest_imports(command: list[str], count: int) -> list[tuple[int, str]]:
+    # -X importtime reports cumulative microseconds per module on stderr
+    stderr = subprocess.run(
+        [command[0], "-X", "importtime", *command[1:]], check=True, stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE, text=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            imports.append((int(fields[1]), fields[2].rstrip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a no-op incremental build from process start to exit")
+    add_corpus_arguments(parser)
+    parser.add_argument("--runs", type=int, help="Number of timed no-op builds", default=10)
+    parser.add_argument("--budget", type=float, help="Fail when the fastest no-op build takes longer (ms)", default=100)
+    parser.add_argument("--imports", type=int, help="Also list this many of the slowest imports", default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        pages = generate_site(root, **corpus_options(args))
+        build = [
+            sys.executable, str(MAIN),
+            "--content", str(root / "content"),
+            "--template", str(root / "template.html"),
+            "--dest", str(root / "public"),
+        ]
+        subprocess.run(build, check=True, stdout=subprocess.DEVNULL)
+
+        noop = build + ["--incremental"]
+        # the interpreter's own start-up is outside our control, so it is reported next to the build
+        interpreter = time_command([sys.executable, "-c", "pass"], args.runs)
+        timings = time_command(noop, args.runs)
+        imports = slowest_imports(noop, args.imports) if args.imports else []
+
+    print(f"Site: {len(pages)} pages")
+    print(f"interpreter start-up: {min(interpreter):8.1f} ms min {statistics.median(interpreter):8.1f} ms median")
+    print(f"no-op build:          {min(timings):8.1f} ms min {statistics.median(timings):8.1f} ms median")
+    for microseconds, module in imports:
+        print(f"  {microseconds / 1000:8.1f} ms  {module}")
+
+    if min(timings) > args.budget:
+        print(f"No-op build exceeds the {args.budget:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from corpus import add_corpus_arguments, corpus_options, generate_site
+from main import generate_page, generate_pages_recursive
+from textnode import block_cache_clear, markdown_to_html_node
+
+RESULTS_VERSION = 1
+
+
+def measure(run, setup=None, repeat: int = 3) -> tuple[float, int]:
+    # the best of several runs is the least disturbed by whatever else the machine is doing
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    # tracing slows everything down, so peak memory comes from one extra untimed run
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run_suite(root: Path, pages: list[Path], repeat: int) -> dict:
+    markdowns = [page.read_text(encoding="utf-8") for page in pages]
+    markdown_bytes = sum(len(markdown.encode("utf-8")) for markdown in markdowns)
+    template_path = root / "template.html"
+    output = root / "out"
+    output.mkdir()
+
+    def cold_memo():
+        # pages share blocks, a warm memo from the previous run would hide the parser entirely
+        block_cache_clear()
+
+    def parse():
+        for markdown in markdowns:
+            markdown_to_html_node(markdown)
+
+    cold_memo()
+    nodes = [markdown_to_html_node(markdown) for markdown in markdowns]
+    html_bytes = sum(len(node.to_html().encode("utf-8")) for node in nodes)
+
+    def serialize():
+        for node in nodes:
+            node.to_html()
+
+    def generate():
+        for idx, page in enumerate(pages):
+            generate_page(page, template_path, output / f"{idx}.html")
+
+    def build():
+        generate_pages_recursive(
+            root / "content", template_path, root / "public", manifest_path=root / ".ssg" / "manifest.json"
+        )
+
+    benchmarks = {
+        'markdown_to_html_node': (parse, markdown_bytes),
+        'to_html': (serialize, html_bytes),
+        'generate_page': (generate, markdown_bytes),
+        'generate_pages_recursive': (build, markdown_bytes),
+    }
+    results = {}
+    for name, (run, size) in benchmarks.items():
+        # the pipeline prints a line per page, which would only measure the terminal
+        with contextlib.redirect_stdout(io.StringIO()):
+            seconds, peak = measure(run, cold_memo, repeat)
+        results[name] = {
+            'seconds': seconds,
+            'pages_per_second': len(pages) / seconds,
+            'mb_per_second': size / 2**20 / seconds,
+            'peak_bytes': peak,
+        }
+        print(f"{name:<26} {seconds:>8.3f} s {len(pages) / seconds:>9.1f} pages/s "
+              f"{size / 2**20 / seconds:>8.2f} MB/s {peak / 2**20:>8.1f} MiB peak")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            if previous[metric] and result[metric] > previous[metric] * (1 + threshold):
+                change = result[metric] / previous[metric] - 1
+                regressions.append(f"{name} {metric}: {previous[metric]:.4g} -> {result[metric]:.4g} (+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the markdown pipeline on a synthetic site")
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeat", type=int, help="Timed runs per benchmark, the fastest is kept", default=3)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this path")
+    parser.add_argument("--baseline", type=Path, help="Results from an earlier run to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        help="Fail when a time or peak memory grows by more than this fraction of the baseline",
+        default=0.1,
+    )
+    args = parser.parse_args()
+
+    options = corpus_options(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        pages = generate_site(root, **options)
+        size = sum(page.stat().st_size for page in pages)
+        print(f"Corpus: {len(pages)} pages, {size / 2**20:.2f} MiB of markdown")
+        results = run_suite(root, pages, args.repeat)
+
+    report = {
+        'version': RESULTS_VERSION,
+        'python': platform.python_version(),
+        'corpus': options,
+        'results': results,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=1), encoding="utf-8")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get('corpus') != options:
+            # numbers from a different corpus are not comparable, so this is a warning rather than a pass
+            print(f"Warning: baseline was measured on a different corpus: {baseline.get('corpus')}")
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,2 @@
-python src/main.py
-python server.py --dir public
\ No newline at end of file
+python src/main.py "$@"
+python server.py --dir public
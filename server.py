@@ -1,6 +1,260 @@
 import os
 import argparse
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import email.utils
+import json
+import mimetypes
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import HTTPServer, ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+
+class CachedFile:
+    __slots__ = ('fd', 'size', 'mtime_ns', 'content_type', 'last_modified', 'checked_at')
+
+    def __init__(self, path, fd):
+        self.fd = fd
+        stat = os.fstat(fd)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        self.checked_at = time.monotonic()
+
+    def __del__(self):
+        # entries are shared between request threads, so the descriptor is closed by the last one to let go
+        os.close(self.fd)
+
+
+# content codings we have precompressed variants for, in order of preference
+ENCODING_SUFFIXES = {'zstd': '.zst', 'br': '.br', 'gzip': '.gz'}
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        quality = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                continue
+        coding = coding.strip().lower()
+        if coding and quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+class FileCache:
+    def __init__(self, revalidate=1.0, max_entries=256):
+        self.revalidate = revalidate
+        # every entry holds an open descriptor, so the cache is kept well under the process's fd limit
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        # paths known not to exist, so lookups for absent compressed variants don't stat every time
+        self.missing = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None:
+                self.entries.move_to_end(path)
+                if now - entry.checked_at < self.revalidate:
+                    return entry
+            missing_since = self.missing.get(path)
+            if missing_since is not None and now - missing_since < self.revalidate:
+                return None
+
+        # stat at most once per revalidate interval, so rebuilt files are picked up without a restart
+        try:
+            stat = os.stat(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                entry.checked_at = time.monotonic()
+                return entry
+            entry = CachedFile(path, os.open(path, os.O_RDONLY))
+        except OSError:
+            with self.lock:
+                self.entries.pop(path, None)
+                self.missing[path] = now
+                self.missing.move_to_end(path)
+                if len(self.missing) > self.max_entries:
+                    self.missing.popitem(last=False)
+            return None
+        with self.lock:
+            self.entries[path] = entry
+            self.entries.move_to_end(path)
+            self.missing.pop(path, None)
+            # the least recently served file goes first, its descriptor closes once no request still holds it
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+
+class BuildIndex:
+    def __init__(self, path=None, reload_interval=1.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.files = {}
+        self.mtime_ns = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        if self.checked_at is None or now - self.checked_at >= self.reload_interval:
+            with self.lock:
+                self.reload(now)
+        return self.files.get(key)
+
+    def reload(self, now):
+        self.checked_at = now
+        if self.path is None:
+            return
+        # the build rewrites the index after every run, so pick it up whenever its mtime moves
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            if mtime_ns == self.mtime_ns:
+                return
+            with open(self.path, 'r', encoding="utf-8") as f:
+                self.files = json.load(f).get('files', {})
+            self.mtime_ns = mtime_ns
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.files = {}
+            self.mtime_ns = None
+
+
+def entity_tag(info, encoding=None):
+    # compressed variants are derived from the same bytes, so they share the hash with a coding suffix
+    digest = info['hash'][:32]
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+class CachedFileHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and the sendfile body go out in separate writes, which nagle would otherwise hold back
+    disable_nagle_algorithm = True
+    # idle keep-alive connections are dropped after this many seconds
+    timeout = 30
+    file_cache = FileCache()
+
+    def do_GET(self):
+        path, info = self.resolve()
+        if info is not None and self.send_not_modified(info):
+            return
+        entry = self.file_cache.get(path) if path is not None else None
+        if entry is None:
+            return super().do_GET()
+        body, encoding = self.select_encoding(path, entry)
+        self.send_cached_headers(entry, info, body, encoding)
+        self.send_file(body)
+
+    def do_HEAD(self):
+        path, info = self.resolve()
+        if info is not None and self.send_not_modified(info):
+            return
+        entry = self.file_cache.get(path) if path is not None else None
+        if entry is None:
+            return super().do_HEAD()
+        body, encoding = self.select_encoding(path, entry)
+        self.send_cached_headers(entry, info, body, encoding)
+
+    def resolve(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            # directories without a trailing slash get the default redirect, others serve their index
+            if not self.path.split('?', 1)[0].endswith('/'):
+                return None, None
+            path = os.path.join(path, 'index.html')
+        key = os.path.relpath(path, self.directory).replace(os.sep, '/')
+        return path, self.server.build_index.get(key)
+
+    def send_not_modified(self, info):
+        # answered from the build's hash index alone, the file itself is never opened or stat'ed
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            client_tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            current_tags = [entity_tag(info)] + [entity_tag(info, encoding) for encoding in ENCODING_SUFFIXES]
+            matched = [tag for tag in current_tags if tag in client_tags or '*' in client_tags]
+            if not matched:
+                return False
+            etag = matched[0]
+        else:
+            if_modified_since = self.headers.get('If-Modified-Since')
+            if if_modified_since is None:
+                return False
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            if info['mtime'] > since:
+                return False
+            etag = None
+
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.send_header("Last-Modified", email.utils.formatdate(info['mtime'], usegmt=True))
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return True
+
+    def select_encoding(self, path, entry):
+        # the build writes compressed siblings next to each text output, so no compression happens here
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding', ''))
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if encoding in accepted or '*' in accepted:
+                variant = self.file_cache.get(path + suffix)
+                if variant is not None and variant.mtime_ns >= entry.mtime_ns:
+                    return variant, encoding
+        return entry, None
+
+    def send_cached_headers(self, entry, info, body, encoding):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", entry.content_type)
+        self.send_header("Content-Length", str(body.size))
+        if info is not None:
+            self.send_header("ETag", entity_tag(info, encoding))
+            self.send_header("Last-Modified", email.utils.formatdate(info['mtime'], usegmt=True))
+        else:
+            self.send_header("Last-Modified", entry.last_modified)
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+
+    def send_file(self, entry):
+        # sendfile copies straight from the page cache to the socket without passing through python
+        offset = 0
+        socket_fd = self.connection.fileno()
+        try:
+            while offset < entry.size:
+                sent = os.sendfile(socket_fd, entry.fd, offset, entry.size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+            return
+        if offset < entry.size:
+            # the file shrank under its cached descriptor, the client only learns the body ended early from
+            # the connection closing
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class StaticHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    quiet = False
+    build_index = BuildIndex()
 
 
 def run(
@@ -8,12 +262,26 @@ def run(
     handler_class=SimpleHTTPRequestHandler,
     port=8888,
     directory=None,
+    workers=1,
+    quiet=False,
+    index=None,
 ):
+    if index is None and directory:
+        # the build keeps its state next to the output directory
+        index = os.path.join(directory, '..', '.ssg', 'hashes.json')
+    if index is not None:
+        index = os.path.abspath(index)
     if directory:  # Change the current working directory if directory is specified
         os.chdir(directory)
     server_address = ("", port)
     httpd = server_class(server_address, handler_class)
-    print(f"Serving HTTP on http://localhost:{port} from directory '{directory}'...")
+    httpd.quiet = quiet
+    httpd.build_index = BuildIndex(index)
+    # every worker process accepts from the same listening socket
+    for _ in range(workers - 1):
+        if os.fork() == 0:
+            break
+    print(f"Serving HTTP on http://localhost:{port} from directory '{directory}' (pid {os.getpid()})...")
     httpd.serve_forever()
 
 
@@ -23,6 +291,21 @@ if __name__ == "__main__":
         "--dir", type=str, help="Directory to serve files from", default="."
     )
     parser.add_argument("--port", type=int, help="Port to serve HTTP on", default=8888)
+    parser.add_argument(
+        "--workers", type=int, help="Number of server processes sharing the port", default=1
+    )
+    parser.add_argument("--quiet", action="store_true", help="Don't log every request")
+    parser.add_argument(
+        "--index", type=str, help="Hash index written by the build (default: <dir>/../.ssg/hashes.json)"
+    )
     args = parser.parse_args()
 
-    run(port=args.port, directory=args.dir)
+    run(
+        server_class=StaticHTTPServer,
+        handler_class=CachedFileHandler,
+        port=args.port,
+        directory=args.dir,
+        workers=args.workers,
+        quiet=args.quiet,
+        index=args.index,
+    )
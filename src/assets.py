@@ -0,0 +1,98 @@
+from pathlib import Path
+import os
+import shutil
+from manifest import file_digest
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+ASSET_STRATEGIES = ('auto', 'copy', 'hardlink', 'reflink')
+# ioctl request that asks btrfs, xfs and friends to share extents between two files
+FICLONE = 0x40049409
+
+
+def output_matches(src: Path, dst: Path, src_hash: str) -> bool:
+    try:
+        src_stat = src.stat()
+        dst_stat = dst.stat()
+    except FileNotFoundError:
+        return False
+    if os.path.samestat(src_stat, dst_stat):
+        return True
+    # size and mtime are cheap to compare, the hash only gets read once both already agree
+    return (
+            src_stat.st_size == dst_stat.st_size and
+            src_stat.st_mtime_ns == dst_stat.st_mtime_ns and
+            file_digest(dst) == src_hash
+    )
+
+
+def reflink(src: Path, dst: Path) -> None:
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+        fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+
+
+def copy_range(src: Path, dst: Path) -> None:
+    # copy_file_range keeps the data in the kernel and lets network filesystems copy server-side
+    with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+        remaining = os.fstat(src_file.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src_file.fileno(), dst_file.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def copy_file(src: Path, dst: Path) -> None:
+    try:
+        copy_range(src, dst)
+    except (AttributeError, OSError):
+        shutil.copyfile(src, dst)
+
+
+def publish_asset(src: Path, dst: Path, src_hash: str, strategy: str = 'auto') -> str:
+    if output_matches(src, dst, src_hash):
+        return 'reused'
+
+    # the new file is put in place with a rename so readers never see a partial asset
+    tmp_path = dst.with_name(f".{dst.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        if strategy == 'hardlink':
+            try:
+                os.link(src, tmp_path)
+                os.replace(tmp_path, dst)
+                return 'linked'
+            except OSError:
+                # links can't cross filesystems, a plain copy still works
+                tmp_path.unlink(missing_ok=True)
+        if strategy in ('auto', 'reflink'):
+            try:
+                reflink(src, tmp_path)
+                shutil.copystat(src, tmp_path)
+                os.replace(tmp_path, dst)
+                return 'linked'
+            except OSError:
+                tmp_path.unlink(missing_ok=True)
+        copy_file(src, tmp_path)
+        shutil.copystat(src, tmp_path)
+        os.replace(tmp_path, dst)
+        return 'copied'
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def publish_assets(assets: list[tuple[Path, Path, str]], strategy: str = 'auto', jobs: int = None) -> list[str]:
+    if not assets:
+        return []
+    # imported on first use, concurrent.futures brings logging and threading along with it
+    from concurrent.futures import ThreadPoolExecutor
+
+    # copies spend their time in system calls that release the GIL, so threads overlap them well
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(lambda asset: publish_asset(*asset, strategy), assets))
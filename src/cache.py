@@ -0,0 +1,96 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+from statefile import load_state, write_json
+
+
+DEFAULT_CACHE_SIZE = 256 * 2**20
+# bump whenever records gain or change fields, or a change outside the parser alters what a page renders to,
+# entries of an older shape are then never looked up
+RECORD_VERSION = 6
+CACHE_USAGE_VERSION = 1
+# a prune evicts down to this share of max_bytes, so the next few builds don't each have to walk the cache again
+PRUNE_TARGET = 0.9
+
+
+class RenderCache:
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.stored_bytes = 0
+
+    @staticmethod
+    def key(source_hash: str, partials: list[tuple[str, str]] = ()) -> str:
+        # imported here so opening the cache doesn't load the parser for builds with nothing to render
+        from textnode import PARSER_VERSION
+        # the parser version is part of the key so a parser change never serves stale html,
+        # and so is every included partial, so editing one never serves the page it was spliced into
+        material = f"{PARSER_VERSION}:{RECORD_VERSION}:{source_hash}"
+        for name, digest in partials:
+            material += f":{name}={digest}"
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        path = self.entry_path(key)
+        try:
+            with open(path, 'r', encoding="utf-8") as f:
+                record = json.load(f)
+            # the mtime doubles as the last-used time for LRU eviction
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return record
+
+    def put(self, key: str, record: dict) -> None:
+        # concurrent builds sharing the cache only ever see complete entries,
+        # records are ascii json so the characters written are the bytes on disk
+        self.stored_bytes += write_json(self.entry_path(key), record)
+        self.stores += 1
+
+    def prune(self) -> int:
+        # the total size is carried over from build to build, the cache is only walked once it may be over budget.
+        # overwritten entries are counted twice, which can only make the walk come early
+        usage_path = self.cache_dir / 'usage.json'
+        usage = load_state(usage_path, CACHE_USAGE_VERSION)
+        if usage is not None and usage['bytes'] + self.stored_bytes <= self.max_bytes:
+            write_json(usage_path, {'version': CACHE_USAGE_VERSION, 'bytes': usage['bytes'] + self.stored_bytes})
+            self.stored_bytes = 0
+            return 0
+
+        entries = []
+        for path in self.cache_dir.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * PRUNE_TARGET:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        write_json(usage_path, {'version': CACHE_USAGE_VERSION, 'bytes': total})
+        self.stored_bytes = 0
+        return removed
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return f"Render cache: {self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate)"
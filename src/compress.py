@@ -0,0 +1,64 @@
+from pathlib import Path
+import gzip
+import os
+
+try:
+    # zstd joined the standard library in python 3.14
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+
+COMPRESSIBLE_SUFFIXES = {'.html', '.css', '.js', '.mjs', '.json', '.xml', '.svg', '.txt', '.map'}
+# below this size the encoding headers cost more than compression saves
+MIN_COMPRESS_SIZE = 256
+
+
+def gzip_compress(data: bytes) -> bytes:
+    # a fixed mtime keeps the output byte-for-byte reproducible between builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+ENCODERS = {'.gz': gzip_compress}
+if zstd is not None:
+    ENCODERS['.zst'] = lambda data: zstd.compress(data, level=19)
+
+
+def compressed_siblings(path: Path) -> list[Path]:
+    return [path.with_name(path.name + suffix) for suffix in ENCODERS]
+
+
+def remove_compressed(path: Path) -> None:
+    for sibling in compressed_siblings(path):
+        sibling.unlink(missing_ok=True)
+
+
+def compress_file(path: Path) -> int:
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    written = 0
+    for suffix, encode in ENCODERS.items():
+        sibling = path.with_name(path.name + suffix)
+        encoded = encode(data) if len(data) >= MIN_COMPRESS_SIZE else None
+        if encoded is None or len(encoded) >= len(data):
+            # an old variant would be served in place of the new file, so it must not survive
+            sibling.unlink(missing_ok=True)
+            continue
+        tmp_path = sibling.with_name(sibling.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(encoded)
+        os.replace(tmp_path, sibling)
+        written += 1
+    return written
+
+
+def precompress(paths: list[Path], jobs: int = None) -> int:
+    paths = [path for path in paths if path.suffix in COMPRESSIBLE_SUFFIXES]
+    if not paths:
+        return 0
+    from concurrent.futures import ThreadPoolExecutor
+
+    # zlib releases the GIL while compressing, so threads are enough to use every core
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return sum(executor.map(compress_file, paths))
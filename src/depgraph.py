@@ -0,0 +1,98 @@
+from pathlib import Path
+import os
+from manifest import file_digest
+from partials import list_partials
+from statefile import load_state, write_json
+
+
+DEPGRAPH_VERSION = 1
+
+
+class DependencyGraph:
+    def __init__(self, path: Path, partials: dict = None, template: list = None, pages: dict = None):
+        self.path = path
+        # hash, mtime and size of every partial, so unchanged partials are never re-read
+        self.partials = partials if partials is not None else {}
+        # partials spliced into the template
+        self.template = template if template is not None else []
+        # partials each page included, and why the page was last rebuilt
+        self.pages = pages if pages is not None else {}
+        self.changed = False
+
+    @classmethod
+    def load(cls, path: Path) -> 'DependencyGraph':
+        data = load_state(path, DEPGRAPH_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get('partials', {}), data.get('template', []), data.get('pages', {}))
+
+    def save(self) -> None:
+        data = {'version': DEPGRAPH_VERSION, 'partials': self.partials, 'template': self.template, 'pages': self.pages}
+        write_json(self.path, data, sort_keys=True)
+        self.changed = False
+
+    def refresh_partials(self, root: Path | str) -> set[str]:
+        changed = set()
+        current = list_partials(root)
+        for name, (mtime_ns, size) in current.items():
+            entry = self.partials.get(name)
+            if entry and entry['mtime_ns'] == mtime_ns and entry['size'] == size:
+                continue
+            digest = file_digest(os.path.join(root, name))
+            if entry is None or entry['hash'] != digest:
+                changed.add(name)
+            self.partials[name] = {'hash': digest, 'mtime_ns': mtime_ns, 'size': size}
+            self.changed = True
+        for name in self.partials.keys() - current.keys():
+            del self.partials[name]
+            changed.add(name)
+            self.changed = True
+        return changed
+
+    def page_partials(self, key: str) -> list[str]:
+        entry = self.pages.get(key)
+        return entry['partials'] if entry else []
+
+    def partial_hashes(self, names) -> list[tuple[str, str]]:
+        return [(name, self.partials[name]['hash'] if name in self.partials else None) for name in sorted(names)]
+
+    def dependents(self, names: set[str]) -> dict[str, list[str]]:
+        # only the pages that included one of the changed partials need rendering again
+        if not names:
+            return {}
+        dependents = {}
+        for key, entry in self.pages.items():
+            hit = names.intersection(entry['partials'])
+            if hit:
+                dependents[key] = sorted(hit)
+        return dependents
+
+    def record(self, key: str, partials, reason: str) -> None:
+        entry = {'partials': sorted(partials), 'reason': reason}
+        if self.pages.get(key) != entry:
+            self.pages[key] = entry
+            self.changed = True
+
+    def record_template(self, partials) -> None:
+        partials = sorted(partials)
+        if self.template != partials:
+            self.template = partials
+            self.changed = True
+
+    def discard(self, keys) -> None:
+        for key in keys:
+            if self.pages.pop(key, None) is not None:
+                self.changed = True
+
+    def explain(self, key: str, template_path: Path, partials_dir: Path) -> list[str]:
+        entry = self.pages[key]
+        inputs = [key, str(template_path)]
+        inputs += [f"{Path(partials_dir, name)} (via template)" for name in self.template]
+        # includes that didn't resolve are still listed, creating the file rebuilds the page
+        for name in entry['partials']:
+            inputs.append(str(Path(partials_dir, name)) + ('' if name in self.partials else " (not found)"))
+        return [
+            f"{key} was last rebuilt because: {entry['reason']}",
+            "It depends on:",
+            *(f"  {name}" for name in inputs),
+        ]
@@ -0,0 +1,84 @@
+from typing import TextIO
+import re
+
+
+FRONT_MATTER_DELIMITER = '---'
+FIELD_REGEX = re.compile(r"^([A-Za-z_][\w-]*) *:(?: +(.*))?$")
+LIST_ITEM_REGEX = re.compile(r"^ +- +(.*)$")
+INTEGER_REGEX = re.compile(r"^-?\d+$")
+
+
+def parse_scalar(value: str):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    if value.startswith('[') and value.endswith(']'):
+        inner = value[1:-1].strip()
+        return [parse_scalar(item) for item in inner.split(',')] if inner else []
+    if value in ('true', 'false'):
+        return value == 'true'
+    if INTEGER_REGEX.match(value):
+        return int(value)
+    return value
+
+
+def parse_front_matter(lines: list[str]) -> dict:
+    # a small yaml subset: scalar fields, inline [a, b] lists and indented "- item" lists
+    fields = {}
+    current_list = None
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip('\r\n')
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        item = LIST_ITEM_REGEX.match(line)
+        if item and current_list is not None:
+            current_list.append(parse_scalar(item.group(1)))
+            continue
+        field = FIELD_REGEX.match(line)
+        if not field:
+            raise ValueError(f"Invalid front matter on line {number}: {line!r}")
+        name, value = field.groups()
+        if value is None or not value.strip():
+            # an empty value opens a block list, it stays empty if no items follow
+            current_list = fields[name] = []
+        else:
+            current_list = None
+            fields[name] = parse_scalar(value)
+    return fields
+
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    if not markdown.startswith(FRONT_MATTER_DELIMITER):
+        return {}, markdown
+    lines = markdown.splitlines(keepends=True)
+    if lines[0].rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, markdown
+    for idx in range(1, len(lines)):
+        if lines[idx].rstrip() == FRONT_MATTER_DELIMITER:
+            return parse_front_matter(lines[1:idx]), ''.join(lines[idx + 1:])
+    raise ValueError("Front matter is not closed")
+
+
+def read_front_matter(fp: TextIO) -> dict:
+    # leaves the file positioned at the start of the markdown body, without reading any of it
+    start = fp.tell()
+    if fp.readline().rstrip() != FRONT_MATTER_DELIMITER:
+        fp.seek(start)
+        return {}
+    lines = []
+    for line in fp:
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            return parse_front_matter(lines)
+        lines.append(line)
+    raise ValueError("Front matter is not closed")
+
+
+def slot_values(fields: dict) -> dict[str, str]:
+    values = {}
+    for name, value in fields.items():
+        if isinstance(value, list):
+            value = ', '.join(str(item) for item in value)
+        elif isinstance(value, bool):
+            value = 'true' if value else 'false'
+        values[name] = str(value)
+    return values
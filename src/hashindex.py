@@ -0,0 +1,41 @@
+from pathlib import Path
+import time
+from manifest import file_digest
+from statefile import load_state, write_json
+
+
+HASH_INDEX_VERSION = 1
+
+
+class HashIndex:
+    def __init__(self, path: Path, files: dict = None):
+        self.path = path
+        self.files = files if files is not None else {}
+
+    @classmethod
+    def load(cls, path: Path) -> 'HashIndex':
+        data = load_state(path, HASH_INDEX_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get('files', {}))
+
+    def save(self) -> None:
+        write_json(self.path, {'version': HASH_INDEX_VERSION, 'files': self.files}, sort_keys=True)
+
+    def update(self, dest_dir_path: Path, written: list[tuple[Path, str]], incremental: bool) -> None:
+        # a full build rewrites every output, so only what it wrote belongs in the index
+        previous = self.files
+        self.files = dict(previous) if incremental else {}
+        now = int(time.time())
+        for path, digest in written:
+            key = path.relative_to(dest_dir_path).as_posix()
+            if digest is None:
+                digest = file_digest(path)
+            entry = previous.get(key)
+            # last-modified only moves when the bytes change, so rebuilding identical output keeps caches warm
+            modified = entry['mtime'] if entry and entry['hash'] == digest else now
+            self.files[key] = {'hash': digest, 'size': path.stat().st_size, 'mtime': modified}
+
+    def discard(self, dest_dir_path: Path, removed: list[Path]) -> None:
+        for path in removed:
+            self.files.pop(path.relative_to(dest_dir_path).as_posix(), None)
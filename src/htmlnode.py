@@ -1,7 +1,13 @@
-from functools import reduce
+from typing import Iterator, TextIO
+
+
+# marks the end of a child iterator, None can't since it is a (broken) child of its own
+_END = object()
 
 
 class HTMLNode:
+    __slots__ = ('tag', 'value', 'children', 'props')
+
     def __init__(self, value: str = None, tag: str = None, children: list = None, props: dict = None):
         self.tag = tag
         self.value = value
@@ -9,15 +15,21 @@ class HTMLNode:
         self.props = props
 
     def to_html(self):
+        return ''.join(self.iter_html())
+
+    def iter_html(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def write_html(self, fp: TextIO) -> None:
+        fp.writelines(self.iter_html())
+
+    def iter_leaves(self) -> Iterator['LeafNode']:
         raise NotImplementedError
 
     def props_to_html(self):
-        result = ''
         if not isinstance(self.props, dict) or not self.props:
-            return result
-        for attr, value in self.props.items():
-            result += f' {attr}="{value}"'
-        return result
+            return ''
+        return ''.join(f' {attr}="{value}"' for attr, value in self.props.items())
 
     def __eq__(self, other):
         return (
@@ -33,6 +45,8 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, value, tag=None, props=None):
         super().__init__(value, tag, None, props)
 
@@ -48,27 +62,63 @@ class LeafNode(HTMLNode):
 
         return f'<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>'
 
+    def iter_html(self) -> Iterator[str]:
+        yield self.to_html()
+
+    def iter_leaves(self) -> Iterator['LeafNode']:
+        yield self
+
     def __repr__(self):
         return f'LeafNode({self.value}, {self.tag}, {self.props})'
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(None, tag, children, props)
 
-    def to_html(self):
+    def check_renderable(self) -> None:
         if self.tag is None:
             raise ValueError('ParentNode must have a tag')
         if self.children is None:
             raise ValueError('ParentNode must have children')
         if not isinstance(self.children, list):
             raise ValueError('Children must be a list object')
-
-        def concat_children(a, b):
-            return a + b.to_html()
-
-        return f'<{self.tag}{self.props_to_html()}>{
-            reduce(
-                concat_children, self.children[1:], self.children[0].to_html()
-            )
-        }</{self.tag}>'
+        if not self.children:
+            # to_html used to index the first child, keep failing the same way for an empty list
+            raise IndexError('ParentNode must have at least one child')
+
+    def iter_html(self) -> Iterator[str]:
+        self.check_renderable()
+        yield f'<{self.tag}{self.props_to_html()}>'
+
+        # walk the tree with an explicit stack so deeply nested documents can't hit the recursion limit
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, _END)
+            if child is _END:
+                stack.pop()
+                yield f'</{node.tag}>'
+            elif isinstance(child, ParentNode):
+                child.check_renderable()
+                yield f'<{child.tag}{child.props_to_html()}>'
+                stack.append((child, iter(child.children)))
+            else:
+                # a None child fails here, as it did when every child was rendered with to_html
+                yield from child.iter_html()
+
+    def iter_leaves(self) -> Iterator[LeafNode]:
+        # text and urls all live in the leaves, so indexing a page never has to render or parse its html
+        stack = [iter(self.children)]
+        while stack:
+            child = next(stack[-1], _END)
+            if child is _END:
+                stack.pop()
+            elif isinstance(child, ParentNode):
+                stack.append(iter(child.children))
+            elif isinstance(child, LeafNode):
+                yield child
+            else:
+                yield from child.iter_leaves()
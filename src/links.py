@@ -0,0 +1,104 @@
+from pathlib import Path
+from urllib.parse import unquote
+import posixpath
+import re
+from htmlnode import HTMLNode
+from statefile import load_state, write_json
+
+
+LINK_INDEX_VERSION = 1
+SCHEME_REGEX = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+LINK_ATTRIBUTES = {'a': 'href', 'img': 'src'}
+
+
+def page_links(node: HTMLNode, links: set[str] = None) -> set[str]:
+    # every url split_nodes_link and split_nodes_image pulled out ends up on a leaf of the tree
+    links = set() if links is None else links
+    for leaf in node.iter_leaves():
+        attribute = LINK_ATTRIBUTES.get(leaf.tag)
+        if attribute is not None and leaf.props and leaf.props.get(attribute):
+            links.add(leaf.props[attribute])
+    return links
+
+
+def resolve_link(url: str, base_url: str) -> str | None:
+    # external urls and fragments on the same page aren't ours to check
+    if url.startswith(('#', '//')) or SCHEME_REGEX.match(url):
+        return None
+    path = unquote(url.split('#', 1)[0].split('?', 1)[0])
+    if not path:
+        return None
+    if not path.startswith('/'):
+        path = base_url.rsplit('/', 1)[0] + '/' + path
+    resolved = posixpath.normpath(path)
+    if resolved != '/' and path.endswith('/'):
+        resolved += '/'
+    return resolved
+
+
+def url_forms(output: str) -> list[str]:
+    # every url a server answers with this file, so checking a link is a single set lookup
+    forms = ['/' + output]
+    if output == 'index.html':
+        forms.append('/')
+    elif output.endswith('/index.html'):
+        forms += ['/' + output[:-len('index.html')], '/' + output[:-len('/index.html')]]
+    elif output.endswith('.html'):
+        forms.append('/' + output[:-len('.html')])
+    return forms
+
+
+def url_index(outputs) -> set[str]:
+    return {form for output in outputs for form in url_forms(output)}
+
+
+class LinkIndex:
+    def __init__(self, path: Path, pages: dict = None):
+        self.path = path
+        # url and links of every page, and which of those links were broken when last checked
+        self.pages = pages if pages is not None else {}
+        self.changed = False
+
+    @classmethod
+    def load(cls, path: Path) -> 'LinkIndex':
+        data = load_state(path, LINK_INDEX_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get('pages', {}))
+
+    def save(self) -> None:
+        write_json(self.path, {'version': LINK_INDEX_VERSION, 'pages': self.pages})
+        self.changed = False
+
+    def update(self, key: str, url: str, links) -> None:
+        entry = self.pages.get(key)
+        links = sorted(links)
+        if entry is None or entry['url'] != url or entry['links'] != links:
+            self.pages[key] = {'url': url, 'links': links, 'broken': entry['broken'] if entry else []}
+            self.changed = True
+
+    def discard(self, keys) -> None:
+        for key in keys:
+            if self.pages.pop(key, None) is not None:
+                self.changed = True
+
+    def check(self, known: set[str], keys=None) -> int:
+        checked = 0
+        for key in self.pages if keys is None else keys:
+            entry = self.pages.get(key)
+            if entry is None:
+                continue
+            broken = []
+            for url in entry['links']:
+                resolved = resolve_link(url, entry['url'])
+                if resolved is not None:
+                    checked += 1
+                    if resolved not in known:
+                        broken.append(url)
+            if entry['broken'] != broken:
+                entry['broken'] = broken
+                self.changed = True
+        return checked
+
+    def broken(self) -> dict[str, list[str]]:
+        return {key: entry['broken'] for key, entry in sorted(self.pages.items()) if entry['broken']}
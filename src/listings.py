@@ -0,0 +1,177 @@
+from pathlib import Path
+import hashlib
+import json
+import re
+from htmlnode import LeafNode, ParentNode
+from statefile import atomic_write, load_state, write_json
+from template import Template
+
+
+LISTINGS_VERSION = 1
+DEFAULT_PAGE_SIZE = 20
+TAG_SLUG_REGEX = re.compile(r"[^a-z0-9]+")
+
+
+class Listing:
+    __slots__ = ('title', 'items', 'newer', 'older')
+
+    def __init__(self, title: str, items: list[dict], newer: str = None, older: str = None):
+        self.title = title
+        self.items = items
+        self.newer = newer
+        self.older = older
+
+    def digest(self) -> str:
+        # everything that ends up in the html, so an unchanged digest means an unchanged page
+        entries = [(item['url'], item['title'], str(item.get('date', ''))) for item in self.items]
+        data = json.dumps([self.title, entries, self.newer, self.older], separators=(',', ':'))
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def to_html_node(self) -> ParentNode:
+        items = []
+        for item in self.items:
+            # a page whose title came out empty is still listed, under its url
+            children = [LeafNode(item['title'] or item['url'], 'a', {'href': item['url']})]
+            if item.get('date'):
+                children.append(LeafNode(f" {item['date']}", 'time'))
+            items.append(ParentNode('li', children))
+        children = [ParentNode('ul', items)]
+        links = []
+        if self.newer:
+            links.append(LeafNode('Newer', 'a', {'href': self.newer}))
+        if self.older:
+            links.append(LeafNode('Older', 'a', {'href': self.older}))
+        if links:
+            children.append(ParentNode('nav', links))
+        return ParentNode('div', children)
+
+
+def tag_slug(tag) -> str:
+    return TAG_SLUG_REGEX.sub('-', str(tag).lower()).strip('-')
+
+
+def sort_key(item: tuple[str, dict]) -> tuple[str, str]:
+    key, metadata = item
+    return str(metadata.get('date', '')), key
+
+
+def paginate(title: str, base_url: str, items: list[dict], page_size: int) -> dict[str, Listing]:
+    # pages are counted from the oldest item, so a new post only touches the first page and its neighbour
+    # instead of shifting every archive page by one
+    chunks = [items[start:start + page_size] for start in range(0, len(items), page_size)]
+    urls = [f"{base_url}page/{number}/" for number in range(1, len(chunks))] + [base_url]
+    listings = {}
+    for idx, chunk in enumerate(chunks):
+        newer = urls[idx + 1] if idx + 1 < len(chunks) else None
+        older = urls[idx - 1] if idx > 0 else None
+        listings[urls[idx]] = Listing(title, chunk[::-1], newer, older)
+    return listings
+
+
+def plan_listings(pages: dict[str, dict], page_size: int = DEFAULT_PAGE_SIZE) -> dict[str, Listing]:
+    published = sorted(((key, metadata) for key, metadata in pages.items() if not metadata.get('draft')), key=sort_key)
+    # pages with a date are posts, they make up the archive and the tag pages
+    posts = [metadata for _, metadata in published if metadata.get('date')]
+    listings = paginate("Archive", '/archive/', posts, page_size)
+
+    tagged = {}
+    for post in posts:
+        tags = post.get('tags', [])
+        for tag in tags if isinstance(tags, list) else [tags]:
+            if tag_slug(tag):
+                tagged.setdefault(tag_slug(tag), (tag, []))[1].append(post)
+    for slug, (tag, tag_posts) in tagged.items():
+        listings.update(paginate(f"Tagged {tag}", f'/tags/{slug}/', tag_posts, page_size))
+
+    # directories without an index page of their own list the pages directly inside them
+    urls = {metadata['url'] for _, metadata in published}
+    directories = {}
+    for _, metadata in published:
+        if metadata['url'] == '/':
+            continue
+        # /blog/post.html and /blog/post/ both sit in /blog/
+        directory = metadata['url'].rstrip('/').rsplit('/', 1)[0] + '/'
+        if directory not in urls:
+            directories.setdefault(directory, []).append(metadata)
+    for directory, entries in directories.items():
+        listings.update(paginate(directory.strip('/') or "Pages", directory, entries, page_size))
+    return listings
+
+
+def listing_output(url: str) -> str:
+    return url.lstrip('/') + 'index.html'
+
+
+class ListingState:
+    def __init__(self, path: Path, template_hash: str = None, pages: dict = None, page_size: int = None):
+        self.path = path
+        self.template_hash = template_hash
+        self.pages = pages if pages is not None else {}
+        self.page_size = page_size
+
+    @classmethod
+    def load(cls, path: Path) -> 'ListingState':
+        data = load_state(path, LISTINGS_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get('template'), data.get('pages', {}), data.get('page_size'))
+
+    def save(self) -> None:
+        data = {
+            'version': LISTINGS_VERSION, 'template': self.template_hash, 'page_size': self.page_size, 'pages': self.pages,
+        }
+        write_json(self.path, data, sort_keys=True)
+
+    def missing(self, dest_dir_path: Path) -> bool:
+        return any(not (dest_dir_path / output).exists() for output in self.pages)
+
+
+def generate_listings(
+    pages: dict[str, dict],
+    template: Template,
+    template_hash: str,
+    dest_dir_path: Path,
+    state: ListingState,
+    reserved: set[str],
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> tuple[list[Path], list[Path]]:
+    from compress import remove_compressed
+    listings = plan_listings(pages, page_size)
+    # a template change restyles every listing and a new page size reslices them all,
+    # otherwise only slices whose contents moved are rendered
+    rebuild_all = state.template_hash != template_hash or state.page_size != page_size
+    state.template_hash = template_hash
+    state.page_size = page_size
+
+    written = []
+    current = {}
+    for url, listing in listings.items():
+        output = listing_output(url)
+        if output in reserved:
+            # content always wins over a generated listing at the same path
+            continue
+        digest = listing.digest()
+        current[output] = digest
+        dst = dest_dir_path / output
+        if not rebuild_all and state.pages.get(output) == digest and dst.exists():
+            continue
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(dst) as f:
+            template.write(f, {"Title": listing.title, "Content": listing.to_html_node().iter_html()})
+        written.append(dst)
+
+    removed = []
+    for output in sorted(state.pages.keys() - current.keys()):
+        if output in reserved:
+            # a content page took over this path and has already been written
+            continue
+        dst = dest_dir_path / output
+        dst.unlink(missing_ok=True)
+        remove_compressed(dst)
+        removed.append(dst)
+        parent = dst.parent
+        while parent != dest_dir_path and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    state.pages = current
+    return written, removed
@@ -1,76 +1,746 @@
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
-import shutil
-import re
-from textnode import markdown_to_html_node
-
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path) -> None:
-    # delete public folder and recreate an empty one
-    print(f"Deleting folder: {dest_dir_path}")
-    shutil.rmtree(dest_dir_path, ignore_errors=True)
-    print(f"Creating folder: {dest_dir_path}")
-    dest_dir_path.mkdir()  # dest_dir_path
-
-    static_dir_contents = list(dir_path_content.rglob('*'))
-    src_dst_list = []
-    # create destination paths from source directory
-    for path in static_dir_contents:
-        src_dst_list.append(
-            (path,
-             dest_dir_path / path.relative_to(dir_path_content))
-        )
-
-    # create destination folders and generate html files
-    for src, dst in src_dst_list:
-        if src.is_dir():
-            dst.mkdir(exist_ok=True, parents=True)
-            print(f"Creating folder: {dst}")
+from typing import TYPE_CHECKING, Iterable
+import argparse
+import hashlib
+import os
+import sys
+from assets import ASSET_STRATEGIES
+from cache import DEFAULT_CACHE_SIZE, RenderCache
+from depgraph import DependencyGraph
+from hashindex import HashIndex
+from manifest import BuildManifest
+from metadata import MetadataIndex, page_metadata, page_url
+from partials import Partials
+from statefile import atomic_write
+from template import read_template
+
+if TYPE_CHECKING:
+    from template import Template
+
+# the parser, worker pools, compressors and watcher are imported where they are first needed,
+# so a build with nothing to do doesn't pay for loading them
+
+
+class BuildState:
+    # what the stages of one build share: where it writes, the state the last build left behind
+    # and everything this build has published, written or removed so far
+    def __init__(
+        self,
+        template_path: Path,
+        dest_dir_path: Path,
+        manifest_path: Path,
+        incremental: bool = False,
+        listings: bool = True,
+        site_url: str = None,
+    ):
+        self.template_path = template_path
+        self.dest_dir_path = dest_dir_path
+        self.manifest_path = manifest_path
+        self.incremental = incremental
+        self.listings = listings
+        self.site_url = site_url
+
+        self.manifest = None
+        self.graph = None
+        self.previous_graph = None
+        self.partials = None
+        self.changed_partials = set()
+        self.dirty_pages = {}
+        self.template_source = ''
+        self.template_hash = ''
+        self.template_changed = False
+        self.template_reason = "template changed"
+
+        self.seen = set()
+        self.skipped = 0
+        self.stale_keys = set()
+        self.added_keys = set()
+        self.reasons = {}
+        self.pending_pages = []
+        self.pending_assets = []
+        self.bytes_copied = self.bytes_reused = 0
+        # every file written with its hash where that is already known, and the outputs removed
+        self.written = []
+        self.removed_outputs = []
+        self.published_pages = {}
+        # partials, search terms and links of every page written by this build
+        self.page_infos = {}
+
+        self.metadata_index = None
+        self.metadata_changed = False
+        self.listing_state = None
+        self.listings_changed = False
+
+    def state_path(self, name: str) -> Path:
+        return self.manifest_path.with_name(name)
+
+    def publish(self, key: str, src: Path, src_hash: str, dst: Path, output_hash: str = None) -> None:
+        if key not in self.manifest.files:
+            self.added_keys.add(key)
+        self.manifest.record(key, src, src_hash, dst.relative_to(self.dest_dir_path).as_posix())
+        self.written.append((dst, output_hash))
+
+    def publish_page(self, key: str, src: Path, src_hash: str, dst: Path, title: str, fields: dict, info: dict) -> None:
+        self.publish(key, src, src_hash, dst)
+        self.published_pages[key] = page_metadata(title, fields, dst.relative_to(self.dest_dir_path).as_posix())
+        self.graph.record(key, info['partials'], self.reasons[key])
+        self.page_infos[key] = info
+
+    def rebuild_reason(self, key: str, src_hash: str) -> str:
+        entry = self.manifest.files.get(key)
+        if not self.incremental:
+            return "full build"
+        if entry is None:
+            return "new page"
+        if entry['hash'] != src_hash:
+            return "source changed"
+        if self.template_changed:
+            return self.template_reason
+        if key in self.dirty_pages:
+            return f"partial {', '.join(self.dirty_pages[key])} changed"
+        return "output missing"
+
+    def load_metadata(self) -> MetadataIndex:
+        if self.metadata_index is None:
+            self.metadata_index = MetadataIndex.load(self.state_path('metadata.json'))
+        return self.metadata_index
+
+    def listing_outputs(self) -> Iterable[str]:
+        # listings this build left alone are known from the state the last build saved
+        if not self.listings:
+            return ()
+        if self.listing_state is None:
+            from listings import ListingState
+            self.listing_state = ListingState.load(self.state_path('listings.json'))
+        return self.listing_state.pages.keys()
+
+
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    incremental=False,
+    manifest_path=None,
+    jobs=1,
+    cache=None,
+    stream_threshold=None,
+    precompress_outputs=True,
+    asset_strategy='auto',
+    profiler=None,
+    listings=True,
+    page_size=None,
+    partials_dir=None,
+    search=True,
+    site_url=None,
+    check_links=True,
+) -> None:
+    if manifest_path is None:
+        manifest_path = dest_dir_path.parent / '.ssg' / 'manifest.json'
+    build = BuildState(template_path, dest_dir_path, manifest_path, incremental, listings, site_url)
+
+    load_previous_build(build, partials_dir)
+    load_template(build)
+    scan_content(build, dir_path_content)
+    publish_pending_assets(build, asset_strategy)
+    failed = generate_pending_pages(build, jobs, cache, stream_threshold, profiler)
+    update_metadata(build)
+    remove_stale_pages(build)
+    if listings:
+        update_listings(build, page_size)
+    if search:
+        update_search_index(build)
+    update_sitemap(build)
+    if check_links:
+        check_internal_links(build)
+    if precompress_outputs:
+        precompress_written(build)
+    if not incremental:
+        sweep_unwritten(build, precompress_outputs)
+    update_hash_index(build)
+    save_build_state(build, cache)
+
+    if failed:
+        raise ValueError(f"Failed to generate {len(failed)} pages")
+
+
+def load_previous_build(build: BuildState, partials_dir: Path = None) -> None:
+    if build.incremental:
+        # keep the existing output and only touch what the manifest says is out of date
+        build.manifest = BuildManifest.load(build.manifest_path)
+    else:
+        # everything is built again, but over the previous output so assets already in place are reused.
+        # whatever this build doesn't write is swept away at the end
+        build.manifest = BuildManifest(build.manifest_path)
+    build.dest_dir_path.mkdir(parents=True, exist_ok=True)
+
+    # which partials every page included, so a changed partial only re-renders the pages that used it
+    graph_path = build.state_path('deps.json')
+    build.previous_graph = DependencyGraph.load(graph_path)
+    # a full build records every page afresh, but what a page included last time still keys its cache entry
+    if build.incremental:
+        build.graph = build.previous_graph
+    else:
+        build.graph = DependencyGraph(graph_path, build.previous_graph.partials)
+    if partials_dir is not None:
+        build.changed_partials = build.graph.refresh_partials(partials_dir)
+        build.partials = Partials(partials_dir)
+    build.dirty_pages = build.graph.dependents(build.changed_partials)
+
+
+def load_template(build: BuildState) -> None:
+    # every page embeds the template, so a template change invalidates all of them,
+    # the hash covers the template with its partials spliced in
+    template_partials = set()
+    build.template_source = read_template(build.template_path, build.partials, template_partials)
+    build.template_hash = hashlib.sha256(build.template_source.encode()).hexdigest()
+    build.template_changed = build.manifest.template_hash != build.template_hash
+    build.manifest.template_hash = build.template_hash
+    changed = sorted(build.changed_partials.intersection(build.graph.template))
+    if changed:
+        build.template_reason = f"template partial {', '.join(changed)} changed"
+    build.graph.record_template(template_partials)
+
+
+def scan_content(build: BuildState, dir_path_content: Path) -> None:
+    manifest = build.manifest
+    # paths stay plain strings until a file turns out to need work, most files in an incremental build don't
+    content_root = os.fspath(dir_path_content)
+    dest_root = os.fspath(build.dest_dir_path)
+    for key, is_dir in list_content(content_root):
+        if is_dir:
+            dst = os.path.join(dest_root, key)
+            if not os.path.isdir(dst):
+                os.makedirs(dst, exist_ok=True)
+                print(f"Creating folder: {dst}")
+            continue
+
+        stem, suffix = os.path.splitext(key)
+        is_page = suffix == '.md'
+        src = os.path.join(content_root, key)
+        dst = os.path.join(dest_root, stem + '.html' if is_page else key)
+        build.seen.add(key)
+
+        src_hash = manifest.source_hash(key, src)
+        stale_page = is_page and (build.template_changed or key in build.dirty_pages)
+        if manifest.is_fresh(key, src_hash, dst) and not stale_page:
+            build.skipped += 1
+            continue
+
+        src, dst = Path(src), Path(dst)
+        if is_page:
+            build.reasons[key] = build.rebuild_reason(key, src_hash)
+            # pages are rendered together later so they can be spread across worker processes
+            build.pending_pages.append((src, dst, key, src_hash))
+            continue
+        build.pending_assets.append((src, dst, key, src_hash))
+    build.stale_keys = manifest.files.keys() - build.seen
+
+
+def publish_pending_assets(build: BuildState, asset_strategy: str = 'auto') -> None:
+    if not build.pending_assets:
+        return
+    from assets import publish_assets
+    asset_methods = publish_assets(
+        [(src, dst, src_hash) for src, dst, _, src_hash in build.pending_assets], asset_strategy
+    )
+    for (src, dst, key, src_hash), method in zip(build.pending_assets, asset_methods):
+        print(f"Publishing {src} to {dst} ({method})")
+        if method == 'copied':
+            build.bytes_copied += src.stat().st_size
         else:
-            if src.suffix == '.md':
-                dst = dst.with_suffix('.html')
-                generate_page(src, template_path, dst)
-            else:
-                print(f"Copying {src} to {dst}")
-                shutil.copy2(src, dst)
+            build.bytes_reused += src.stat().st_size
+        # an asset has the same bytes as its source, so the source hash is the output hash
+        build.publish(key, src, src_hash, dst, src_hash)
+
 
-    pass
+def generate_pending_pages(
+    build: BuildState, jobs: int = 1, cache: RenderCache = None, stream_threshold: int = None, profiler=None
+) -> list[Path]:
+    if not build.pending_pages:
+        return []
+    from render import STREAM_THRESHOLD, render_pages, stream_page
+    from template import Template
+    from textnode import block_cache_info
 
+    template_path = build.template_path
+    partials = build.partials
+    threshold = STREAM_THRESHOLD if stream_threshold is None else stream_threshold
+    # render time is attributed by the instrumented render_page, writing is timed around each page here
+    page_timer = profiler.page if profiler is not None else lambda path: nullcontext()
+    # the template is compiled once and shared by every page in the build
+    template = Template(build.template_source)
 
-def extract_title(markdown: str) -> str:
-    title_regex = re.compile(r"^(#) (?!#).*$", re.MULTILINE)
-    title = re.search(title_regex, markdown)
+    # very large pages are streamed straight to disk in this process so memory stays bounded
+    failed = []
+    small_pages = []
+    for src, dst, key, src_hash in build.pending_pages:
+        if src.stat().st_size < threshold:
+            small_pages.append((src, dst, key, src_hash))
+            continue
+        print(f"Streaming page from {src} to {dst} using {template_path}")
+        info = {}
+        try:
+            with page_timer(src):
+                title, fields = stream_page(src, template, dst, partials, info)
+        except Exception as e:
+            print(f"Error generating page from {src}: {type(e).__name__}: {e}")
+            failed.append(src)
+            continue
+        build.publish_page(key, src, src_hash, dst, title, fields, info)
 
-    if title:
-        return title.group().strip('# ')
+    # pages whose markdown was rendered by an earlier build come straight from the cache without parsing
+    uncached_pages = []
+    for src, dst, key, src_hash in small_pages:
+        # an unchanged page includes the same partials as last time, so their current hashes find its entry
+        record = None
+        if cache is not None:
+            partial_hashes = build.graph.partial_hashes(build.previous_graph.page_partials(key))
+            record = cache.get(cache.key(src_hash, partial_hashes))
+        if record is None:
+            uncached_pages.append((src, dst, key, src_hash))
+            continue
+        print(f"Generating page from {src} to {dst} using {template_path} (cached)")
+        with page_timer(src):
+            write_page(record['title'], record['content'], template, dst, record['fields'])
+        build.publish_page(key, src, src_hash, dst, record['title'], record['fields'], record)
+
+    rendered = render_pages([src for src, _, _, _ in uncached_pages], jobs, partials)
+    for (src, dst, key, src_hash), (_, title, content, fields, info, error) in zip(uncached_pages, rendered):
+        if error:
+            print(f"Error generating page from {src}: {error}")
+            failed.append(src)
+            continue
+        if cache is not None:
+            cache.put(
+                cache.key(src_hash, build.graph.partial_hashes(info['partials'])),
+                {'title': title, 'content': content, 'fields': fields, **info},
+            )
+        print(f"Generating page from {src} to {dst} using {template_path}")
+        with page_timer(src):
+            write_page(title, content, template, dst, fields)
+        build.publish_page(key, src, src_hash, dst, title, fields, info)
+
+    if jobs <= 1 and uncached_pages:
+        # worker processes keep their own memo, so the counters are only meaningful for serial builds
+        block_info = block_cache_info()
+        print(f"Block memo: {block_info.hits} hits, {block_info.misses} misses")
+    return failed
+
+
+def update_metadata(build: BuildState) -> None:
+    # titles, dates and tags of every page, kept up to date here so listings never re-read the sources
+    if not (build.published_pages or build.stale_keys or not build.incremental):
+        return
+    metadata_path = build.state_path('metadata.json')
+    if build.incremental:
+        metadata_index = build.load_metadata()
     else:
-        raise ValueError("Title not found")
+        metadata_index = build.metadata_index = MetadataIndex(metadata_path)
+    for key, metadata in build.published_pages.items():
+        metadata_index.update(key, metadata)
+    metadata_index.discard(build.stale_keys)
+    build.metadata_changed = metadata_index.changed
+    if build.metadata_changed or not build.incremental:
+        metadata_index.save()
+
+
+def remove_stale_pages(build: BuildState) -> None:
+    if not (build.written or build.stale_keys):
+        return
+    build.removed_outputs = build.manifest.remove_stale(build.seen, build.dest_dir_path)
+    for removed in build.removed_outputs:
+        print(f"Deleting stale file: {removed}")
+
+
+def update_listings(build: BuildState, page_size: int = None) -> None:
+    from listings import DEFAULT_PAGE_SIZE, ListingState, generate_listings
+    page_size = page_size or DEFAULT_PAGE_SIZE
+    # listings only depend on the metadata index, the template and the page size,
+    # a build that changed none of them keeps them as they are
+    if build.incremental and not (build.metadata_changed or build.template_changed):
+        build.listing_outputs()
+        # a listing deleted from the output since the last build is written again even though nothing it lists changed
+        if build.listing_state.page_size == page_size and not build.listing_state.missing(build.dest_dir_path):
+            return
+    from template import Template
+    listing_path = build.state_path('listings.json')
+    if build.listing_state is None:
+        build.listing_state = ListingState.load(listing_path) if build.incremental else ListingState(listing_path)
+    listing_written, listing_removed = generate_listings(
+        build.load_metadata().pages,
+        Template(build.template_source),
+        build.template_hash,
+        build.dest_dir_path,
+        build.listing_state,
+        {entry['output'] for entry in build.manifest.files.values()},
+        page_size,
+    )
+    build.listing_state.save()
+    build.listings_changed = bool(listing_written or listing_removed)
+    for path in listing_written:
+        print(f"Generating listing {path}")
+        build.written.append((path, None))
+    for path in listing_removed:
+        print(f"Deleting stale listing: {path}")
+    # a listing can take over the path of a page removed above
+    rewritten = set(listing_written)
+    build.removed_outputs = [path for path in build.removed_outputs + listing_removed if path not in rewritten]
+
+
+def update_search_index(build: BuildState) -> None:
+    # the search index is patched with the terms of the pages written or removed by this build,
+    # shards of terms no page gained or lost are left alone
+    search_dir = build.dest_dir_path / 'search'
+    if build.incremental and not (build.page_infos or build.stale_keys) and search_dir.is_dir():
+        return
+    from search import SearchIndex
+    search_path = build.state_path('search.json')
+    search_index = SearchIndex.load(search_path) if build.incremental else SearchIndex(search_path)
+    for key, info in build.page_infos.items():
+        metadata = build.published_pages[key]
+        if metadata.get('draft'):
+            search_index.discard([key])
+        else:
+            search_index.update(key, metadata['url'], metadata['title'], info['terms'])
+    search_index.discard(build.stale_keys)
+    if build.incremental:
+        search_index.restore(search_dir)
+    if search_index.changed or not build.incremental:
+        search_written, search_removed = search_index.write(search_dir, rebuild=not build.incremental)
+        search_index.save()
+        print(f"Search index: {len(search_written)} shards written, {len(search_removed)} removed")
+        build.written.extend((path, None) for path in search_written)
+        build.removed_outputs.extend(search_removed)
+
+
+def update_sitemap(build: BuildState) -> None:
+    sitemap_path = build.dest_dir_path / 'sitemap.xml'
+    # every url in the sitemap is absolute, so a different --site-url rewrites it even when no page changed
+    url_changed = build.manifest.site_url != build.site_url
+    if url_changed:
+        build.manifest.site_url = build.site_url
+        build.manifest.changed = True
+    if not build.site_url:
+        # a sitemap left by an earlier build with a site url goes once the url is dropped
+        if url_changed and sitemap_path.exists():
+            from compress import remove_compressed
+            sitemap_path.unlink()
+            remove_compressed(sitemap_path)
+            print(f"Deleting stale file: {sitemap_path}")
+            build.removed_outputs.append(sitemap_path)
+        return
+    unchanged = not (url_changed or build.metadata_changed or build.listings_changed)
+    if build.incremental and unchanged and sitemap_path.exists():
+        return
+    from sitemap import sitemap_entries, write_sitemap
+    listing_urls = [page_url(output) for output in build.listing_outputs()]
+    write_sitemap(sitemap_path, build.site_url, sitemap_entries(build.load_metadata().pages, listing_urls))
+    print(f"Writing sitemap {sitemap_path}")
+    build.written.append((sitemap_path, None))
+
+
+def check_internal_links(build: BuildState) -> None:
+    # links are checked against the outputs the manifest and listings know about, the html is never read back.
+    # pages that link to nothing new only need a check when an output came or went
+    outputs_changed = bool(build.added_keys or build.stale_keys or build.listings_changed) or not build.incremental
+    if not (build.page_infos or outputs_changed):
+        return
+    from links import LinkIndex, url_index
+    link_path = build.state_path('links.json')
+    link_index = LinkIndex.load(link_path) if build.incremental else LinkIndex(link_path)
+    for key, info in build.page_infos.items():
+        link_index.update(key, build.published_pages[key]['url'], info['links'])
+    link_index.discard(build.stale_keys)
+    outputs = [entry['output'] for entry in build.manifest.files.values()] + list(build.listing_outputs())
+    if build.site_url:
+        outputs.append('sitemap.xml')
+    known = url_index(outputs)
+    checked = link_index.check(known, None if outputs_changed else build.page_infos.keys())
+    broken = link_index.broken()
+    for key, urls in broken.items():
+        print(f"Broken links in {key}:")
+        for url in urls:
+            print(f"  {url}")
+    print(f"Links: {checked} checked, {sum(map(len, broken.values()))} broken in {len(broken)} pages")
+    if link_index.changed or not build.incremental:
+        link_index.save()
+
 
+def precompress_written(build: BuildState) -> None:
+    if not build.written:
+        return
+    from compress import precompress
+    # only files written by this build need new compressed variants
+    written_paths = [path for path, _ in build.written]
+    print(f"Precompressed {precompress(written_paths)} variants of {len(build.written)} written files")
 
-def generate_page(from_path: Path, template_path: Path, dest_path: Path) -> None:
+
+def sweep_unwritten(build: BuildState, precompressed: bool = True) -> None:
+    from compress import compressed_siblings
+    dest_dir_path = build.dest_dir_path
+    written = [path for path, _ in build.written]
+    if precompressed:
+        written.extend(sibling for path in list(written) for sibling in compressed_siblings(path))
+    keep = {path.relative_to(dest_dir_path).as_posix() for path in written}
+    for removed in sweep_output(dest_dir_path, keep):
+        print(f"Deleting stale file: {removed}")
+
+
+def update_hash_index(build: BuildState) -> None:
+    # the server answers conditional requests from this index without touching the files themselves
+    if not (build.written or build.removed_outputs or not build.incremental):
+        return
+    hash_index = HashIndex.load(build.state_path('hashes.json'))
+    hash_index.update(build.dest_dir_path, build.written, build.incremental)
+    hash_index.discard(build.dest_dir_path, build.removed_outputs)
+    hash_index.save()
+
+
+def save_build_state(build: BuildState, cache: RenderCache = None) -> None:
+    if build.incremental:
+        print(f"Skipped {build.skipped} unchanged files")
+    print(f"Assets: {build.bytes_copied} bytes copied, {build.bytes_reused} bytes linked or reused")
+    if build.manifest.changed or build.template_changed:
+        build.manifest.save()
+    build.graph.discard(build.stale_keys)
+    if build.graph.changed:
+        build.graph.save()
+    if cache is not None:
+        if cache.stores:
+            cache.prune()
+        print(cache.summary())
+
+
+def sweep_output(dest_dir_path: Path, keep: set[str]) -> list[Path]:
+    removed = []
+    # directories are only removed when this emptied them, empty folders copied from the content stay
+    emptied = set()
+    for root, _, files in os.walk(dest_dir_path, topdown=False):
+        relative = os.path.relpath(root, dest_dir_path).replace(os.sep, '/')
+        prefix = '' if relative == '.' else relative + '/'
+        for name in files:
+            if prefix + name not in keep:
+                path = Path(root, name)
+                path.unlink()
+                removed.append(path)
+                emptied.add(root)
+        if root in emptied and relative != '.' and not os.listdir(root):
+            os.rmdir(root)
+            emptied.add(os.path.dirname(root))
+    return removed
+
+
+def list_content(dir_path_content: Path | str) -> list[tuple[str, bool]]:
+    # scandir reports file types from the directory listing itself, so walking the tree needs no stat per entry
+    entries = []
+    stack = ['']
+    while stack:
+        relative = stack.pop()
+        with os.scandir(os.path.join(dir_path_content, relative)) as listing:
+            for entry in listing:
+                key = f"{relative}/{entry.name}" if relative else entry.name
+                is_dir = entry.is_dir()
+                entries.append((key, is_dir))
+                if is_dir:
+                    stack.append(key)
+    # sorted by path components, so a directory always comes before what it contains
+    entries.sort(key=lambda entry: entry[0].split('/'))
+    return entries
+
+
+def generate_page(from_path: Path, template_path: Path, dest_path: Path, partials_dir: Path = None) -> None:
+    from render import render_page
+    from template import Template
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
 
-    with open(from_path, 'r', encoding="utf-8") as f:
-        markdown = f.read()
-    with open(template_path, 'r', encoding="utf-8") as f:
-        template = f.read()
+    partials = Partials(partials_dir) if partials_dir is not None else None
+    title, content, fields = render_page(from_path, partials)
+    write_page(title, content, Template.load(template_path, partials), dest_path, fields)
+
 
-    title = extract_title(markdown)
-    content = markdown_to_html_node(markdown).to_html()
+def find_content_key(path: str, dir_path_content: Path, dest_dir_path: Path, manifest: BuildManifest) -> str:
+    # a page can be named by its content key, its source path or its output path
+    if path in manifest.files:
+        return path
+    candidate = Path(path)
+    if candidate.is_relative_to(dir_path_content):
+        return candidate.relative_to(dir_path_content).as_posix()
+    if candidate.is_relative_to(dest_dir_path):
+        candidate = candidate.relative_to(dest_dir_path)
+    outputs = {entry['output']: key for key, entry in manifest.files.items()}
+    return outputs.get(candidate.as_posix(), path)
 
-    html_page = template.replace("{{ Title }}", title).replace("{{ Content }}", content)
 
-    dest_path.touch()
-    with open(dest_path, "w", encoding="utf-8") as f:
-        f.write(html_page)
+def write_page(title: str, content: str, template: 'Template', dest_path: Path, fields: dict = None) -> None:
+    from render import page_values
+    # renamed into place, so a server holding the old file open keeps sending it whole
+    with atomic_write(dest_path) as f:
+        template.write(f, page_values(title, content, fields or {}))
 
-    pass
 
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Static site generator")
+    parser.add_argument("--content", type=Path, help="Directory of markdown pages and assets", default="content")
+    parser.add_argument(
+        "--template", type=Path, help="HTML template every page is rendered into", default="template.html"
+    )
+    parser.add_argument("--dest", type=Path, help="Directory the site is written to", default="public")
+    parser.add_argument(
+        "--partials",
+        type=Path,
+        help="Directory of fragments included with {{> name }} from pages and the template",
+        default="partials",
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=Path,
+        help="Directory for the build manifest, render cache and indexes (default: .ssg next to --dest)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rebuild pages whose source or template changed since the last build",
+    )
+    parser.add_argument(
+        "--jobs", type=int, help="Number of worker processes used to render pages", default=1
+    )
+    parser.add_argument(
+        "--stream-threshold",
+        type=int,
+        help="Pages of at least this many MiB are streamed block by block instead of read into memory (default: 8)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Render every page instead of reusing cached html"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        help="Maximum size of the render cache in MiB",
+        default=DEFAULT_CACHE_SIZE // 2**20,
+    )
+    parser.add_argument(
+        "--assets",
+        choices=ASSET_STRATEGIES,
+        help=(
+            "How static assets are published: reflink with a copy fallback (auto), always copy, or hardlink. "
+            "reflink is the same as auto"
+        ),
+        default='auto',
+    )
+    parser.add_argument(
+        "--no-precompress",
+        action="store_true",
+        help="Don't write compressed .gz (and .zst where available) variants next to text outputs",
+    )
+    parser.add_argument(
+        "--no-listings",
+        action="store_true",
+        help="Don't generate the archive, tag and directory listing pages",
+    )
+    parser.add_argument(
+        "--page-size", type=int, help="Number of entries on each listing page (default: 20)"
+    )
+    parser.add_argument(
+        "--no-search", action="store_true", help="Don't write the sharded search index to search/ in the output"
+    )
+    parser.add_argument(
+        "--site-url",
+        type=str,
+        help="Absolute url the site is served from, e.g. https://example.com, sitemap.xml is only written with it",
+    )
+    parser.add_argument(
+        "--no-link-check", action="store_true", help="Don't check internal links and images against the outputs"
+    )
+    parser.add_argument(
+        "--why",
+        type=str,
+        metavar="PAGE",
+        help="Print why a page was last rebuilt and what it depends on, then exit without building",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and incrementally rebuild whenever content or the template changes",
+    )
+    parser.add_argument(
+        "--watch-interval", type=float, help="Seconds between checks for changes in watch mode", default=0.5
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time every pipeline stage and page of the first build and write profile.json to the state dir",
+    )
+    parser.add_argument(
+        "--profile-top", type=int, help="Number of slowest pages printed with --profile", default=10
+    )
+    parser.add_argument(
+        "--profile-trace", type=str, help="Also write a Chrome trace-event file to this path with --profile"
+    )
+    args = parser.parse_args(argv)
+
+    state_dir = args.state_dir if args.state_dir is not None else args.dest.parent / '.ssg'
+    if args.why is not None:
+        graph = DependencyGraph.load(state_dir / 'deps.json')
+        key = find_content_key(args.why, args.content, args.dest, BuildManifest.load(state_dir / 'manifest.json'))
+        if key not in graph.pages:
+            parser.error(f"no build record for {args.why}")
+        print('\n'.join(graph.explain(key, args.template, args.partials)))
+        return
+
+    cache = None
+    if not args.no_cache:
+        cache = RenderCache(state_dir / 'render-cache', args.cache_size * 2**20)
+    build = partial(
+        generate_pages_recursive,
+        args.content,
+        args.template,
+        args.dest,
+        manifest_path=state_dir / 'manifest.json',
+        jobs=args.jobs,
+        cache=cache,
+        stream_threshold=args.stream_threshold * 2**20 if args.stream_threshold is not None else None,
+        precompress_outputs=not args.no_precompress,
+        asset_strategy=args.assets,
+        listings=not args.no_listings,
+        page_size=args.page_size,
+        partials_dir=args.partials,
+        search=not args.no_search,
+        site_url=args.site_url,
+        check_links=not args.no_link_check,
+    )
+    try:
+        if args.profile:
+            from profiler import Profiler, instrument_build
+            profiler = Profiler(trace=args.profile_trace is not None)
+            # the instrumented functions only exist in this process, so pages are rendered serially
+            if args.jobs > 1:
+                print("Profiling renders pages serially, ignoring --jobs")
+            instrument_build(profiler, sys.modules[__name__])
+            try:
+                build(incremental=args.incremental, jobs=1, profiler=profiler)
+            finally:
+                profiler.restore()
+                print(profiler.summary(args.profile_top))
+                profiler.save(state_dir / 'profile.json')
+                if args.profile_trace is not None:
+                    profiler.save_trace(Path(args.profile_trace))
+        else:
+            build(incremental=args.incremental)
+    except Exception as e:
+        if not args.watch:
+            raise
+        # a broken page shouldn't stop --watch before it starts, fixing it triggers the next build
+        print(f"Build failed: {type(e).__name__}: {e}")
 
-def main():
-    public_dir_path = Path("../public")
-    content_dir_path = Path("../content")
-    html_template_file = Path("../template.html")
-    generate_pages_recursive(content_dir_path, html_template_file, public_dir_path)
+    if args.watch:
+        from watch import watch
+        try:
+            watch(partial(build, incremental=True), [args.content, args.template, args.partials], args.watch_interval)
+        except KeyboardInterrupt:
+            print("Stopped watching")
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from pathlib import Path
+import hashlib
+import os
+from statefile import load_state, write_json
+
+
+MANIFEST_VERSION = 1
+
+
+def file_digest(path: Path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, path: Path, template_hash: str = None, files: dict = None, site_url: str = None):
+        self.path = path
+        self.template_hash = template_hash
+        self.files = files if files is not None else {}
+        self.site_url = site_url
+        # set whenever an entry is added, refreshed or removed, so builds that change nothing skip the save
+        self.changed = False
+
+    @classmethod
+    def load(cls, path: Path) -> 'BuildManifest':
+        data = load_state(path, MANIFEST_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get('template'), data.get('files', {}), data.get('site_url'))
+
+    def save(self) -> None:
+        data = {
+            'version': MANIFEST_VERSION,
+            'template': self.template_hash,
+            'site_url': self.site_url,
+            'files': self.files,
+        }
+        write_json(self.path, data, sort_keys=True)
+        self.changed = False
+
+    def source_hash(self, key: str, src: Path | str) -> str:
+        # reuse the recorded hash when size and mtime are unchanged, so unchanged trees are never re-read
+        stat = os.stat(src)
+        entry = self.files.get(key)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return entry['hash']
+        digest = file_digest(src)
+        if entry and entry['hash'] == digest:
+            # a touched but unchanged file gets its new mtime recorded, so the next build doesn't read it again
+            entry['mtime_ns'] = stat.st_mtime_ns
+            entry['size'] = stat.st_size
+            self.changed = True
+        return digest
+
+    def is_fresh(self, key: str, src_hash: str, dst: Path | str) -> bool:
+        entry = self.files.get(key)
+        return entry is not None and entry['hash'] == src_hash and os.path.exists(dst)
+
+    def record(self, key: str, src: Path, src_hash: str, output: str) -> None:
+        stat = os.stat(src)
+        self.files[key] = {
+            'hash': src_hash,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'output': output,
+        }
+        self.changed = True
+
+    def remove_stale(self, seen: set[str], dest_dir_path: Path) -> list[Path]:
+        # compress pulls in the codecs, which a build that removes nothing never needs
+        from compress import remove_compressed
+        removed = []
+        for key in sorted(set(self.files) - seen):
+            output = dest_dir_path / self.files.pop(key)['output']
+            self.changed = True
+            output.unlink(missing_ok=True)
+            # variants derived from the output, such as compressed copies, go with it
+            remove_compressed(output)
+            removed.append(output)
+            # drop directories left empty by the removal, but never the destination root itself
+            parent = output.parent
+            while parent != dest_dir_path and parent.is_dir() and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
+        return removed
@@ -0,0 +1,48 @@
+from pathlib import Path
+from statefile import load_state, write_json
+
+
+METADATA_INDEX_VERSION = 1
+
+
+def page_url(output: str) -> str:
+    # index pages are served as their directory
+    if output == 'index.html':
+        return '/'
+    if output.endswith('/index.html'):
+        return '/' + output[:-len('index.html')]
+    return '/' + output
+
+
+def page_metadata(title: str, fields: dict, output: str) -> dict:
+    url = page_url(output)
+    slug = url.rstrip('/').rsplit('/', 1)[-1].removesuffix('.html') or 'index'
+    return {**fields, 'title': title, 'url': url, 'slug': str(fields.get('slug', slug))}
+
+
+class MetadataIndex:
+    def __init__(self, path: Path, pages: dict = None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.changed = False
+
+    @classmethod
+    def load(cls, path: Path) -> 'MetadataIndex':
+        data = load_state(path, METADATA_INDEX_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get('pages', {}))
+
+    def save(self) -> None:
+        write_json(self.path, {'version': METADATA_INDEX_VERSION, 'pages': self.pages})
+        self.changed = False
+
+    def update(self, key: str, metadata: dict) -> None:
+        if self.pages.get(key) != metadata:
+            self.pages[key] = metadata
+            self.changed = True
+
+    def discard(self, keys) -> None:
+        for key in keys:
+            if self.pages.pop(key, None) is not None:
+                self.changed = True
@@ -0,0 +1,121 @@
+from pathlib import Path
+from typing import TextIO
+import os
+import posixpath
+import re
+
+
+PARTIAL_REGEX = re.compile(r"\{\{> *([\w./-]+) *\}\}")
+TEMPLATE_SUFFIX = '.html'
+MARKDOWN_SUFFIX = '.md'
+CODE_FENCE = '```'
+
+
+class Partials:
+    def __init__(self, root: Path | str):
+        self.root = root
+        self.sources = {}
+        # --partials has a default, so includes are only expanded for a site that has the directory
+        self.exists = os.path.isdir(root)
+
+    def candidates(self, name: str, suffix: str) -> tuple[str, str]:
+        # only files list_partials can see are tracked as dependencies, so names may not leave the root
+        name = posixpath.normpath(name)
+        if name == '..' or name.startswith(('../', '/')):
+            raise ValueError(f"Partial outside the partials directory: {name}")
+        # "{{> footer }}" finds footer.md from markdown and footer.html from a template
+        return name + suffix, name
+
+    def resolve(self, name: str, suffix: str) -> str:
+        for candidate in self.candidates(name, suffix):
+            if os.path.isfile(os.path.join(self.root, candidate)):
+                return candidate
+        raise ValueError(f"Partial not found: {name}")
+
+    def read(self, name: str) -> str:
+        if name not in self.sources:
+            with open(os.path.join(self.root, name), 'r', encoding="utf-8") as f:
+                # the newline every editor leaves at the end would otherwise break inline includes
+                self.sources[name] = f.read().removesuffix('\n')
+        return self.sources[name]
+
+    def expand(
+        self, text: str, suffix: str, used: set[str] = None, stack: tuple[str, ...] = (), in_code: bool = False
+    ) -> str:
+        if '{{>' not in text:
+            return text
+
+        def include(match: re.Match) -> str:
+            if not self.exists:
+                # left as written, but every file the include could resolve to is recorded as used,
+                # so creating the partial later invalidates the page like editing one would
+                candidates = self.candidates(match.group(1), suffix)
+                if used is not None:
+                    used.update(candidates)
+                return match.group()
+            name = self.resolve(match.group(1), suffix)
+            if name in stack:
+                raise ValueError(f"Partial include cycle: {' -> '.join(stack + (name,))}")
+            if used is not None:
+                used.add(name)
+            return self.expand(self.read(name), suffix, used, stack + (name,))
+
+        if suffix != MARKDOWN_SUFFIX:
+            return PARTIAL_REGEX.sub(include, text)
+        # includes inside code blocks are left as written, that's how a page shows the syntax itself
+        parts = text.split(CODE_FENCE)
+        start = 1 if in_code else 0
+        parts[start::2] = [PARTIAL_REGEX.sub(include, part) for part in parts[start::2]]
+        return CODE_FENCE.join(parts)
+
+
+class IncludingReader:
+    # file-like wrapper for streamed pages, includes are expanded line by line so a tag is never split
+    # across two chunks
+    def __init__(self, fp: TextIO, partials: Partials, used: set[str] = None):
+        self.fp = fp
+        self.partials = partials
+        self.used = used
+        # whether the last line read left a code block open
+        self.in_code = False
+
+    def readline(self) -> str:
+        line = self.fp.readline()
+        fences = line.count(CODE_FENCE)
+        line = self.partials.expand(line, MARKDOWN_SUFFIX, self.used, in_code=self.in_code)
+        self.in_code ^= fences % 2 == 1
+        return line
+
+    def __iter__(self):
+        return iter(self.readline, '')
+
+    def read(self, size: int = -1) -> str:
+        lines = []
+        total = 0
+        while size < 0 or total < size:
+            line = self.readline()
+            if not line:
+                break
+            lines.append(line)
+            total += len(line)
+        return ''.join(lines)
+
+
+def list_partials(root: Path | str) -> dict[str, tuple[int, int]]:
+    partials = {}
+    stack = ['']
+    while stack:
+        prefix = stack.pop()
+        try:
+            with os.scandir(os.path.join(root, prefix)) as entries:
+                for entry in entries:
+                    name = prefix + entry.name
+                    if entry.is_dir():
+                        stack.append(name + '/')
+                    else:
+                        stat = entry.stat()
+                        partials[name] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            # a site without a partials directory simply has no partials
+            continue
+    return partials
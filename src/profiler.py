@@ -0,0 +1,163 @@
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+import os
+import time
+import assets
+import cache
+import compress
+import htmlnode
+import manifest
+import render
+import template
+import textnode
+from statefile import write_json
+
+
+PROFILE_VERSION = 1
+
+
+class Profiler:
+    def __init__(self, trace: bool = False):
+        self.started = time.perf_counter()
+        # name -> [seconds, calls]
+        self.stages = {}
+        # page -> {'seconds': float, 'stages': {name: [seconds, calls]}}
+        self.pages = {}
+        self.events = [] if trace else None
+        self.current_page = None
+        self.patched = []
+
+    def add(self, name: str, started: float, elapsed: float) -> None:
+        totals = self.stages.setdefault(name, [0.0, 0])
+        totals[0] += elapsed
+        totals[1] += 1
+        if self.current_page is not None:
+            totals = self.pages[self.current_page]['stages'].setdefault(name, [0.0, 0])
+            totals[0] += elapsed
+            totals[1] += 1
+        if self.events is not None:
+            self.events.append({
+                'name': name,
+                'ph': 'X',
+                'ts': (started - self.started) * 1e6,
+                'dur': elapsed * 1e6,
+                'pid': os.getpid(),
+                'tid': 0,
+                'args': {'page': self.current_page} if self.current_page is not None else {},
+            })
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, started, time.perf_counter() - started)
+
+    @contextmanager
+    def page(self, path: Path):
+        key = str(path)
+        entry = self.pages.setdefault(key, {'seconds': 0.0, 'stages': {}})
+        previous = self.current_page
+        self.current_page = key
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            entry['seconds'] += elapsed
+            self.current_page = previous
+            if self.events is not None:
+                self.events.append({
+                    'name': key, 'ph': 'X', 'ts': (started - self.started) * 1e6, 'dur': elapsed * 1e6,
+                    'pid': os.getpid(), 'tid': 0, 'cat': 'page',
+                })
+
+    def instrument(self, owner, name: str, stage: str = None, page_arg: int = None) -> None:
+        original = getattr(owner, name)
+        stage = stage or name
+        own = vars(owner).get(name)
+        self.patched.append((owner, name, own))
+
+        # a plain start/stop pair instead of a context manager keeps the overhead on hot functions low
+        def timed(*args, **kwargs):
+            if page_arg is not None:
+                with self.page(args[page_arg]):
+                    started = time.perf_counter()
+                    try:
+                        return original(*args, **kwargs)
+                    finally:
+                        self.add(stage, started, time.perf_counter() - started)
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.add(stage, started, time.perf_counter() - started)
+
+        timed.__wrapped__ = original
+        setattr(owner, name, timed)
+
+    def restore(self) -> None:
+        while self.patched:
+            owner, name, own = self.patched.pop()
+            if own is None:
+                # the attribute was inherited, removing the wrapper uncovers the base class version again
+                delattr(owner, name)
+            else:
+                setattr(owner, name, own)
+
+    def slowest_pages(self, count: int = 10) -> list[tuple[str, float]]:
+        pages = sorted(self.pages.items(), key=lambda item: item[1]['seconds'], reverse=True)
+        return [(page, entry['seconds']) for page, entry in pages[:count]]
+
+    def report(self) -> dict:
+        def stage_totals(stages: dict) -> dict:
+            return {name: {'seconds': seconds, 'calls': calls} for name, (seconds, calls) in stages.items()}
+
+        return {
+            'version': PROFILE_VERSION,
+            'total_seconds': time.perf_counter() - self.started,
+            'stages': stage_totals(self.stages),
+            'pages': {
+                page: {'seconds': entry['seconds'], 'stages': stage_totals(entry['stages'])}
+                for page, entry in self.pages.items()
+            },
+        }
+
+    def summary(self, top: int = 10) -> str:
+        report = self.report()
+        lines = [f"Profile: {report['total_seconds']:.3f} s total (stages are inclusive and may nest)"]
+        for name, totals in sorted(report['stages'].items(), key=lambda item: item[1]['seconds'], reverse=True):
+            lines.append(f"  {name:<22} {totals['seconds']:>9.4f} s {totals['calls']:>9} calls")
+        if self.pages:
+            lines.append(f"Slowest {min(top, len(self.pages))} pages:")
+            for page, seconds in self.slowest_pages(top):
+                lines.append(f"  {seconds * 1000:>9.2f} ms  {page}")
+        return '\n'.join(lines)
+
+    def save(self, path: Path) -> None:
+        write_json(path, self.report(), indent=1, separators=(',', ': '))
+
+    def save_trace(self, path: Path) -> None:
+        # the trace event format loads directly in chrome://tracing and perfetto
+        write_json(path, {'traceEvents': self.events or [], 'displayTimeUnit': 'ms'}, indent=1, separators=(',', ': '))
+
+
+def instrument_build(profiler: Profiler, build_module: ModuleType) -> None:
+    # functions are patched where they are looked up, so names imported with from-imports are patched on the importer
+    profiler.instrument(render, 'render_page', 'render', page_arg=0)
+    profiler.instrument(render, 'read_markdown', 'read')
+    profiler.instrument(render, 'markdown_to_html_node', 'markdown_to_html_node')
+    profiler.instrument(textnode, 'markdown_to_blocks')
+    profiler.instrument(textnode, 'block_to_block_type')
+    profiler.instrument(textnode, 'text_to_textnodes')
+    profiler.instrument(htmlnode.ParentNode, 'to_html')
+    profiler.instrument(template.Template, 'write', 'template')
+    profiler.instrument(manifest.BuildManifest, 'source_hash', 'hash')
+    profiler.instrument(cache.RenderCache, 'get', 'cache')
+    profiler.instrument(cache.RenderCache, 'put', 'cache')
+    profiler.instrument(render, 'stream_page', 'stream')
+    profiler.instrument(assets, 'publish_assets', 'assets')
+    profiler.instrument(compress, 'precompress', 'precompress')
+    profiler.instrument(build_module, 'write_page', 'write')
@@ -0,0 +1,140 @@
+from itertools import repeat
+from pathlib import Path
+from typing import Iterator
+import re
+from frontmatter import read_front_matter, slot_values, split_front_matter
+from links import page_links
+from partials import MARKDOWN_SUFFIX, IncludingReader, Partials
+from search import page_terms
+from statefile import atomic_write
+from template import Template
+from textnode import iter_markdown_html, markdown_to_html_node
+
+
+TITLE_REGEX = re.compile(r"^(#) (?!#).*$", re.MULTILINE)
+
+# pages at least this large are streamed block by block instead of being read into memory
+STREAM_THRESHOLD = 8 * 2**20
+
+
+def extract_title(markdown: str) -> str:
+    title = TITLE_REGEX.search(markdown)
+
+    if title:
+        return title.group().strip('# ')
+    else:
+        raise ValueError("Title not found")
+
+
+def extract_title_from_file(from_path: Path, partials: Partials = None) -> str:
+    with open(from_path, 'r', encoding="utf-8") as f:
+        # yaml comments look like headings, so the scan starts after the front matter
+        read_front_matter(f)
+        # includes are expanded as in the body, so a heading from a partial is found like render_page finds it
+        for line in IncludingReader(f, partials) if partials is not None else f:
+            title = TITLE_REGEX.search(line)
+            if title:
+                return title.group().strip('# ')
+    raise ValueError("Title not found")
+
+
+def front_matter_title(fields: dict) -> str | None:
+    # an empty or list-valued title is treated as no title at all, the first heading is used instead
+    title = fields.get('title')
+    if isinstance(title, bool) or not isinstance(title, (str, int)):
+        return None
+    title = str(title).strip()
+    return title or None
+
+
+def page_title(fields: dict, markdown: str) -> str:
+    # a title from front matter saves scanning the whole body for the first heading
+    title = front_matter_title(fields)
+    return title if title is not None else extract_title(markdown)
+
+
+def page_values(title: str, content, fields: dict) -> dict:
+    # front matter fields fill the template slots of the same name, but never replace the title or content
+    return {**slot_values(fields), "Title": title, "Content": content}
+
+
+def page_info(used: set[str], terms: set[str], links: set[str]) -> dict:
+    # what the build keeps about a page besides its html, cached along with it
+    return {'partials': sorted(used), 'terms': sorted(terms), 'links': sorted(links)}
+
+
+def index_node(node, terms: set[str], links: set[str]) -> None:
+    page_terms(node, terms)
+    page_links(node, links)
+
+
+def stream_page(
+    from_path: Path, template: Template, dest_path: Path, partials: Partials = None, info: dict = None
+) -> tuple[str, dict]:
+    used, terms, links = set(), set(), set()
+    try:
+        with open(from_path, 'r', encoding="utf-8") as src, atomic_write(dest_path) as dst:
+            fields = read_front_matter(src)
+            # the title sits in front of the content in the template, so it is found in a first cheap pass
+            title = front_matter_title(fields)
+            if title is None:
+                title = extract_title_from_file(from_path, partials)
+            body = IncludingReader(src, partials, used) if partials is not None else src
+            content = iter_markdown_html(body, lambda node: index_node(node, terms, links))
+            template.write(dst, page_values(title, content, fields))
+    except Exception:
+        dest_path.unlink(missing_ok=True)
+        raise
+    if info is not None:
+        info.update(page_info(used, terms, links))
+    return title, fields
+
+
+def read_markdown(from_path: Path) -> str:
+    with open(from_path, 'r', encoding="utf-8") as f:
+        return f.read()
+
+
+def render_page(from_path: Path, partials: Partials = None, info: dict = None) -> tuple[str, str, dict]:
+    used = set()
+    fields, markdown = split_front_matter(read_markdown(from_path))
+    if partials is not None:
+        markdown = partials.expand(markdown, MARKDOWN_SUFFIX, used)
+    title = page_title(fields, markdown)
+    node = markdown_to_html_node(markdown)
+    content = node.to_html()
+    if info is not None:
+        terms, links = set(), set()
+        index_node(node, terms, links)
+        info.update(page_info(used, terms, links))
+    return title, content, fields
+
+
+def _render_page_or_error(from_path: Path, partials: Partials = None) -> tuple[str, str, dict, dict, str]:
+    # exceptions are returned rather than raised so one bad page doesn't abort the rest of a chunk
+    info = {}
+    try:
+        title, content, fields = render_page(from_path, partials, info)
+    except Exception as e:
+        return None, None, None, None, f"{type(e).__name__}: {e}"
+    return title, content, fields, info, None
+
+
+def render_pages(
+    paths: list[Path], jobs: int = 1, partials: Partials = None
+) -> Iterator[tuple[Path, str, str, dict, dict, str]]:
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield path, *_render_page_or_error(path, partials)
+        return
+
+    # process pools pull in multiprocessing, which costs more to import than a small serial build takes
+    from concurrent.futures import ProcessPoolExecutor
+
+    # a few chunks per worker keeps the pool balanced without paying pickling costs per page
+    chunksize = max(1, min(64, len(paths) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # map yields results in submission order, so the output matches a serial build
+        results = executor.map(_render_page_or_error, paths, repeat(partials), chunksize=chunksize)
+        for path, result in zip(paths, results):
+            yield path, *result
@@ -0,0 +1,150 @@
+from pathlib import Path
+import json
+import os
+import re
+from compress import remove_compressed
+from htmlnode import HTMLNode
+from statefile import load_state, write_json
+
+
+SEARCH_INDEX_VERSION = 1
+TERM_REGEX = re.compile(r"[^\W_]{2,32}")
+# page ids per shard of the page table, the client loads one to turn a hit into a title and url
+PAGES_PER_SHARD = 1000
+
+
+def page_terms(node: HTMLNode, terms: set[str] = None) -> set[str]:
+    # only text leaves count, image alt text and urls are not what readers search for
+    terms = set() if terms is None else terms
+    # one regex pass over all the text beats one per leaf, most leaves are a word or two
+    text = '\n'.join([leaf.value for leaf in node.iter_leaves() if leaf.value and leaf.tag != 'img'])
+    terms.update(TERM_REGEX.findall(text.casefold()))
+    return terms
+
+
+def term_shard(term: str) -> str:
+    # sharded by prefix, so the client fetches one small file for the first two letters typed
+    prefix = term[:2]
+    return prefix if prefix.isascii() and prefix.isalnum() else f"u{ord(term[0]):x}"
+
+
+class SearchIndex:
+    def __init__(self, path: Path, pages: dict = None, next_id: int = 0):
+        self.path = path
+        # the forward index, the id, url, title and terms every page was last indexed with,
+        # so an edit only touches the shards of the terms it added or dropped
+        self.pages = pages if pages is not None else {}
+        # page ids are never reused, so a shard written by an earlier build can't point at the wrong page
+        self.next_id = next_id
+        self.changes = {}
+        self.dirty_pages = set()
+
+    @classmethod
+    def load(cls, path: Path) -> 'SearchIndex':
+        data = load_state(path, SEARCH_INDEX_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get('pages', {}), data.get('next_id', 0))
+
+    def save(self) -> None:
+        write_json(self.path, {'version': SEARCH_INDEX_VERSION, 'pages': self.pages, 'next_id': self.next_id})
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.changes or self.dirty_pages)
+
+    def change(self, term: str, page_id: int, present: bool) -> None:
+        self.changes.setdefault(term_shard(term), {}).setdefault(term, {})[page_id] = present
+
+    def update(self, key: str, url: str, title: str, terms) -> None:
+        entry = self.pages.get(key)
+        if entry is None:
+            entry = self.pages[key] = {'id': self.next_id, 'url': None, 'title': None, 'terms': []}
+            self.next_id += 1
+        page_id = entry['id']
+        if (entry['url'], entry['title']) != (url, title):
+            entry['url'], entry['title'] = url, title
+            self.dirty_pages.add(page_id // PAGES_PER_SHARD)
+        old, new = set(entry['terms']), set(terms)
+        for term in new - old:
+            self.change(term, page_id, True)
+        for term in old - new:
+            self.change(term, page_id, False)
+        entry['terms'] = sorted(new)
+
+    def discard(self, keys) -> None:
+        for key in keys:
+            entry = self.pages.pop(key, None)
+            if entry is None:
+                continue
+            self.dirty_pages.add(entry['id'] // PAGES_PER_SHARD)
+            for term in entry['terms']:
+                self.change(term, entry['id'], False)
+
+    def restore(self, out_dir: Path) -> None:
+        # shards deleted since the last build are rebuilt whole from the forward index, patching only what
+        # changed would otherwise leave them missing for good
+        def listed(path: Path) -> set[str]:
+            try:
+                return set(os.listdir(path))
+            except FileNotFoundError:
+                return set()
+
+        term_files, page_files = listed(out_dir / 'terms'), listed(out_dir / 'pages')
+        # the shard only depends on the first two characters, so each prefix is looked up once
+        missing = {}
+        for entry in self.pages.values():
+            page_id = entry['id']
+            if f"{page_id // PAGES_PER_SHARD}.json" not in page_files:
+                self.dirty_pages.add(page_id // PAGES_PER_SHARD)
+            for term in entry['terms']:
+                prefix = term[:2]
+                if prefix not in missing:
+                    missing[prefix] = f"{term_shard(term)}.json" not in term_files
+                if missing[prefix]:
+                    self.change(term, page_id, True)
+
+    def write(self, out_dir: Path, rebuild: bool = False) -> tuple[list[Path], list[Path]]:
+        written, removed = [], []
+
+        def read_shard(path: Path) -> dict:
+            try:
+                with open(path, 'r', encoding="utf-8") as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                return {}
+
+        def replace_shard(path: Path, data: dict) -> None:
+            if data:
+                write_json(path, data, sort_keys=True, ensure_ascii=False)
+                written.append(path)
+            elif path.exists():
+                path.unlink()
+                remove_compressed(path)
+                removed.append(path)
+
+        # only shards holding a changed term are read and rewritten, the rest of the index stays on disk untouched
+        for shard, changes in sorted(self.changes.items()):
+            path = out_dir / 'terms' / f'{shard}.json'
+            # a rebuilt index numbers its pages afresh, so shards left by an earlier build are never merged
+            postings = {} if rebuild else read_shard(path)
+            for term, presence in changes.items():
+                ids = set(postings.get(term, ()))
+                ids.update(page_id for page_id, present in presence.items() if present)
+                ids.difference_update(page_id for page_id, present in presence.items() if not present)
+                if ids:
+                    postings[term] = sorted(ids)
+                else:
+                    postings.pop(term, None)
+            replace_shard(path, postings)
+
+        if self.dirty_pages:
+            entries = {}
+            for entry in self.pages.values():
+                if entry['id'] // PAGES_PER_SHARD in self.dirty_pages:
+                    entries.setdefault(entry['id'] // PAGES_PER_SHARD, {})[entry['id']] = [entry['url'], entry['title']]
+            for shard in sorted(self.dirty_pages):
+                replace_shard(out_dir / 'pages' / f'{shard}.json', entries.get(shard, {}))
+        self.changes = {}
+        self.dirty_pages = set()
+        return written, removed
@@ -0,0 +1,34 @@
+from pathlib import Path
+from typing import Iterable, Iterator
+from xml.sax.saxutils import escape
+from statefile import atomic_write
+
+
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def iter_sitemap(site_url: str, entries: Iterable[tuple[str, str | None]]) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{SITEMAP_NAMESPACE}">\n'
+    base = site_url.rstrip('/')
+    for url, lastmod in entries:
+        line = f'<url><loc>{escape(base + url)}</loc>'
+        if lastmod:
+            line += f'<lastmod>{escape(lastmod)}</lastmod>'
+        yield line + '</url>\n'
+    yield '</urlset>\n'
+
+
+def sitemap_entries(pages: dict[str, dict], listing_urls: Iterable[str]) -> Iterator[tuple[str, str | None]]:
+    for key in sorted(pages):
+        metadata = pages[key]
+        if not metadata.get('draft'):
+            yield metadata['url'], str(metadata['date']) if metadata.get('date') else None
+    for url in sorted(listing_urls):
+        yield url, None
+
+
+def write_sitemap(path: Path, site_url: str, entries: Iterable[tuple[str, str | None]]) -> None:
+    # written line by line as entries come in, a sitemap of every page is never built up in memory
+    with atomic_write(path) as f:
+        f.writelines(iter_sitemap(site_url, entries))
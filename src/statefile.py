@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+import json
+import os
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = 'w') -> Iterator[IO]:
+    # written under a per-process sibling name and renamed into place, so an interrupted build never leaves
+    # a truncated file and two builds sharing a directory never write into the same temporary
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, mode, encoding=None if 'b' in mode else "utf-8") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_json(path: Path, data, **options) -> int:
+    options.setdefault('separators', (',', ':'))
+    with atomic_write(path) as f:
+        # dumps runs on the C encoder, dump would stream through the pure python one
+        return f.write(json.dumps(data, **options))
+
+
+def load_state(path: Path, version: int) -> dict | None:
+    # a missing or corrupt file, or one from another format version, is treated as no state at all
+    try:
+        with open(path, 'r', encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != version:
+        return None
+    return data
@@ -0,0 +1,40 @@
+from pathlib import Path
+from typing import Iterable, TextIO
+import re
+from partials import TEMPLATE_SUFFIX, Partials
+
+
+SLOT_REGEX = re.compile(r"\{\{ *(\w+) *\}\}")
+
+
+class Template:
+    def __init__(self, source: str):
+        # split leaves static text at even indexes and slot names at odd ones
+        self.parts = SLOT_REGEX.split(source)
+        self.slots = [(idx, self.parts[idx]) for idx in range(1, len(self.parts), 2)]
+
+    @classmethod
+    def load(cls, path: Path, partials: Partials = None, used: set[str] = None) -> 'Template':
+        return cls(read_template(path, partials, used))
+
+    def write(self, fp: TextIO, values: dict[str, str | Iterable[str]]) -> None:
+        for idx, part in enumerate(self.parts):
+            if idx % 2 == 0:
+                fp.write(part)
+                continue
+            value = values.get(part, '')
+            if isinstance(value, str):
+                fp.write(value)
+            else:
+                # streamed values such as page content are written chunk by chunk and can only be used once
+                fp.writelines(value)
+
+    def __repr__(self):
+        return f'Template(slots={[name for _, name in self.slots]})'
+
+
+def read_template(path: Path, partials: Partials = None, used: set[str] = None) -> str:
+    with open(path, 'r', encoding="utf-8") as f:
+        source = f.read()
+    # partials are spliced in before the slots are found, so a partial can fill slots of its own
+    return partials.expand(source, TEMPLATE_SUFFIX, used) if partials is not None else source
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from assets import output_matches, publish_asset, publish_assets
+from manifest import file_digest
+
+
+class TestPublishAsset(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.src = self.root / 'img.png'
+        self.src.write_bytes(b'\x89PNG' * 256)
+        self.src_hash = file_digest(self.src)
+        self.dst = self.root / 'public' / 'img.png'
+        self.dst.parent.mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copy_preserves_content_and_mtime(self):
+        self.assertEqual(publish_asset(self.src, self.dst, self.src_hash, 'copy'), 'copied')
+        self.assertEqual(self.dst.read_bytes(), self.src.read_bytes())
+        self.assertEqual(self.dst.stat().st_mtime_ns, self.src.stat().st_mtime_ns)
+
+    def test_matching_output_is_reused(self):
+        publish_asset(self.src, self.dst, self.src_hash, 'copy')
+        self.assertTrue(output_matches(self.src, self.dst, self.src_hash))
+        self.assertEqual(publish_asset(self.src, self.dst, self.src_hash, 'copy'), 'reused')
+
+    def test_same_size_and_mtime_but_different_bytes_is_copied(self):
+        self.dst.write_bytes(b'\x00PNG' * 256)
+        stat = self.src.stat()
+        os.utime(self.dst, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(publish_asset(self.src, self.dst, self.src_hash, 'copy'), 'copied')
+        self.assertEqual(self.dst.read_bytes(), self.src.read_bytes())
+
+    def test_hardlink(self):
+        self.assertEqual(publish_asset(self.src, self.dst, self.src_hash, 'hardlink'), 'linked')
+        self.assertTrue(os.path.samefile(self.src, self.dst))
+        self.assertEqual(publish_asset(self.src, self.dst, self.src_hash, 'hardlink'), 'reused')
+
+    def test_publish_assets_auto(self):
+        methods = publish_assets([(self.src, self.dst, self.src_hash)])
+        self.assertIn(methods[0], ('copied', 'linked'))
+        self.assertEqual(self.dst.read_bytes(), self.src.read_bytes())
+        self.assertEqual(list(self.dst.parent.iterdir()), [self.dst])
+
+
+if __name__ == '__main__':
+    unittest.main()
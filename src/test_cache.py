@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from cache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RenderCache(Path(self.tmp.name) / 'render-cache')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_then_hit(self):
+        key = RenderCache.key('abc')
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, {'title': 'Title', 'content': '<div></div>'})
+        self.assertEqual(self.cache.get(key), {'title': 'Title', 'content': '<div></div>'})
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(self.cache.hit_rate, 0.5)
+
+    def test_key_depends_on_source_hash(self):
+        self.assertNotEqual(RenderCache.key('abc'), RenderCache.key('abd'))
+        self.assertEqual(RenderCache.key('abc'), RenderCache.key('abc'))
+
+    def test_key_depends_on_partials(self):
+        self.assertEqual(RenderCache.key('abc', []), RenderCache.key('abc'))
+        self.assertNotEqual(RenderCache.key('abc', [('footer.md', '1')]), RenderCache.key('abc'))
+        self.assertNotEqual(RenderCache.key('abc', [('footer.md', '1')]), RenderCache.key('abc', [('footer.md', '2')]))
+
+    def test_prune_evicts_least_recently_used(self):
+        keys = [RenderCache.key(str(idx)) for idx in range(3)]
+        for idx, key in enumerate(keys):
+            self.cache.put(key, {'content': 'x' * 100})
+            os.utime(self.cache.entry_path(key), ns=(idx * 10**9, idx * 10**9))
+        entry_size = self.cache.entry_path(keys[0]).stat().st_size
+        self.cache.max_bytes = entry_size * 5 // 2
+
+        self.assertEqual(self.cache.prune(), 1)
+        self.assertFalse(self.cache.entry_path(keys[0]).exists())
+        self.assertTrue(self.cache.entry_path(keys[2]).exists())
+
+    def test_prune_only_walks_the_cache_when_over_budget(self):
+        self.cache.put(RenderCache.key('a'), {'content': 'x' * 100})
+        entry_size = self.cache.stored_bytes
+        self.assertEqual(entry_size, self.cache.entry_path(RenderCache.key('a')).stat().st_size)
+        self.cache.max_bytes = entry_size * 5 // 2
+        self.assertEqual(self.cache.prune(), 0)
+
+        # a later build adds to the recorded total without listing the entries
+        cache = RenderCache(self.cache.cache_dir, self.cache.max_bytes)
+        cache.put(RenderCache.key('b'), {'content': 'y' * 100})
+        with mock.patch.object(Path, 'glob', side_effect=AssertionError("walked the cache")):
+            self.assertEqual(cache.prune(), 0)
+
+        cache = RenderCache(self.cache.cache_dir, self.cache.max_bytes)
+        cache.put(RenderCache.key('c'), {'content': 'z' * 100})
+        self.assertEqual(cache.prune(), 1)
+        self.assertFalse(cache.entry_path(RenderCache.key('a')).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
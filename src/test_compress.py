@@ -0,0 +1,56 @@
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+from compress import compress_file, precompress, remove_compressed
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compress_file(self):
+        page = self.root / 'index.html'
+        page.write_text('<p>repeated text</p>' * 100, encoding="utf-8")
+        self.assertGreaterEqual(compress_file(page), 1)
+
+        compressed = self.root / 'index.html.gz'
+        self.assertEqual(gzip.decompress(compressed.read_bytes()), page.read_bytes())
+        self.assertLess(compressed.stat().st_size, page.stat().st_size)
+
+    def test_compress_file_is_reproducible(self):
+        page = self.root / 'index.html'
+        page.write_text('<p>repeated text</p>' * 100, encoding="utf-8")
+        compress_file(page)
+        first = (self.root / 'index.html.gz').read_bytes()
+        compress_file(page)
+        self.assertEqual((self.root / 'index.html.gz').read_bytes(), first)
+
+    def test_small_file_drops_stale_variant(self):
+        page = self.root / 'index.html'
+        stale = self.root / 'index.html.gz'
+        stale.write_bytes(b'stale')
+        page.write_text('<p>tiny</p>', encoding="utf-8")
+        self.assertEqual(compress_file(page), 0)
+        self.assertFalse(stale.exists())
+
+    def test_precompress_skips_binary_files(self):
+        image = self.root / 'img.png'
+        image.write_bytes(b'\x89PNG' * 1000)
+        style = self.root / 'index.css'
+        style.write_text('body { margin: 0; }\n' * 100, encoding="utf-8")
+
+        precompress([image, style])
+        self.assertFalse((self.root / 'img.png.gz').exists())
+        self.assertTrue((self.root / 'index.css.gz').exists())
+
+        remove_compressed(style)
+        self.assertFalse((self.root / 'index.css.gz').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
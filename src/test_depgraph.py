@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from depgraph import DependencyGraph
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.partials = self.root / 'partials'
+        self.partials.mkdir()
+        (self.partials / 'footer.md').write_text('footer', encoding="utf-8")
+        (self.partials / 'nav.html').write_text('nav', encoding="utf-8")
+        self.graph = DependencyGraph(self.root / '.ssg' / 'deps.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_refresh_partials(self):
+        self.assertEqual(self.graph.refresh_partials(self.partials), {'footer.md', 'nav.html'})
+        self.assertEqual(self.graph.refresh_partials(self.partials), set())
+
+        # touched without a change in content is not a change
+        os.utime(self.partials / 'footer.md', ns=(1, 1))
+        self.assertEqual(self.graph.refresh_partials(self.partials), set())
+        (self.partials / 'footer.md').write_text('new footer', encoding="utf-8")
+        (self.partials / 'nav.html').unlink()
+        self.assertEqual(self.graph.refresh_partials(self.partials), {'footer.md', 'nav.html'})
+        self.assertEqual(sorted(self.graph.partials), ['footer.md'])
+
+    def test_dependents(self):
+        self.graph.record('a.md', ['footer.md'], "full build")
+        self.graph.record('b.md', [], "full build")
+        self.graph.record('c.md', ['footer.md', 'shared/note.md'], "full build")
+        self.assertEqual(self.graph.dependents({'footer.md'}), {'a.md': ['footer.md'], 'c.md': ['footer.md']})
+        self.assertEqual(self.graph.dependents({'shared/note.md'}), {'c.md': ['shared/note.md']})
+        self.assertEqual(self.graph.dependents(set()), {})
+
+    def test_partial_hashes(self):
+        self.graph.refresh_partials(self.partials)
+        hashes = self.graph.partial_hashes(['nav.html', 'footer.md', 'missing.md'])
+        self.assertEqual([name for name, _ in hashes], ['footer.md', 'missing.md', 'nav.html'])
+        self.assertEqual(hashes[0][1], self.graph.partials['footer.md']['hash'])
+        self.assertIsNone(hashes[1][1])
+
+    def test_round_trip(self):
+        self.graph.refresh_partials(self.partials)
+        self.graph.record_template(['nav.html'])
+        self.graph.record('a.md', ['footer.md'], "new page")
+        self.assertTrue(self.graph.changed)
+        self.graph.save()
+
+        loaded = DependencyGraph.load(self.graph.path)
+        self.assertEqual(loaded.pages, {'a.md': {'partials': ['footer.md'], 'reason': "new page"}})
+        self.assertEqual(loaded.template, ['nav.html'])
+        self.assertEqual(loaded.partials, self.graph.partials)
+        loaded.record('a.md', ['footer.md'], "new page")
+        self.assertFalse(loaded.changed)
+        loaded.discard(['a.md', 'b.md'])
+        self.assertEqual(loaded.pages, {})
+
+    def test_explain(self):
+        self.graph.refresh_partials(self.partials)
+        self.graph.record_template(['nav.html'])
+        self.graph.record('a.md', ['footer.md', 'header', 'header.md'], "partial footer.md changed")
+        self.assertEqual(self.graph.explain('a.md', Path('template.html'), Path('partials')), [
+            "a.md was last rebuilt because: partial footer.md changed",
+            "It depends on:",
+            "  a.md",
+            "  template.html",
+            "  partials/nav.html (via template)",
+            "  partials/footer.md",
+            "  partials/header (not found)",
+            "  partials/header.md (not found)",
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import io
+import unittest
+from frontmatter import parse_front_matter, read_front_matter, slot_values, split_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split_front_matter(self):
+        markdown = "---\ntitle: Hello\ndate: 2024-05-01\n---\n# Hello\n\nBody"
+        fields, body = split_front_matter(markdown)
+        self.assertEqual(fields, {'title': "Hello", 'date': "2024-05-01"})
+        self.assertEqual(body, "# Hello\n\nBody")
+
+    def test_without_front_matter(self):
+        markdown = "# Title\n\n---\nnot front matter"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_unclosed_front_matter(self):
+        with self.assertRaises(ValueError) as context:
+            split_front_matter("---\ntitle: Hello\n# Hello")
+        self.assertEqual(str(context.exception), "Front matter is not closed")
+
+    def test_scalars(self):
+        fields = parse_front_matter([
+            'quoted: "a: b"',
+            "single: 'x'",
+            'count: 42',
+            'negative: -3',
+            'draft: true',
+            'published: false',
+            'version: 1.5',
+        ])
+        self.assertEqual(fields, {
+            'quoted': "a: b",
+            'single': "x",
+            'count': 42,
+            'negative': -3,
+            'draft': True,
+            'published': False,
+            'version': "1.5",
+        })
+
+    def test_lists(self):
+        fields = parse_front_matter([
+            'tags: [python, "static sites"]',
+            'authors:',
+            '  - Ada',
+            '  - Grace',
+            'empty: []',
+            'none:',
+            'after: value',
+        ])
+        self.assertEqual(fields, {
+            'tags': ["python", "static sites"],
+            'authors': ["Ada", "Grace"],
+            'empty': [],
+            'none': [],
+            'after': "value",
+        })
+
+    def test_comments_and_blank_lines(self):
+        self.assertEqual(parse_front_matter(['# comment', '', 'title: x  ']), {'title': "x"})
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError) as context:
+            parse_front_matter(['title: ok', 'not a field'])
+        self.assertEqual(str(context.exception), "Invalid front matter on line 2: 'not a field'")
+
+    def test_read_front_matter_leaves_body(self):
+        fp = io.StringIO("---\ntitle: Hello\n---\n# Body\n")
+        self.assertEqual(read_front_matter(fp), {'title': "Hello"})
+        self.assertEqual(fp.read(), "# Body\n")
+
+    def test_read_without_front_matter_rewinds(self):
+        fp = io.StringIO("# Body\n")
+        self.assertEqual(read_front_matter(fp), {})
+        self.assertEqual(fp.read(), "# Body\n")
+
+    def test_slot_values(self):
+        self.assertEqual(
+            slot_values({'tags': ["a", "b"], 'draft': False, 'count': 3}),
+            {'tags': "a, b", 'draft': "false", 'count': "3"},
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from pathlib import Path
+from hashindex import HashIndex
+from manifest import file_digest
+
+
+class TestHashIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.dest = self.root / 'public'
+        self.dest.mkdir()
+        self.page = self.dest / 'index.html'
+        self.page.write_text('<p>hello</p>', encoding="utf-8")
+        self.index_path = self.root / '.ssg' / 'hashes.json'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_update_and_round_trip(self):
+        index = HashIndex(self.index_path)
+        index.update(self.dest, [(self.page, None)], incremental=False)
+        index.save()
+
+        entry = HashIndex.load(self.index_path).files['index.html']
+        self.assertEqual(entry['hash'], file_digest(self.page))
+        self.assertEqual(entry['size'], self.page.stat().st_size)
+
+    def test_unchanged_output_keeps_last_modified(self):
+        index = HashIndex(self.index_path, {'index.html': {'hash': file_digest(self.page), 'size': 12, 'mtime': 100}})
+        index.update(self.dest, [(self.page, None)], incremental=False)
+        self.assertEqual(index.files['index.html']['mtime'], 100)
+
+        self.page.write_text('<p>changed</p>', encoding="utf-8")
+        index.update(self.dest, [(self.page, None)], incremental=False)
+        self.assertGreater(index.files['index.html']['mtime'], 100)
+
+    def test_full_build_drops_unwritten_entries(self):
+        old_entry = {'hash': 'abc', 'size': 1, 'mtime': 1}
+        index = HashIndex(self.index_path, {'old.html': old_entry})
+        index.update(self.dest, [(self.page, 'def')], incremental=True)
+        self.assertEqual(set(index.files), {'old.html', 'index.html'})
+
+        index.discard(self.dest, [self.dest / 'old.html'])
+        self.assertEqual(set(index.files), {'index.html'})
+
+        index.files['old.html'] = old_entry
+        index.update(self.dest, [(self.page, 'def')], incremental=False)
+        self.assertEqual(set(index.files), {'index.html'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -32,6 +33,12 @@ class TestLeafNode(unittest.TestCase):
             LeafNode('').to_html()
         self.assertEqual(str(context.exception), 'LeafNode must have a value')
 
+    def test_uses_slots(self):
+        test_leaf = LeafNode('abc', 'b')
+        self.assertFalse(hasattr(test_leaf, '__dict__'))
+        with self.assertRaises(AttributeError):
+            test_leaf.extra = 'value'
+
     def test_to_html_empty_tag(self):
         test_leaf = LeafNode('abc')
         self.assertEqual(test_leaf.to_html(), 'abc')
@@ -85,6 +92,60 @@ class TestParentNode(unittest.TestCase):
             '<ol><li>list item 1</li><li>list item 2</li><ol><li>nested list item 3</li></ol></ol>'
         )
 
+    def test_to_html_missing_tag(self):
+        with self.assertRaises(ValueError) as context:
+            ParentNode(None, [LeafNode("text")]).to_html()
+        self.assertEqual(str(context.exception), 'ParentNode must have a tag')
+
+    def test_to_html_invalid_nested_child(self):
+        test_parent = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError) as context:
+            test_parent.to_html()
+        self.assertEqual(str(context.exception), 'ParentNode must have children')
+
+    def test_to_html_none_child(self):
+        test_parent = ParentNode("p", [LeafNode("a"), None, LeafNode("b")])
+        with self.assertRaises(AttributeError):
+            test_parent.to_html()
+        with self.assertRaises(AttributeError):
+            list(test_parent.iter_leaves())
+
+    def test_to_html_empty_children(self):
+        with self.assertRaises(IndexError):
+            ParentNode("p", []).to_html()
+        with self.assertRaises(IndexError):
+            ParentNode("div", [ParentNode("p", [])]).to_html()
+
+    def test_write_html(self):
+        test_parent = ParentNode(
+            "ul",
+            [ParentNode("li", [LeafNode("item", "b")], {"class": "first"}), LeafNode("raw text")],
+        )
+        fp = io.StringIO()
+        test_parent.write_html(fp)
+        self.assertEqual(fp.getvalue(), '<ul><li class="first"><b>item</b></li>raw text</ul>')
+        self.assertEqual(fp.getvalue(), test_parent.to_html())
+
+    def test_to_html_many_children(self):
+        children = [LeafNode(f"item {idx}", "li") for idx in range(50000)]
+        html = ParentNode("ul", children).to_html()
+        self.assertTrue(html.startswith('<ul><li>item 0</li><li>item 1</li>'))
+        self.assertTrue(html.endswith('<li>item 49999</li></ul>'))
+
+    def test_to_html_deeply_nested(self):
+        depth = 5000
+        node = LeafNode("leaf")
+        for _ in range(depth):
+            node = ParentNode("div", [node])
+        self.assertEqual(node.to_html(), '<div>' * depth + 'leaf' + '</div>' * depth)
+
+
+    def test_iter_leaves(self):
+        link = LeafNode('link', 'a', {'href': '/x'})
+        node = ParentNode('div', [LeafNode('text'), ParentNode('p', [ParentNode('b', [link])]), LeafNode('', 'img')])
+        self.assertEqual([leaf.value for leaf in node.iter_leaves()], ['text', 'link', ''])
+        self.assertEqual(list(link.iter_leaves()), [link])
+
 
 if __name__ == '__main__':
     unittest.main()
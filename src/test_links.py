@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from pathlib import Path
+from htmlnode import LeafNode, ParentNode
+from links import LinkIndex, page_links, resolve_link, url_forms, url_index
+
+
+class TestLinks(unittest.TestCase):
+    def test_page_links(self):
+        node = ParentNode('div', [
+            ParentNode('p', [LeafNode('a', 'a', {'href': '/a.html'}), LeafNode('text')]),
+            LeafNode('', 'img', {'src': 'pic.png', 'alt': 'pic'}),
+            LeafNode('b', 'b'),
+        ])
+        self.assertEqual(page_links(node), {'/a.html', 'pic.png'})
+
+    def test_resolve_link(self):
+        self.assertEqual(resolve_link('/a.html', '/blog/post.html'), '/a.html')
+        self.assertEqual(resolve_link('other.html#top', '/blog/post.html'), '/blog/other.html')
+        self.assertEqual(resolve_link('../img.png?v=2', '/blog/post/'), '/blog/img.png')
+        self.assertEqual(resolve_link('sub/', '/blog/'), '/blog/sub/')
+        self.assertEqual(resolve_link('..', '/blog/'), '/')
+        self.assertEqual(resolve_link('/my%20page.html', '/'), '/my page.html')
+        for url in ('https://example.com', 'mailto:a@example.com', '//cdn.example.com/x.js', '#top', '?page=2'):
+            self.assertIsNone(resolve_link(url, '/'), url)
+
+    def test_url_forms(self):
+        self.assertEqual(url_forms('index.html'), ['/index.html', '/'])
+        self.assertEqual(url_forms('blog/index.html'), ['/blog/index.html', '/blog/', '/blog'])
+        self.assertEqual(url_forms('post.html'), ['/post.html', '/post'])
+        self.assertEqual(url_forms('img.png'), ['/img.png'])
+        self.assertEqual(len(url_index(['index.html', 'img.png'])), 3)
+
+
+class TestLinkIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = LinkIndex(Path(self.tmp.name) / '.ssg' / 'links.json')
+        self.index.update('index.md', '/', ['/post.html', '/missing.html', 'https://example.com'])
+        self.index.update('post.md', '/post.html', ['img.png'])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_check(self):
+        known = url_index(['index.html', 'post.html'])
+        self.assertEqual(self.index.check(known), 3)
+        self.assertEqual(self.index.broken(), {'index.md': ['/missing.html'], 'post.md': ['img.png']})
+
+        # only the given pages are checked, the others keep their last result
+        self.assertEqual(self.index.check(url_index(['index.html', 'post.html', 'img.png']), ['post.md']), 1)
+        self.assertEqual(self.index.broken(), {'index.md': ['/missing.html']})
+
+    def test_round_trip(self):
+        self.index.check(url_index(['index.html']))
+        self.index.save()
+        loaded = LinkIndex.load(self.index.path)
+        self.assertEqual(loaded.pages, self.index.pages)
+        self.assertFalse(loaded.changed)
+        loaded.update('post.md', '/post.html', ['img.png'])
+        self.assertFalse(loaded.changed)
+        loaded.discard(['post.md'])
+        self.assertEqual(list(loaded.pages), ['index.md'])
+        self.assertTrue(loaded.changed)
+
+
+if __name__ == '__main__':
+    unittest.main()
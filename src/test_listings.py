@@ -0,0 +1,154 @@
+import tempfile
+import unittest
+from pathlib import Path
+from listings import ListingState, generate_listings, paginate, plan_listings, tag_slug
+from template import Template
+
+
+def post(number: int, **fields) -> dict:
+    return {'title': f"Post {number}", 'url': f'/posts/p{number}.html', 'date': f'2024-01-{number:02}', **fields}
+
+
+class TestPlanListings(unittest.TestCase):
+    def test_paginate_counts_from_the_oldest_item(self):
+        items = [post(number) for number in range(1, 6)]
+        listings = paginate("Archive", '/archive/', items, 2)
+        self.assertEqual(list(listings), ['/archive/page/1/', '/archive/page/2/', '/archive/'])
+        self.assertEqual([item['title'] for item in listings['/archive/'].items], ["Post 5"])
+        self.assertEqual([item['title'] for item in listings['/archive/page/2/'].items], ["Post 4", "Post 3"])
+        self.assertEqual(listings['/archive/page/2/'].newer, '/archive/')
+        self.assertEqual(listings['/archive/page/2/'].older, '/archive/page/1/')
+        self.assertIsNone(listings['/archive/'].newer)
+        self.assertIsNone(listings['/archive/page/1/'].older)
+
+    def test_new_post_only_changes_the_newest_pages(self):
+        pages = {f'posts/p{number}.md': post(number) for number in range(1, 8)}
+        before = {url: listing.digest() for url, listing in plan_listings(pages, 2).items()}
+        pages['posts/p8.md'] = post(8)
+        after = {url: listing.digest() for url, listing in plan_listings(pages, 2).items()}
+        changed = sorted(url for url in after if before.get(url) != after[url])
+        self.assertEqual(changed, ['/archive/', '/posts/'])
+
+    def test_tags(self):
+        pages = {
+            'a.md': post(1, tags=["Python", "web"]),
+            'b.md': post(2, tags="python"),
+            'c.md': post(3, tags=[]),
+        }
+        listings = plan_listings(pages)
+        self.assertEqual([item['title'] for item in listings['/tags/python/'].items], ["Post 2", "Post 1"])
+        self.assertEqual(listings['/tags/python/'].title, "Tagged Python")
+        self.assertIn('/tags/web/', listings)
+        self.assertEqual(tag_slug("C++ & Rust"), 'c-rust')
+
+    def test_drafts_and_undated_pages(self):
+        pages = {
+            'index.md': {'title': "Home", 'url': '/', 'slug': 'index'},
+            'about.md': {'title': "About", 'url': '/about.html', 'slug': 'about'},
+            'posts/p1.md': post(1, draft=True),
+        }
+        listings = plan_listings(pages)
+        self.assertNotIn('/archive/', listings)
+        # the root has its own index page, so it gets no directory listing
+        self.assertEqual(list(listings), [])
+
+    def test_directory_listing(self):
+        pages = {
+            'docs/intro.md': {'title': "Intro", 'url': '/docs/intro.html'},
+            'docs/setup/index.md': {'title': "Setup", 'url': '/docs/setup/'},
+            'guide/index.md': {'title': "Guide", 'url': '/guide/'},
+            'guide/start.md': {'title': "Start", 'url': '/guide/start.html'},
+        }
+        listings = plan_listings(pages)
+        self.assertEqual(list(listings), ['/docs/', '/'])
+        self.assertEqual(sorted(item['title'] for item in listings['/docs/'].items), ["Intro", "Setup"])
+
+
+class TestGenerateListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.template = self.root / 'template.html'
+        self.template.write_text('<title>{{ Title }}</title>{{ Content }}', encoding="utf-8")
+        self.dest = self.root / 'public'
+        self.dest.mkdir()
+        self.state = ListingState(self.root / '.ssg' / 'listings.json')
+        self.pages = {f'posts/p{number}.md': post(number, tags=["news"]) for number in range(1, 4)}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def generate(self, template_hash='t1', reserved=frozenset(), page_size=2):
+        return generate_listings(
+            self.pages, Template.load(self.template), template_hash, self.dest, self.state, set(reserved), page_size
+        )
+
+    def test_writes_listings(self):
+        written, removed = self.generate()
+        self.assertIn(self.dest / 'archive' / 'index.html', written)
+        self.assertEqual(removed, [])
+        self.assertEqual(
+            (self.dest / 'archive' / 'index.html').read_text(encoding="utf-8"),
+            '<title>Archive</title><div><ul><li><a href="/posts/p3.html">Post 3</a><time> 2024-01-03</time></li></ul>'
+            '<nav><a href="/archive/page/1/">Older</a></nav></div>',
+        )
+
+    def test_unchanged_listings_are_skipped(self):
+        self.generate()
+        self.state.save()
+        self.state = ListingState.load(self.state.path)
+        self.assertEqual(self.generate(), ([], []))
+
+        self.pages['posts/p4.md'] = post(4)
+        written, _ = self.generate()
+        self.assertEqual(sorted(written), [self.dest / 'archive' / 'index.html', self.dest / 'posts' / 'index.html'])
+
+    def test_template_change_rewrites_everything(self):
+        first, _ = self.generate()
+        written, _ = self.generate(template_hash='t2')
+        self.assertEqual(sorted(written), sorted(first))
+
+    def test_page_size_change_rewrites_everything(self):
+        self.generate()
+        self.state.save()
+        self.state = ListingState.load(self.state.path)
+        written, removed = self.generate(page_size=1)
+        self.assertIn(self.dest / 'posts' / 'index.html', written)
+        self.assertIn(self.dest / 'archive' / 'page' / '2' / 'index.html', written)
+        self.assertEqual(removed, [])
+        self.assertEqual(self.state.page_size, 1)
+
+    def test_empty_title_is_listed_by_url(self):
+        self.pages['posts/p3.md']['title'] = ''
+        self.generate()
+        self.assertIn(
+            '<a href="/posts/p3.html">/posts/p3.html</a>', (self.dest / 'archive' / 'index.html').read_text(encoding="utf-8")
+        )
+
+    def test_missing_output_is_rewritten(self):
+        self.generate()
+        (self.dest / 'tags' / 'news' / 'index.html').unlink()
+        written, _ = self.generate()
+        self.assertEqual(written, [self.dest / 'tags' / 'news' / 'index.html'])
+
+    def test_reserved_outputs_are_left_alone(self):
+        (self.dest / 'archive').mkdir()
+        (self.dest / 'archive' / 'index.html').write_text('mine', encoding="utf-8")
+        written, _ = self.generate(reserved={'archive/index.html'})
+        self.assertNotIn(self.dest / 'archive' / 'index.html', written)
+        self.assertEqual((self.dest / 'archive' / 'index.html').read_text(encoding="utf-8"), 'mine')
+
+    def test_obsolete_listings_are_removed(self):
+        self.generate()
+        (self.dest / 'tags' / 'news' / 'index.html.gz').write_bytes(b'')
+        for page in self.pages.values():
+            page['tags'] = []
+        _, removed = self.generate()
+        self.assertEqual(
+            removed, [self.dest / 'tags' / 'news' / 'index.html', self.dest / 'tags' / 'news' / 'page' / '1' / 'index.html']
+        )
+        self.assertFalse((self.dest / 'tags').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
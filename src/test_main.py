@@ -0,0 +1,337 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from main import BuildState, list_content, main, update_hash_index, update_sitemap
+from manifest import BuildManifest
+from metadata import MetadataIndex
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / 'content'
+        (self.content / 'blog' / 'post').mkdir(parents=True)
+        (self.content / 'index.md').write_text('# Home\n\nWelcome', encoding="utf-8")
+        (self.content / 'blog' / 'post' / 'index.md').write_text('# Post\n\nText', encoding="utf-8")
+        (self.content / 'blog-style.css').write_text('body {}', encoding="utf-8")
+        self.template = self.root / 'template.html'
+        self.template.write_text('<title>{{ Title }}</title>{{ Content }}', encoding="utf-8")
+        self.dest = self.root / 'public'
+        self.argv = [
+            '--content', str(self.content),
+            '--template', str(self.template),
+            '--dest', str(self.dest),
+            '--partials', str(self.root / 'partials'),
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, *extra):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            main(self.argv + list(extra))
+        return output.getvalue()
+
+    def test_list_content(self):
+        self.assertEqual(list_content(self.content), [
+            ('blog', True),
+            ('blog/post', True),
+            ('blog/post/index.md', False),
+            ('blog-style.css', False),
+            ('index.md', False),
+        ])
+
+    def test_build_with_configured_paths(self):
+        self.build()
+        self.assertEqual(
+            (self.dest / 'blog' / 'post' / 'index.html').read_text(encoding="utf-8"),
+            '<title>Post</title><div><h1>Post</h1><p>Text</p></div>',
+        )
+        self.assertTrue((self.root / '.ssg' / 'manifest.json').exists())
+
+    def test_state_dir(self):
+        self.build('--state-dir', str(self.root / 'state'))
+        self.assertTrue((self.root / 'state' / 'manifest.json').exists())
+        self.assertTrue((self.root / 'state' / 'hashes.json').exists())
+        self.assertFalse((self.root / '.ssg').exists())
+
+    def test_full_build_publishes_over_the_previous_output(self):
+        self.build()
+        (self.dest / 'blog' / 'leftover.html').write_text('old', encoding="utf-8")
+        (self.dest / 'gone' / 'deep').mkdir(parents=True)
+        (self.dest / 'gone' / 'deep' / 'page.html').write_text('old', encoding="utf-8")
+        (self.content / 'empty').mkdir()
+
+        output = self.build()
+        self.assertIn(f"Publishing {self.content / 'blog-style.css'} to {self.dest / 'blog-style.css'} (reused)", output)
+        self.assertIn(f"Deleting stale file: {self.dest / 'blog' / 'leftover.html'}", output)
+        self.assertFalse((self.dest / 'blog' / 'leftover.html').exists())
+        self.assertFalse((self.dest / 'gone').exists())
+        self.assertTrue((self.dest / 'empty').is_dir())
+        self.assertTrue((self.dest / 'blog' / 'post' / 'index.html').exists())
+
+    def test_rebuilt_pages_replace_the_old_file(self):
+        self.build()
+        with open(self.dest / 'index.html', 'r', encoding="utf-8") as old:
+            (self.content / 'index.md').write_text('# Home\n\nChanged', encoding="utf-8")
+            self.build('--incremental')
+            # a reader holding the old file still sees all of it
+            self.assertEqual(old.read(), '<title>Home</title><div><h1>Home</h1><p>Welcome</p></div>')
+        self.assertIn('Changed', (self.dest / 'index.html').read_text(encoding="utf-8"))
+
+    def test_noop_build_writes_nothing(self):
+        self.build()
+        state = [self.root / '.ssg' / 'manifest.json', self.root / '.ssg' / 'hashes.json']
+        for path in state:
+            os.utime(path, ns=(1, 1))
+
+        output = self.build('--incremental')
+        self.assertIn('Skipped 3 unchanged files', output)
+        self.assertEqual([path.stat().st_mtime_ns for path in state], [1, 1])
+
+    def test_metadata_index(self):
+        (self.content / 'index.md').write_text('---\ntitle: Start\ntags: [home]\n---\nWelcome', encoding="utf-8")
+        self.build()
+        index = MetadataIndex.load(self.root / '.ssg' / 'metadata.json')
+        self.assertEqual(index.pages['index.md'], {'title': "Start", 'tags': ["home"], 'url': '/', 'slug': 'index'})
+        self.assertEqual(index.pages['blog/post/index.md']['url'], '/blog/post/')
+
+        (self.content / 'blog' / 'post' / 'index.md').unlink()
+        (self.content / 'new.md').write_text('# New', encoding="utf-8")
+        self.build('--incremental')
+        index = MetadataIndex.load(self.root / '.ssg' / 'metadata.json')
+        self.assertEqual(sorted(index.pages), ['index.md', 'new.md'])
+        self.assertEqual(index.pages['new.md']['url'], '/new.html')
+
+    def test_front_matter_fills_template_slots(self):
+        self.template.write_text('{{ Title }} by {{ author }}', encoding="utf-8")
+        (self.content / 'index.md').write_text('---\ntitle: Start\nauthor: Ada\n---\nWelcome', encoding="utf-8")
+        self.build()
+        self.assertEqual((self.dest / 'index.html').read_text(encoding="utf-8"), 'Start by Ada')
+
+    def test_listings(self):
+        first = '---\ndate: 2024-01-01\ntags: [news]\n---\n# First'
+        (self.content / 'blog' / 'first.md').write_text(first, encoding="utf-8")
+        self.build()
+        archive = (self.dest / 'archive' / 'index.html').read_text(encoding="utf-8")
+        self.assertIn('<a href="/blog/first.html">First</a>', archive)
+        self.assertTrue((self.dest / 'tags' / 'news' / 'index.html').exists())
+        # blog/ has no index page of its own
+        self.assertIn('<a href="/blog/post/">Post</a>', (self.dest / 'blog' / 'index.html').read_text(encoding="utf-8"))
+
+        # a page written later takes the listing's place, and removing it brings the listing back
+        (self.content / 'blog' / 'index.md').write_text('# Blog', encoding="utf-8")
+        self.build('--incremental')
+        self.assertEqual(
+            (self.dest / 'blog' / 'index.html').read_text(encoding="utf-8"), '<title>Blog</title><div><h1>Blog</h1></div>'
+        )
+        (self.content / 'blog' / 'index.md').unlink()
+        self.build('--incremental')
+        self.assertIn('<a href="/blog/post/">Post</a>', (self.dest / 'blog' / 'index.html').read_text(encoding="utf-8"))
+
+        # listings deleted from the output come back even though the metadata didn't change
+        shutil.rmtree(self.dest)
+        output = self.build('--incremental')
+        self.assertIn('Generating listing', output)
+        self.assertTrue((self.dest / 'archive' / 'index.html').exists())
+        self.assertTrue((self.dest / 'tags' / 'news' / 'index.html').exists())
+        self.assertTrue((self.dest / 'blog' / 'index.html').exists())
+        self.assertNotIn('Generating listing', self.build('--incremental'))
+
+        # a new page size reslices the listings even though nothing they list changed
+        self.build('--incremental', '--page-size', '1')
+        self.assertTrue((self.dest / 'blog' / 'page' / '1' / 'index.html').exists())
+        self.assertNotIn('Generating listing', self.build('--incremental', '--page-size', '1'))
+
+        self.build('--incremental', '--no-listings')
+        self.build('--no-listings')
+        self.assertFalse((self.dest / 'archive').exists())
+
+    def test_partial_change_rebuilds_only_its_dependents(self):
+        (self.root / 'partials').mkdir()
+        (self.root / 'partials' / 'footer.md').write_text('Footer', encoding="utf-8")
+        (self.root / 'partials' / 'nav.html').write_text('<nav>{{ Title }}</nav>', encoding="utf-8")
+        self.template.write_text('{{> nav }}{{ Content }}', encoding="utf-8")
+        (self.content / 'index.md').write_text('# Home\n\n{{> footer }}', encoding="utf-8")
+        self.build()
+        self.assertEqual(
+            (self.dest / 'index.html').read_text(encoding="utf-8"),
+            '<nav>Home</nav><div><h1>Home</h1><p>Footer</p></div>',
+        )
+
+        (self.root / 'partials' / 'footer.md').write_text('New footer', encoding="utf-8")
+        output = self.build('--incremental')
+        self.assertIn('Generating page from', output)
+        self.assertNotIn('blog/post', output)
+        self.assertIn('<p>New footer</p>', (self.dest / 'index.html').read_text(encoding="utf-8"))
+        self.assertIn('because: partial footer.md changed', self.build('--why', 'index.md'))
+
+        # the template's own partials invalidate every page
+        (self.root / 'partials' / 'nav.html').write_text('<nav>{{ Title }}!</nav>', encoding="utf-8")
+        self.build('--incremental')
+        self.assertTrue((self.dest / 'blog' / 'post' / 'index.html').read_text(encoding="utf-8").startswith('<nav>Post!'))
+        why = self.build('--why', str(self.dest / 'blog' / 'post' / 'index.html'))
+        self.assertIn('blog/post/index.md was last rebuilt because: template partial nav.html changed', why)
+
+        # going back to the old footer is served from the render cache
+        (self.root / 'partials' / 'footer.md').write_text('Footer', encoding="utf-8")
+        self.assertIn('(cached)', self.build('--incremental'))
+
+        # and so is a full build of a page that includes a partial
+        output = self.build()
+        self.assertIn(f"Generating page from {self.content / 'index.md'} to {self.dest / 'index.html'}", output)
+        self.assertIn(f"{self.dest / 'index.html'} using {self.template} (cached)", output)
+
+    def test_includes_need_a_partials_directory(self):
+        (self.content / 'index.md').write_text('# Home\n\n{{> footer }}', encoding="utf-8")
+        self.build()
+        self.assertIn('<p>{{> footer }}</p>', (self.dest / 'index.html').read_text(encoding="utf-8"))
+
+        # creating the partial later rebuilds the page, and a full build doesn't take it from the cache
+        (self.root / 'partials').mkdir()
+        (self.root / 'partials' / 'footer.md').write_text('Footer', encoding="utf-8")
+        output = self.build('--incremental')
+        self.assertIn(f"Generating page from {self.content / 'index.md'}", output)
+        self.assertIn('<p>Footer</p>', (self.dest / 'index.html').read_text(encoding="utf-8"))
+        shutil.rmtree(self.root / 'partials')
+        self.build()
+        self.assertIn('<p>{{> footer }}</p>', (self.dest / 'index.html').read_text(encoding="utf-8"))
+        (self.root / 'partials').mkdir()
+        (self.root / 'partials' / 'footer.md').write_text('Footer', encoding="utf-8")
+        self.build()
+        self.assertIn('<p>Footer</p>', (self.dest / 'index.html').read_text(encoding="utf-8"))
+
+    def test_search_index_and_sitemap(self):
+        (self.content / 'draft.md').write_text('---\ndraft: true\n---\n# Secret', encoding="utf-8")
+        self.build('--site-url', 'https://example.com')
+        self.assertEqual(
+            json.loads((self.dest / 'search' / 'terms' / 'we.json').read_text(encoding="utf-8")), {'welcome': [1]}
+        )
+        self.assertFalse((self.dest / 'search' / 'terms' / 'se.json').exists())
+        sitemap = (self.dest / 'sitemap.xml').read_text(encoding="utf-8")
+        self.assertIn('<loc>https://example.com/blog/post/</loc>', sitemap)
+        self.assertIn('<loc>https://example.com/blog/</loc>', sitemap)
+        self.assertNotIn('draft', sitemap)
+
+        (self.content / 'index.md').write_text('# Home\n\nHello', encoding="utf-8")
+        output = self.build('--incremental', '--site-url', 'https://example.com')
+        self.assertIn('Search index: 1 shards written, 1 removed', output)
+        self.assertFalse((self.dest / 'search' / 'terms' / 'we.json').exists())
+
+        # the sitemap follows a new site url, and goes away with it, even though no page changed
+        self.build('--incremental', '--site-url', 'https://example.org')
+        self.assertIn('<loc>https://example.org/blog/</loc>', (self.dest / 'sitemap.xml').read_text(encoding="utf-8"))
+        self.assertNotIn('Writing sitemap', self.build('--incremental', '--site-url', 'https://example.org'))
+        self.build('--incremental')
+        self.assertFalse((self.dest / 'sitemap.xml').exists())
+        self.assertFalse((self.dest / 'sitemap.xml.gz').exists())
+
+        # an incremental build into an emptied output directory writes the whole index again
+        shutil.rmtree(self.dest)
+        self.build('--incremental')
+        self.assertEqual(
+            json.loads((self.dest / 'search' / 'terms' / 'he.json').read_text(encoding="utf-8")), {'hello': [1]}
+        )
+        self.assertEqual(len(list((self.dest / 'search' / 'pages').glob('*.json'))), 1)
+
+        self.build('--no-search')
+        self.assertFalse((self.dest / 'search').exists())
+        self.assertFalse((self.dest / 'sitemap.xml').exists())
+
+    def test_broken_links_are_reported_per_page(self):
+        (self.content / 'index.md').write_text(
+            '# Home\n\n[post](/blog/post/) [css](blog-style.css) [gone](/gone.html) ![logo](/logo.png)', encoding="utf-8"
+        )
+        output = self.build()
+        self.assertIn('Broken links in index.md:\n  /gone.html\n  /logo.png\n', output)
+        self.assertIn('Links: 4 checked, 2 broken in 1 pages', output)
+
+        # a new output fixes links in pages that weren't rebuilt
+        (self.content / 'logo.png').write_bytes(b'png')
+        output = self.build('--incremental')
+        self.assertIn('Broken links in index.md:\n  /gone.html\n', output)
+        self.assertIn('Links: 4 checked, 1 broken in 1 pages', output)
+
+        # and a removed one breaks them
+        (self.content / 'blog' / 'post' / 'index.md').unlink()
+        output = self.build('--incremental', '--no-listings')
+        self.assertIn('Broken links in index.md:\n  /blog/post/\n  /gone.html\n', output)
+
+    def test_watch_starts_after_a_failed_first_build(self):
+        (self.content / 'index.md').write_text('no title', encoding="utf-8")
+        with self.assertRaises(ValueError):
+            self.build()
+        with mock.patch('watch.watch', side_effect=KeyboardInterrupt) as watch:
+            output = self.build('--watch')
+        self.assertIn('Build failed: ValueError: Failed to generate 1 pages', output)
+        self.assertIn('Stopped watching', output)
+        watch.assert_called_once()
+
+    def test_noop_build_does_not_load_the_parser(self):
+        self.build()
+        # run in a fresh interpreter, this one already imported everything for the other tests
+        script = (
+            "import sys; from main import main; "
+            f"main({self.argv + ['--incremental']!r}); "
+            "print('textnode' in sys.modules, 'concurrent.futures' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        )
+        self.assertEqual(result.stdout.splitlines()[-1], 'False False')
+
+
+class TestBuildStages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.dest = self.root / 'public'
+        self.dest.mkdir()
+        self.build = BuildState(
+            self.root / 'template.html',
+            self.dest,
+            self.root / '.ssg' / 'manifest.json',
+            incremental=True,
+            listings=False,
+            site_url='https://example.com',
+        )
+        self.build.manifest = BuildManifest(self.build.manifest_path, site_url='https://example.com')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sitemap_is_only_written_when_what_it_lists_changed(self):
+        sitemap = (self.dest / 'sitemap.xml', None)
+        with contextlib.redirect_stdout(io.StringIO()):
+            # a missing sitemap is written even when nothing changed
+            update_sitemap(self.build)
+            self.assertEqual(self.build.written, [sitemap])
+            update_sitemap(self.build)
+            self.assertEqual(self.build.written, [sitemap])
+            self.build.metadata_changed = True
+            update_sitemap(self.build)
+            self.assertEqual(self.build.written, [sitemap, sitemap])
+            self.build.metadata_changed = False
+            self.build.site_url = 'https://example.org'
+            update_sitemap(self.build)
+        self.assertEqual(self.build.written, [sitemap, sitemap, sitemap])
+        self.assertEqual(self.build.manifest.site_url, 'https://example.org')
+        self.assertTrue(self.build.manifest.changed)
+
+    def test_noop_build_leaves_the_hash_index_alone(self):
+        update_hash_index(self.build)
+        self.assertFalse(self.build.state_path('hashes.json').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from manifest import BuildManifest, file_digest
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.src = self.root / 'page.md'
+        self.src.write_text('# Title', encoding="utf-8")
+        self.dest = self.root / 'public'
+        self.dest.mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_save_and_load_round_trip(self):
+        manifest = BuildManifest(self.root / '.ssg' / 'manifest.json', 'abc')
+        manifest.record('page.md', self.src, file_digest(self.src), 'page.html')
+        manifest.save()
+
+        loaded = BuildManifest.load(manifest.path)
+        self.assertEqual(loaded.template_hash, 'abc')
+        self.assertEqual(loaded.files, manifest.files)
+
+    def test_load_missing_manifest(self):
+        manifest = BuildManifest.load(self.root / 'missing.json')
+        self.assertIsNone(manifest.template_hash)
+        self.assertEqual(manifest.files, {})
+
+    def test_is_fresh(self):
+        manifest = BuildManifest(self.root / 'manifest.json')
+        dst = self.dest / 'page.html'
+        src_hash = file_digest(self.src)
+        manifest.record('page.md', self.src, src_hash, 'page.html')
+
+        self.assertFalse(manifest.is_fresh('page.md', src_hash, dst))
+        dst.touch()
+        self.assertTrue(manifest.is_fresh('page.md', src_hash, dst))
+        self.assertFalse(manifest.is_fresh('page.md', 'changed', dst))
+
+    def test_source_hash_detects_changes(self):
+        manifest = BuildManifest(self.root / 'manifest.json')
+        manifest.record('page.md', self.src, file_digest(self.src), 'page.html')
+
+        self.src.write_text('# Another title', encoding="utf-8")
+        os.utime(self.src, ns=(0, 0))
+        self.assertEqual(manifest.source_hash('page.md', self.src), file_digest(self.src))
+
+    def test_remove_stale(self):
+        manifest = BuildManifest(self.root / 'manifest.json')
+        nested = self.dest / 'nested'
+        nested.mkdir()
+        (nested / 'old.html').touch()
+        (nested / 'old.html.gz').touch()
+        manifest.files['nested/old.md'] = {'hash': '', 'mtime_ns': 0, 'size': 0, 'output': 'nested/old.html'}
+
+        removed = manifest.remove_stale(set(), self.dest)
+        self.assertEqual(removed, [nested / 'old.html'])
+        self.assertFalse(nested.exists())
+        self.assertTrue(self.dest.exists())
+        self.assertEqual(manifest.files, {})
+
+    def test_touched_source_is_refreshed(self):
+        manifest = BuildManifest(self.root / 'manifest.json')
+        src_hash = file_digest(self.src)
+        manifest.record('page.md', self.src, src_hash, 'page.html')
+        manifest.changed = False
+
+        os.utime(self.src, ns=(1, 1))
+        self.assertEqual(manifest.source_hash('page.md', self.src), src_hash)
+        self.assertTrue(manifest.changed)
+        self.assertEqual(manifest.files['page.md']['mtime_ns'], 1)
+
+    def test_unchanged_manifest_is_not_marked(self):
+        manifest = BuildManifest(self.root / 'manifest.json')
+        manifest.record('page.md', self.src, file_digest(self.src), 'page.html')
+        manifest.save()
+        self.assertFalse(manifest.changed)
+
+        manifest.source_hash('page.md', self.src)
+        manifest.remove_stale({'page.md'}, self.dest)
+        self.assertFalse(manifest.changed)
+
+
+if __name__ == '__main__':
+    unittest.main()
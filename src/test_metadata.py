@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+from metadata import MetadataIndex, page_metadata, page_url
+
+
+class TestPageMetadata(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url('index.html'), '/')
+        self.assertEqual(page_url('blog/post/index.html'), '/blog/post/')
+        self.assertEqual(page_url('blog/post.html'), '/blog/post.html')
+
+    def test_page_metadata(self):
+        metadata = page_metadata("Post", {'tags': ["a"]}, 'blog/post/index.html')
+        self.assertEqual(metadata, {'tags': ["a"], 'title': "Post", 'url': '/blog/post/', 'slug': 'post'})
+
+    def test_front_matter_slug_wins(self):
+        self.assertEqual(page_metadata("Post", {'slug': 'custom'}, 'post.html')['slug'], 'custom')
+        self.assertEqual(page_metadata("Home", {}, 'index.html')['slug'], 'index')
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / '.ssg' / 'metadata.json'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        index = MetadataIndex(self.path)
+        index.update('post.md', {'title': "Post"})
+        index.save()
+
+        loaded = MetadataIndex.load(self.path)
+        self.assertEqual(loaded.pages, {'post.md': {'title': "Post"}})
+        self.assertFalse(loaded.changed)
+
+    def test_unchanged_update_is_not_marked(self):
+        index = MetadataIndex(self.path, {'post.md': {'title': "Post"}})
+        index.update('post.md', {'title': "Post"})
+        index.discard(['missing.md'])
+        self.assertFalse(index.changed)
+
+        index.update('post.md', {'title': "Renamed"})
+        self.assertTrue(index.changed)
+
+    def test_discard(self):
+        index = MetadataIndex(self.path, {'a.md': {}, 'b.md': {}})
+        index.discard(['a.md'])
+        self.assertEqual(list(index.pages), ['b.md'])
+        self.assertTrue(index.changed)
+
+    def test_load_other_version(self):
+        self.path.parent.mkdir()
+        self.path.write_text('{"version": 0, "pages": {"a.md": {}}}', encoding="utf-8")
+        self.assertEqual(MetadataIndex.load(self.path).pages, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from partials import IncludingReader, Partials, list_partials
+from template import Template
+
+
+class TestPartials(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / 'shared').mkdir()
+        (self.root / 'footer.md').write_text('Footer with {{> shared/note }}\n', encoding="utf-8")
+        (self.root / 'shared' / 'note.md').write_text('a note', encoding="utf-8")
+        (self.root / 'nav.html').write_text('<nav>{{ Title }}</nav>\n', encoding="utf-8")
+        self.partials = Partials(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_expand_nested(self):
+        used = set()
+        text = self.partials.expand('# Page\n\n{{> footer }}\n', '.md', used)
+        self.assertEqual(text, '# Page\n\nFooter with a note\n')
+        self.assertEqual(used, {'footer.md', 'shared/note.md'})
+
+    def test_suffix_picks_the_partial(self):
+        self.assertEqual(self.partials.expand('{{>nav}}', '.html'), '<nav>{{ Title }}</nav>')
+        self.assertEqual(self.partials.expand('{{> nav.html }}', '.md'), '<nav>{{ Title }}</nav>')
+
+    def test_text_without_includes_is_returned_as_is(self):
+        text = 'no includes {{ Title }}'
+        self.assertIs(self.partials.expand(text, '.md'), text)
+
+    def test_missing_partial(self):
+        with self.assertRaisesRegex(ValueError, 'Partial not found: header'):
+            self.partials.expand('{{> header }}', '.md')
+
+    def test_code_blocks_are_left_alone(self):
+        text = 'Like this:\n\n```\n{{> header }}\n```\n\n{{> footer }} and ```{{> x }}```'
+        self.assertEqual(
+            self.partials.expand(text, '.md'),
+            'Like this:\n\n```\n{{> header }}\n```\n\nFooter with a note and ```{{> x }}```',
+        )
+
+        reader = IncludingReader(io.StringIO('```\n{{> header }}\n```\n{{> footer }}\n'), self.partials)
+        self.assertEqual(reader.read(), '```\n{{> header }}\n```\nFooter with a note\n')
+
+    def test_names_stay_inside_the_root(self):
+        for name in ('../secret', 'shared/../../secret', '/etc/hostname', '..'):
+            with self.assertRaisesRegex(ValueError, 'Partial outside the partials directory'):
+                self.partials.expand(f'{{{{> {name} }}}}', '.md')
+        used = set()
+        self.assertEqual(self.partials.expand('{{> shared/../footer }}', '.md', used), 'Footer with a note')
+        self.assertEqual(used, {'footer.md', 'shared/note.md'})
+
+    def test_cycle(self):
+        (self.root / 'a.md').write_text('{{> b }}', encoding="utf-8")
+        (self.root / 'b.md').write_text('{{> a }}', encoding="utf-8")
+        with self.assertRaisesRegex(ValueError, r'Partial include cycle: a.md -> b.md -> a.md'):
+            self.partials.expand('{{> a }}', '.md')
+
+    def test_including_reader(self):
+        used = set()
+        reader = IncludingReader(io.StringIO('first\n{{> footer }}\nlast\n'), self.partials, used)
+        chunks = []
+        while chunk := reader.read(4):
+            chunks.append(chunk)
+        self.assertEqual(''.join(chunks), 'first\nFooter with a note\nlast\n')
+        self.assertEqual(used, {'footer.md', 'shared/note.md'})
+
+    def test_missing_directory_leaves_includes_as_written(self):
+        partials = Partials(self.root / 'missing')
+        used = set()
+        text = '{{> footer }}\n```\n{{> code }}\n```'
+        self.assertEqual(partials.expand(text, '.md', used), text)
+        self.assertEqual(used, {'footer.md', 'footer'})
+        with self.assertRaises(ValueError):
+            partials.expand('{{> ../secret }}', '.md')
+
+    def test_template_load(self):
+        (self.root / 'page.html').write_text('{{> nav }}{{ Content }}', encoding="utf-8")
+        used = set()
+        template = Template.load(self.root / 'page.html', self.partials, used)
+        fp = io.StringIO()
+        template.write(fp, {'Title': 'T', 'Content': 'C'})
+        self.assertEqual(fp.getvalue(), '<nav>T</nav>C')
+        self.assertEqual(used, {'nav.html'})
+
+    def test_list_partials(self):
+        stat = os.stat(self.root / 'shared' / 'note.md')
+        listed = list_partials(self.root)
+        self.assertEqual(sorted(listed), ['footer.md', 'nav.html', 'shared/note.md'])
+        self.assertEqual(listed['shared/note.md'], (stat.st_mtime_ns, stat.st_size))
+        self.assertEqual(list_partials(self.root / 'missing'), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.module = types.ModuleType('fake')
+        self.module.double = lambda value: value * 2
+        self.module.render = lambda path: f"rendered {path}"
+
+    def test_instrument_counts_calls(self):
+        profiler = Profiler()
+        profiler.instrument(self.module, 'double')
+        self.assertEqual(self.module.double(2), 4)
+        self.module.double(3)
+        seconds, calls = profiler.stages['double']
+        self.assertEqual(calls, 2)
+        self.assertGreaterEqual(seconds, 0)
+
+    def test_restore(self):
+        original = self.module.double
+        profiler = Profiler()
+        profiler.instrument(self.module, 'double')
+        self.assertIsNot(self.module.double, original)
+        profiler.restore()
+        self.assertIs(self.module.double, original)
+
+    def test_restore_inherited_method(self):
+        profiler = Profiler()
+        profiler.instrument(ParentNode, 'to_html')
+        node = ParentNode('p', [LeafNode('text')])
+        self.assertEqual(node.to_html(), '<p>text</p>')
+        self.assertEqual(profiler.stages['to_html'][1], 1)
+        profiler.restore()
+        self.assertNotIn('to_html', vars(ParentNode))
+        self.assertIs(ParentNode.to_html, HTMLNode.to_html)
+
+    def test_exceptions_are_timed_and_raised(self):
+        profiler = Profiler()
+        self.module.fail = lambda: 1 / 0
+        profiler.instrument(self.module, 'fail')
+        with self.assertRaises(ZeroDivisionError):
+            self.module.fail()
+        self.assertEqual(profiler.stages['fail'][1], 1)
+
+    def test_page_attribution(self):
+        profiler = Profiler()
+        profiler.instrument(self.module, 'render', page_arg=0)
+        profiler.instrument(self.module, 'double')
+        self.module.render('a.md')
+        with profiler.page('b.md'):
+            self.module.double(1)
+            self.module.double(1)
+        self.module.double(1)
+
+        self.assertEqual(set(profiler.pages), {'a.md', 'b.md'})
+        self.assertEqual(profiler.pages['a.md']['stages']['render'][1], 1)
+        self.assertEqual(profiler.pages['b.md']['stages']['double'][1], 2)
+        # calls outside of a page only count towards the stage totals
+        self.assertEqual(profiler.stages['double'][1], 3)
+
+    def test_slowest_pages(self):
+        profiler = Profiler()
+        profiler.pages = {
+            'fast.md': {'seconds': 0.1, 'stages': {}},
+            'slow.md': {'seconds': 0.5, 'stages': {}},
+            'medium.md': {'seconds': 0.3, 'stages': {}},
+        }
+        self.assertEqual(profiler.slowest_pages(2), [('slow.md', 0.5), ('medium.md', 0.3)])
+        self.assertIn('slow.md', profiler.summary(1))
+        self.assertNotIn('fast.md', profiler.summary(1))
+
+    def test_save_report_and_trace(self):
+        profiler = Profiler(trace=True)
+        profiler.instrument(self.module, 'render', page_arg=0)
+        self.module.render('a.md')
+        with tempfile.TemporaryDirectory() as tmp:
+            report_path = Path(tmp) / 'state' / 'profile.json'
+            trace_path = Path(tmp) / 'trace.json'
+            profiler.save(report_path)
+            profiler.save_trace(trace_path)
+            with open(report_path, encoding="utf-8") as f:
+                report = json.load(f)
+            with open(trace_path, encoding="utf-8") as f:
+                trace = json.load(f)
+
+        self.assertEqual(report['stages']['render']['calls'], 1)
+        self.assertEqual(report['pages']['a.md']['stages']['render']['calls'], 1)
+        names = [event['name'] for event in trace['traceEvents']]
+        self.assertEqual(sorted(names), ['a.md', 'render'])
+        self.assertTrue(all(event['ph'] == 'X' for event in trace['traceEvents']))
+
+    def test_no_trace_by_default(self):
+        profiler = Profiler()
+        with profiler.stage('build'):
+            pass
+        self.assertIsNone(profiler.events)
+        self.assertEqual(profiler.stages['build'][1], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import tempfile
+import unittest
+from pathlib import Path
+from partials import Partials
+from render import extract_title, extract_title_from_file, render_page, render_pages, stream_page
+from template import Template
+
+
+class TestExtractTitle(unittest.TestCase):
+    def test_extract_title(self):
+        self.assertEqual(extract_title("## Subtitle\n\n# Title\n\ntext"), "Title")
+
+    def test_missing_title(self):
+        with self.assertRaises(ValueError) as context:
+            extract_title("## Only a subtitle")
+        self.assertEqual(str(context.exception), "Title not found")
+
+
+class TestRenderPages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.paths = []
+        for idx in range(12):
+            path = root / f"page{idx}.md"
+            if idx == 5:
+                path.write_text("no title here", encoding="utf-8")
+            else:
+                path.write_text(f"# Page {idx}\n\nSome **bold** text {idx}", encoding="utf-8")
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_page(self):
+        title, content, fields = render_page(self.paths[0])
+        self.assertEqual(title, "Page 0")
+        self.assertEqual(content, "<div><h1>Page 0</h1><p>Some <b>bold</b> text 0</p></div>")
+        self.assertEqual(fields, {})
+
+    def test_render_page_info(self):
+        path = self.paths[0].with_name("links.md")
+        path.write_text("# Links\n\nA [link](/a.html) and ![img](pic.png) and [again](/a.html)", encoding="utf-8")
+        info = {}
+        render_page(path, info=info)
+        self.assertEqual(info, {
+            'partials': [],
+            'terms': ['again', 'and', 'link', 'links'],
+            'links': ['/a.html', 'pic.png'],
+        })
+
+    def test_render_page_with_front_matter(self):
+        path = self.paths[0].with_name("front.md")
+        path.write_text("---\ntitle: From front matter\ntags: [a, b]\n---\n# Heading\n\nBody", encoding="utf-8")
+        title, content, fields = render_page(path)
+        self.assertEqual(title, "From front matter")
+        self.assertEqual(content, "<div><h1>Heading</h1><p>Body</p></div>")
+        self.assertEqual(fields, {'title': "From front matter", 'tags': ['a', 'b']})
+
+    def test_empty_front_matter_title_falls_back_to_the_heading(self):
+        path = self.paths[0].with_name("front.md")
+        dest = path.with_name("front.html")
+        template = Template("{{ Title }}")
+        for header in ('title: ""', 'title:', 'title: [a, b]', 'title: true'):
+            path.write_text(f"---\n{header}\n---\n# Heading\n\nBody", encoding="utf-8")
+            self.assertEqual(render_page(path)[0], "Heading")
+            self.assertEqual(stream_page(path, template, dest)[0], "Heading")
+        path.write_text("---\ntitle: 2024\n---\n# Heading", encoding="utf-8")
+        self.assertEqual(render_page(path)[0], "2024")
+
+    def test_parallel_matches_serial(self):
+        serial = list(render_pages(self.paths, jobs=1))
+        parallel = list(render_pages(self.paths, jobs=3))
+        self.assertEqual(serial, parallel)
+
+    def test_errors_reported_per_file(self):
+        results = list(render_pages(self.paths, jobs=2))
+        errors = [(path, error) for path, _, _, _, _, error in results if error]
+        self.assertEqual(errors, [(self.paths[5], "ValueError: Title not found")])
+
+
+class TestStreamPage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stream_page_matches_render_page(self):
+        src = self.root / "big.md"
+        sections = [f"## Section {idx}\n\nText with a [link](/{idx}) and **bold**\n\n* a\n* b" for idx in range(500)]
+        src.write_text("# Big page\n\n" + "\n\n\n".join(sections) + "\n", encoding="utf-8")
+        dest = self.root / "big.html"
+
+        info, expected_info = {}, {}
+        title, _ = stream_page(src, self.template, dest, info=info)
+        expected_title, expected_content, _ = render_page(src, info=expected_info)
+        self.assertEqual(title, expected_title)
+        self.assertEqual(info, expected_info)
+        self.assertEqual(
+            dest.read_text(encoding="utf-8"),
+            f"<title>{expected_title}</title><article>{expected_content}</article>",
+        )
+
+    def test_extract_title_from_file(self):
+        src = self.root / "page.md"
+        src.write_text("intro\n\n## Sub\n\n# Real title\n", encoding="utf-8")
+        self.assertEqual(extract_title_from_file(src), "Real title")
+
+    def test_stream_page_with_front_matter(self):
+        src = self.root / "page.md"
+        src.write_text("---\n# a comment\ntitle: Streamed\n---\n# Heading\n\nBody\n", encoding="utf-8")
+        dest = self.root / "page.html"
+        template = Template("{{ Title }}|{{ title }}|{{ Content }}")
+        self.assertEqual(stream_page(src, template, dest), ("Streamed", {'title': "Streamed"}))
+        self.assertEqual(
+            dest.read_text(encoding="utf-8"), "Streamed|Streamed|<div><h1>Heading</h1><p>Body</p></div>"
+        )
+
+    def test_extract_title_from_file_skips_front_matter(self):
+        src = self.root / "page.md"
+        src.write_text("---\n# not a title\ndate: 2024-01-01\n---\n# Real title\n", encoding="utf-8")
+        self.assertEqual(extract_title_from_file(src), "Real title")
+
+    def test_stream_page_finds_the_title_in_a_partial(self):
+        (self.root / 'partials').mkdir()
+        (self.root / 'partials' / 'header.md').write_text('# From a partial\n', encoding="utf-8")
+        src = self.root / "page.md"
+        src.write_text("{{> header }}\n\n# Second\n", encoding="utf-8")
+        partials = Partials(self.root / 'partials')
+        title, _ = stream_page(src, self.template, self.root / "page.html", partials)
+        self.assertEqual(title, "From a partial")
+        self.assertEqual(title, render_page(src, partials)[0])
+
+    def test_stream_page_without_title(self):
+        src = self.root / "page.md"
+        src.write_text("no title", encoding="utf-8")
+        dest = self.root / "page.html"
+        with self.assertRaises(ValueError):
+            stream_page(src, self.template, dest)
+        self.assertFalse(dest.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from htmlnode import LeafNode, ParentNode
+from search import PAGES_PER_SHARD, SearchIndex, page_terms, term_shard
+
+
+class TestPageTerms(unittest.TestCase):
+    def test_page_terms(self):
+        node = ParentNode('div', [
+            ParentNode('h1', [LeafNode('Hello, World')]),
+            ParentNode('p', [LeafNode('a '), LeafNode('Big', 'b'), LeafNode('link', 'a', {'href': '/x'})]),
+            LeafNode('', 'img', {'src': '/photo.png', 'alt': 'photo'}),
+            ParentNode('p', [LeafNode('Ünïcode snake_case hello')]),
+        ])
+        self.assertEqual(page_terms(node), {'hello', 'world', 'big', 'link', 'ünïcode', 'snake', 'case'})
+
+    def test_term_shard(self):
+        self.assertEqual(term_shard('hello'), 'he')
+        self.assertEqual(term_shard('42nd'), '42')
+        self.assertEqual(term_shard('über'), 'ufc')
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.out = self.root / 'public' / 'search'
+        self.index = SearchIndex(self.root / '.ssg' / 'search.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, *parts):
+        return json.loads(self.out.joinpath(*parts).read_text(encoding="utf-8"))
+
+    def test_write_shards(self):
+        self.index.update('a.md', '/a.html', "A", ['hello', 'world'])
+        self.index.update('b.md', '/b.html', "B", ['help'])
+        written, removed = self.index.write(self.out)
+        self.assertEqual(sorted(path.name for path in written), ['0.json', 'he.json', 'wo.json'])
+        self.assertEqual(removed, [])
+        self.assertEqual(self.read('terms', 'he.json'), {'hello': [0], 'help': [1]})
+        self.assertEqual(self.read('pages', '0.json'), {'0': ['/a.html', "A"], '1': ['/b.html', "B"]})
+        self.assertFalse(self.index.changed)
+
+    def test_edit_only_touches_changed_terms(self):
+        self.index.update('a.md', '/a.html', "A", ['hello', 'world'])
+        self.index.update('b.md', '/b.html', "B", ['help'])
+        self.index.write(self.out)
+        self.index.save()
+
+        index = SearchIndex.load(self.index.path)
+        index.update('a.md', '/a.html', "A", ['hello', 'there'])
+        index.update('b.md', '/b.html', "B", ['help'])
+        written, removed = index.write(self.out)
+        self.assertEqual(written, [self.out / 'terms' / 'th.json'])
+        self.assertEqual(removed, [self.out / 'terms' / 'wo.json'])
+
+    def test_discard(self):
+        self.index.update('a.md', '/a.html', "A", ['hello'])
+        self.index.update('b.md', '/b.html', "B", ['hello', 'zebra'])
+        self.index.write(self.out)
+        (self.out / 'terms' / 'ze.json.gz').write_bytes(b'')
+        self.index.discard(['b.md', 'missing.md'])
+        written, removed = self.index.write(self.out)
+        self.assertEqual(self.read('terms', 'he.json'), {'hello': [0]})
+        self.assertEqual(self.read('pages', '0.json'), {'0': ['/a.html', "A"]})
+        self.assertEqual(removed, [self.out / 'terms' / 'ze.json'])
+        self.assertFalse((self.out / 'terms' / 'ze.json.gz').exists())
+
+    def test_missing_shards_are_restored(self):
+        self.index.update('a.md', '/a.html', "A", ['hello', 'world'])
+        self.index.update('b.md', '/b.html', "B", ['help'])
+        self.index.write(self.out)
+        (self.out / 'terms' / 'he.json').unlink()
+        (self.out / 'pages' / '0.json').unlink()
+
+        self.index.restore(self.out)
+        written, _ = self.index.write(self.out)
+        self.assertEqual(sorted(path.name for path in written), ['0.json', 'he.json'])
+        self.assertEqual(self.read('terms', 'he.json'), {'hello': [0], 'help': [1]})
+        self.assertEqual(self.read('pages', '0.json'), {'0': ['/a.html', "A"], '1': ['/b.html', "B"]})
+
+        self.index.restore(self.out)
+        self.assertFalse(self.index.changed)
+
+    def test_rebuild_ignores_shards_on_disk(self):
+        (self.out / 'terms').mkdir(parents=True)
+        (self.out / 'terms' / 'he.json').write_text('{"hello": [7], "help": [8]}', encoding="utf-8")
+        self.index.update('a.md', '/a.html', "A", ['hello'])
+        self.index.write(self.out, rebuild=True)
+        self.assertEqual(self.read('terms', 'he.json'), {'hello': [0]})
+
+    def test_ids_are_never_reused(self):
+        self.index.update('a.md', '/a.html', "A", [])
+        self.index.discard(['a.md'])
+        self.index.update('b.md', '/b.html', "B", [])
+        self.assertEqual(self.index.pages['b.md']['id'], 1)
+
+    def test_page_table_is_sharded(self):
+        self.index.next_id = PAGES_PER_SHARD
+        self.index.update('a.md', '/a.html', "A", [])
+        written, _ = self.index.write(self.out)
+        self.assertEqual(written, [self.out / 'pages' / '1.json'])
+
+        # a new title rewrites the page table, the same title doesn't
+        self.index.update('a.md', '/a.html', "A", [])
+        self.assertFalse(self.index.changed)
+        self.index.update('a.md', '/a.html', "New", [])
+        self.assertTrue(self.index.changed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import email.utils
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from functools import partial
+from pathlib import Path
+
+# the server lives next to src/ rather than in it
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from server import BuildIndex, CachedFileHandler, FileCache, StaticHTTPServer, accepted_encodings, entity_tag
+
+
+class TestAcceptedEncodings(unittest.TestCase):
+    def test_codings_and_quality(self):
+        self.assertEqual(accepted_encodings('gzip, br;q=0.5, zstd;q=0'), {'gzip', 'br'})
+        self.assertEqual(accepted_encodings('GZip;q=bad, *'), {'*'})
+        self.assertEqual(accepted_encodings(''), set())
+
+
+class TestFileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = FileCache(max_entries=2)
+        paths = []
+        for name in 'abc':
+            path = self.root / name
+            path.write_text(name, encoding="utf-8")
+            paths.append(str(path))
+        cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[0])
+        cache.get(paths[2])
+        self.assertEqual(list(cache.entries), [paths[0], paths[2]])
+
+    def test_unreadable_paths_are_missing(self):
+        cache = FileCache()
+        (self.root / 'file').write_text('x', encoding="utf-8")
+        self.assertIsNone(cache.get(str(self.root / 'absent')))
+        self.assertIsNone(cache.get(str(self.root / 'file' / 'below')))
+        self.assertIsNone(cache.get(str(self.root / ('x' * 5000))))
+
+
+class TestCachedFileHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.page = self.root / 'index.html'
+        self.page.write_text('<p>hello</p>', encoding="utf-8")
+        (self.root / 'index.html.gz').write_bytes(b'gzipped')
+        self.info = {'hash': 'ab' * 32, 'size': 12, 'mtime': 1700000000}
+        index = self.root / 'hashes.json'
+        index.write_text(json.dumps({'version': 1, 'files': {'index.html': self.info}}), encoding="utf-8")
+
+        class Handler(CachedFileHandler):
+            # every request stats again, so changes made by a test are seen right away
+            file_cache = FileCache(revalidate=0)
+
+        self.server = StaticHTTPServer(('127.0.0.1', 0), partial(Handler, directory=str(self.root)))
+        self.server.quiet = True
+        self.server.build_index = BuildIndex(str(index))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def request(self, path='/', **headers):
+        connection = http.client.HTTPConnection(*self.server.server_address)
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_serves_the_plain_file(self):
+        response, body = self.request()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b'<p>hello</p>')
+        self.assertIsNone(response.getheader('Content-Encoding'))
+        self.assertEqual(response.getheader('ETag'), entity_tag(self.info))
+
+    def test_selects_a_precompressed_variant(self):
+        response, body = self.request(**{'Accept-Encoding': 'br, gzip'})
+        self.assertEqual(body, b'gzipped')
+        self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+        self.assertEqual(response.getheader('ETag'), entity_tag(self.info, 'gzip'))
+
+        # a variant older than the file it was compressed from is never served
+        os.utime(self.root / 'index.html.gz', ns=(1, 1))
+        response, body = self.request(**{'Accept-Encoding': 'gzip'})
+        self.assertEqual(body, b'<p>hello</p>')
+
+    def test_file_shrunk_under_the_cache_closes_the_connection(self):
+        self.server.RequestHandlerClass.func.file_cache = FileCache(revalidate=60)
+        self.request('/index.html')
+        # rewritten in place, the cached descriptor and size still describe the longer file
+        self.page.write_text('<p>', encoding="utf-8")
+
+        connection = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+        connection.request('GET', '/index.html')
+        response = connection.getresponse()
+        with self.assertRaises(http.client.IncompleteRead):
+            response.read()
+        connection.close()
+
+    def test_not_modified_by_entity_tag(self):
+        response, body = self.request(**{'If-None-Match': f'"other", W/{entity_tag(self.info, "gzip")}'})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b'')
+        self.assertEqual(response.getheader('ETag'), entity_tag(self.info, 'gzip'))
+
+        response, _ = self.request(**{'If-None-Match': '*'})
+        self.assertEqual(response.status, 304)
+        # a non-matching tag wins over a date that would have matched
+        response, _ = self.request(**{
+            'If-None-Match': '"other"', 'If-Modified-Since': email.utils.formatdate(2000000000, usegmt=True),
+        })
+        self.assertEqual(response.status, 200)
+
+    def test_not_modified_by_date(self):
+        response, _ = self.request(**{'If-Modified-Since': email.utils.formatdate(self.info['mtime'], usegmt=True)})
+        self.assertEqual(response.status, 304)
+        self.assertIsNone(response.getheader('ETag'))
+
+        response, _ = self.request(**{'If-Modified-Since': email.utils.formatdate(self.info['mtime'] - 1, usegmt=True)})
+        self.assertEqual(response.status, 200)
+        response, _ = self.request(**{'If-Modified-Since': 'not a date'})
+        self.assertEqual(response.status, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import tempfile
+import unittest
+from pathlib import Path
+from sitemap import sitemap_entries, write_sitemap
+
+
+class TestSitemap(unittest.TestCase):
+    def test_entries(self):
+        pages = {
+            'b.md': {'url': '/b.html', 'date': '2024-01-02'},
+            'a.md': {'url': '/'},
+            'draft.md': {'url': '/draft.html', 'draft': True},
+        }
+        self.assertEqual(list(sitemap_entries(pages, ['/tags/x/', '/archive/'])), [
+            ('/', None), ('/b.html', '2024-01-02'), ('/archive/', None), ('/tags/x/', None),
+        ])
+
+    def test_write_sitemap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'sitemap.xml'
+            write_sitemap(path, 'https://example.com/', iter([('/', None), ('/a&b.html', '2024-01-02')]))
+            self.assertEqual(path.read_text(encoding="utf-8"), (
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+                '<url><loc>https://example.com/</loc></url>\n'
+                '<url><loc>https://example.com/a&amp;b.html</loc><lastmod>2024-01-02</lastmod></url>\n'
+                '</urlset>\n'
+            ))
+
+
+if __name__ == '__main__':
+    unittest.main()
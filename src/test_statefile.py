@@ -0,0 +1,45 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from statefile import atomic_write, load_state, write_json
+
+
+class TestStateFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / '.ssg' / 'state.json'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        write_json(self.path, {'version': 2, 'pages': {'b': 1, 'a': 2}}, sort_keys=True)
+        self.assertEqual(self.path.read_text(encoding="utf-8"), '{"pages":{"a":2,"b":1},"version":2}')
+        self.assertEqual(load_state(self.path, 2), {'version': 2, 'pages': {'a': 2, 'b': 1}})
+        self.assertEqual(list(self.path.parent.iterdir()), [self.path])
+
+    def test_unusable_state_loads_as_none(self):
+        self.assertIsNone(load_state(self.path, 1))
+        write_json(self.path, {'version': 1})
+        self.assertIsNone(load_state(self.path, 2))
+        self.path.write_text('{"version": 1', encoding="utf-8")
+        self.assertIsNone(load_state(self.path, 1))
+        self.path.write_text('[1]', encoding="utf-8")
+        self.assertIsNone(load_state(self.path, 1))
+
+    def test_failed_write_keeps_the_old_file(self):
+        write_json(self.path, {'version': 1})
+        with self.assertRaises(TypeError):
+            write_json(self.path, {'version': 2, 'bad': object()})
+        self.assertEqual(json.loads(self.path.read_text(encoding="utf-8")), {'version': 1})
+        self.assertEqual(list(self.path.parent.iterdir()), [self.path])
+
+    def test_atomic_write_binary(self):
+        with atomic_write(self.path.with_name('data.bin'), 'wb') as f:
+            f.write(b'\x00\x01')
+        self.assertEqual(self.path.with_name('data.bin').read_bytes(), b'\x00\x01')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import io
+import unittest
+from template import Template
+
+
+def render(template: Template, values: dict) -> str:
+    fp = io.StringIO()
+    template.write(fp, values)
+    return fp.getvalue()
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template("<title> {{ Title }} </title><article>{{ Content }}</article>")
+        self.assertEqual(
+            render(template, {"Title": "Hello", "Content": "<p>World</p>"}),
+            "<title> Hello </title><article><p>World</p></article>",
+        )
+
+    def test_render_matches_str_replace(self):
+        source = "<head>{{ Title }}</head>\n<body>\n    {{ Content }}\n</body>"
+        template = Template(source)
+        expected = source.replace("{{ Title }}", "T").replace("{{ Content }}", "C")
+        self.assertEqual(render(template, {"Title": "T", "Content": "C"}), expected)
+
+    def test_custom_and_repeated_slots(self):
+        template = Template("{{ Title }}|{{date}}|{{ Title }}")
+        self.assertEqual(render(template, {"Title": "a", "date": "2024-01-01"}), "a|2024-01-01|a")
+
+    def test_missing_slot_renders_empty(self):
+        template = Template("<p>{{ author }}</p>")
+        self.assertEqual(render(template, {}), "<p></p>")
+
+    def test_slot_values_are_not_rescanned(self):
+        template = Template("{{ Title }} {{ Content }}")
+        self.assertEqual(render(template, {"Title": "{{ Content }}", "Content": "x"}), "{{ Content }} x")
+
+    def test_streamed_values(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(render(template, {"Title": "a", "Content": iter(["<p>", "b", "</p>"])}), "<h1>a</h1><p>b</p>")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 from textnode import (
     TextType,
@@ -11,8 +12,14 @@ from textnode import (
     extract_markdown_links,
     extract_markdown_images,
     markdown_to_blocks,
+    iter_markdown_blocks,
     block_to_block_type,
     markdown_to_html_node,
+    BlockCache,
+    block_cache_clear,
+    block_cache_info,
+    coerce_enum,
+    markdown_router,
 )
 
 from htmlnode import LeafNode
@@ -45,6 +52,10 @@ class TestTextNode(unittest.TestCase):
             'TextNode("This is a text node", TextType.TEXT, "https://www.boot.dev")', repr(node)
         )
 
+    def test_uses_slots(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, '__dict__'))
+
     def test_img_text_node_no_url(self):
         with self.assertRaises(ValueError) as context:
             TextNode("Image alt text", TextType.IMAGE, "")
@@ -81,6 +92,39 @@ class TestTextToTextNodes(unittest.TestCase):
             expected_output,
         )
 
+    def test_text_to_textnodes_unbalanced_delimiter(self):
+        with self.assertRaises(Exception) as context:
+            text_to_textnodes("This is **unbalanced bold")
+        self.assertEqual(str(context.exception), 'Odd or missing amount of delimiters')
+
+    def test_text_to_textnodes_code_is_literal(self):
+        self.assertEqual(
+            text_to_textnodes("Use `a * b` and `[x](y)`"),
+            [
+                TextNode("Use ", TextType.TEXT),
+                TextNode("a * b", TextType.CODE),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("[x](y)", TextType.CODE),
+            ]
+        )
+
+    def test_text_to_textnodes_unmatched_brackets(self):
+        self.assertEqual(
+            text_to_textnodes("[note] see ![image](img.png) and [link"),
+            [
+                TextNode("[note] see ", TextType.TEXT),
+                TextNode("image", TextType.IMAGE, "img.png"),
+                TextNode(" and [link", TextType.TEXT),
+            ]
+        )
+
+    def test_text_to_textnodes_many_links(self):
+        link_count = 20000
+        markdown_text = " ".join(f"[link {idx}](/page/{idx})" for idx in range(link_count))
+        nodes = text_to_textnodes(markdown_text)
+        self.assertEqual(len(nodes), link_count * 2 - 1)
+        self.assertEqual(nodes[-1], TextNode(f"link {link_count - 1}", TextType.LINK, f"/page/{link_count - 1}"))
+
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_incorrect_text_type(self):
@@ -110,6 +154,45 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
             LeafNode("This is a text node", "b")
         )
 
+    def test_upper_case_text_type(self):
+        self.assertEqual(text_node_to_html_node(TextNode("code", 'CODE')), LeafNode("code", "code"))
+
+    def test_loose_link_type_requires_url(self):
+        with self.assertRaises(ValueError):
+            TextNode("link", 'link')
+        with self.assertRaises(ValueError):
+            TextNode("image", 6)
+
+    def test_unhashable_text_type(self):
+        with self.assertRaises(TypeError):
+            text_node_to_html_node(TextNode("abc", ['bold']))
+
+
+class TestEnumDispatch(unittest.TestCase):
+    def test_members_are_hashable(self):
+        self.assertEqual(len({TextType.BOLD, TextType.BOLD, TextType.CODE}), 2)
+        self.assertEqual({BlockType.QUOTE: 1}[BlockType.QUOTE], 1)
+
+    def test_loose_equality_still_works(self):
+        self.assertEqual(TextType.BOLD, 'bold')
+        self.assertEqual(TextType.BOLD, 2)
+        self.assertEqual(BlockType.HEADING, 'Heading')
+        self.assertNotEqual(BlockType.HEADING, 3)
+
+    def test_coerce_enum(self):
+        self.assertIs(coerce_enum(TextType, TextType.LINK), TextType.LINK)
+        self.assertIs(coerce_enum(TextType, 'italic'), TextType.ITALIC)
+        self.assertIs(coerce_enum(BlockType, 4), BlockType.QUOTE)
+        self.assertIsNone(coerce_enum(TextType, '1'))
+        self.assertIsNone(coerce_enum(TextType, 7))
+        self.assertIsNone(coerce_enum(BlockType, 1.5))
+
+    def test_markdown_router_coerces(self):
+        expected = markdown_router("> quoted", BlockType.QUOTE)
+        self.assertEqual(markdown_router("> quoted", 'quote'), expected)
+        self.assertEqual(markdown_router("> quoted", 4), expected)
+        self.assertIsNone(markdown_router("> quoted", 'table'))
+
 
 class TestSplitNodesDelimiter(unittest.TestCase):
     def test_expected_output(self):
@@ -209,6 +292,20 @@ class TestSplitNodesImage(unittest.TestCase):
             split_nodes_image([node])
         self.assertEqual(str(context.exception), "URL must be provided for image TextNode")
 
+    def test_image_at_start(self):
+        node = TextNode("![first](/a.png) then text", TextType.TEXT)
+        self.assertEqual(
+            split_nodes_image([node]),
+            [TextNode("first", TextType.IMAGE, "/a.png"), TextNode(" then text", TextType.TEXT)],
+        )
+
+    def test_many_images(self):
+        count = 20000
+        node = TextNode(" ".join(f"![{idx}](/img/{idx}.png)" for idx in range(count)), TextType.TEXT)
+        new_nodes = split_nodes_image([node])
+        self.assertEqual(len(new_nodes), 2 * count - 1)
+        self.assertEqual(new_nodes[-1], TextNode(str(count - 1), TextType.IMAGE, f"/img/{count - 1}.png"))
+
 
 class TestSplitNodesLink(unittest.TestCase):
     def test_single_link_node(self):
@@ -249,6 +346,33 @@ class TestSplitNodesLink(unittest.TestCase):
             split_nodes_link([node])
         self.assertEqual(str(context.exception), "URL must be provided for link TextNode")
 
+    def test_link_next_to_image(self):
+        node = TextNode("![alt](/a.png) and [alt](/a.png)", TextType.TEXT)
+        self.assertEqual(
+            split_nodes_link([node]),
+            [TextNode("![alt](/a.png) and ", TextType.TEXT), TextNode("alt", TextType.LINK, "/a.png")],
+        )
+
+    def test_other_types_pass_through(self):
+        node = TextNode("[link](/a)", TextType.CODE)
+        self.assertEqual(split_nodes_link([node]), [node])
+
+    def test_many_links(self):
+        # far past the recursion limit the old one-call-per-link splitting ran into
+        count = 50000
+        node = TextNode(" ".join(f"[link {idx}](/pages/{idx})" for idx in range(count)) + ".", TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        self.assertEqual(len(new_nodes), 2 * count)
+        self.assertEqual(new_nodes[0], TextNode("link 0", TextType.LINK, "/pages/0"))
+        self.assertEqual(new_nodes[1], TextNode(" ", TextType.TEXT))
+        self.assertEqual(new_nodes[-1], TextNode(".", TextType.TEXT))
+
+    def test_many_links_in_paragraph(self):
+        count = 20000
+        markdown = " ".join(f"[{idx}](/pages/{idx})" for idx in range(count))
+        html = markdown_to_html_node(markdown).to_html()
+        self.assertEqual(html.count('<a href="/pages/'), count)
+
 
 class TestExtractMarkdownImages(unittest.TestCase):
     def test_extract_markdown_img(self):
@@ -339,6 +463,20 @@ class TestMarkdownToBlocks(unittest.TestCase):
             markdown_to_blocks(empty_markdown)
         self.assertEqual(str(context.exception), 'Empty blocks: Invalid Markdown')
 
+    def test_iter_markdown_blocks_matches_markdown_to_blocks(self):
+        block_markdown = ("\n\n# Heading\n\nA paragraph\nover two lines\n\n\n\n"
+                          "* list item\n* another item\n\n```\ncode\n```\n\n")
+        for chunk_size in (1, 2, 3, 7, 1 << 16):
+            self.assertEqual(
+                list(iter_markdown_blocks(io.StringIO(block_markdown), chunk_size)),
+                markdown_to_blocks(block_markdown),
+            )
+
+    def test_iter_markdown_blocks_empty(self):
+        with self.assertRaises(Exception) as context:
+            list(iter_markdown_blocks(io.StringIO("\n\n\n")))
+        self.assertEqual(str(context.exception), 'Empty blocks: Invalid Markdown')
+
 
 class TestBlockToBlockType(unittest.TestCase):
     def test_block_to_block_type(self):
@@ -461,6 +599,30 @@ mus nostra. Velit hendrerit platea auctor est nascetur, et blandit primis suscip
         actual_output = markdown_to_html_node(markdown_doc).to_html()
         self.assertEqual(expected_output, actual_output)
 
+    def test_repeated_blocks_are_memoized(self):
+        block_cache_clear()
+        footer = "Licensed under the **MIT** license"
+        first = markdown_to_html_node(f"# One\n\n{footer}")
+        second = markdown_to_html_node(f"# Two\n\n{footer}")
+
+        self.assertIs(first.children[1], second.children[1])
+        info = block_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 3))
+        self.assertEqual(second.to_html(), '<div><h1>Two</h1><p>Licensed under the <b>MIT</b> license</p></div>')
+
+    def test_block_memo_is_bounded_by_size(self):
+        cache = BlockCache(maxsize=10, max_bytes=20)
+        first = cache.get("first block")
+        cache.get("second block")
+        self.assertEqual(cache.info().currsize, 1)
+        self.assertEqual(cache.info().bytes, len("second block"))
+        self.assertIsNot(cache.get("first block"), first)
+
+        # a block larger than the whole budget is rendered but never kept
+        cache.clear()
+        cache.get("a paragraph longer than twenty characters")
+        self.assertEqual(cache.info(), (0, 1, 10, 0, 0))
+
 
 if __name__ == '__main__':
     unittest.main()
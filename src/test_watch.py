@@ -0,0 +1,51 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from watch import changed_paths, scan_mtimes, wait_for_changes
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / 'content' / 'nested').mkdir(parents=True)
+        self.page = self.root / 'content' / 'nested' / 'index.md'
+        self.page.write_text('# Title', encoding="utf-8")
+        self.template = self.root / 'template.html'
+        self.template.write_text('{{ Content }}', encoding="utf-8")
+        self.roots = [self.root / 'content', self.template]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_mtimes(self):
+        index = scan_mtimes(self.roots)
+        self.assertEqual(set(index), {str(self.page), str(self.template)})
+
+    def test_changed_paths(self):
+        old = scan_mtimes(self.roots)
+        os.utime(self.page, ns=(1, 1))
+        new_page = self.root / 'content' / 'new.md'
+        new_page.write_text('# New', encoding="utf-8")
+        self.template.unlink()
+
+        self.assertEqual(
+            changed_paths(old, scan_mtimes(self.roots)),
+            sorted([str(new_page), str(self.page), str(self.template)]),
+        )
+
+    def test_wait_for_changes(self):
+        index = scan_mtimes(self.roots)
+        timer = threading.Timer(0.05, lambda: self.template.write_text('changed', encoding="utf-8"))
+        timer.start()
+        new_index, changed = wait_for_changes(index, self.roots, interval=0.02, debounce=0.02)
+        timer.join()
+
+        self.assertEqual(changed, [str(self.template)])
+        self.assertEqual(new_index, scan_mtimes(self.roots))
+
+
+if __name__ == '__main__':
+    unittest.main()
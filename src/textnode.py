@@ -1,8 +1,27 @@
+from collections import OrderedDict, namedtuple
 from enum import Enum
 from htmlnode import HTMLNode, ParentNode, LeafNode
+from typing import Callable, Iterator, TextIO
 import re
 
 
+# bump whenever a change to the parser alters the html it produces, so cached renders are invalidated
+PARSER_VERSION = 2
+
+# blocks memoized by block_to_html_node for the lifetime of the process, bounded both in number and in the
+# length of the markdown they came from, a block's tree takes a small multiple of its source in memory
+BLOCK_CACHE_SIZE = 4096
+BLOCK_CACHE_BYTES = 4 * 2**20
+
+INLINE_MARKER_REGEX = re.compile(r"!\[|\[|\*\*|\*|`")
+IMAGE_REGEX = re.compile(r"!\[(.*?)]\((.*?)\)")
+LINK_REGEX = re.compile(r"(?<!!)\[(.*?)]\((.*?)\)")
+BLOCK_SEPARATOR_REGEX = re.compile(r"\n{2,}")
+HEADING_REGEX = re.compile(r"^(#{1,6}) (?!#).*$")
+CODE_BLOCK_REGEX = re.compile(r"`{3}[\s\S]+?`{3}")
+ORDERED_LIST_ITEM_REGEX = re.compile(r"\d\. ")
+
+
 class TextType(Enum):
     TEXT = 1
     BOLD = 2
@@ -12,6 +31,8 @@ class TextType(Enum):
     IMAGE = 6
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, TextType):
             return self.value == other.value
         if isinstance(other, int):
@@ -20,6 +41,9 @@ class TextType(Enum):
             return self.name.lower() == other.lower()
         return super().__eq__(other)
 
+    # defining __eq__ drops the inherited hash, members are hashed by name so they work as dict keys again
+    __hash__ = Enum.__hash__
+
 
 class BlockType(Enum):
     PARAGRAPH = 1
@@ -30,6 +54,8 @@ class BlockType(Enum):
     ORDERED_LIST = 6
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, BlockType):
             return self.value == other.value
         if isinstance(other, int):
@@ -38,14 +64,32 @@ class BlockType(Enum):
             return self.name.lower() == other.lower()
         return super().__eq__(other)
 
+    # defining __eq__ drops the inherited hash, members are hashed by name so they work as dict keys again
+    __hash__ = Enum.__hash__
+
+
+def coerce_enum(enum_type: type[Enum], value) -> Enum | None:
+    # ints and names are accepted the same way the loose __eq__ compares them
+    if isinstance(value, enum_type):
+        return value
+    if isinstance(value, int):
+        return enum_type._value2member_map_.get(value)
+    if isinstance(value, str):
+        return enum_type.__members__.get(value.upper())
+    return None
+
 
 class TextNode:
+    __slots__ = ('text', 'text_type', 'url')
+
     def __init__(self, text: str, text_type: TextType, url: str = None):
 
-        if text_type == TextType.LINK and (url is None or url == ""):
-            raise ValueError("URL must be provided for link TextNode")
-        if text_type == TextType.IMAGE and (url is None or url == ""):
-            raise ValueError("URL must be provided for image TextNode")
+        if (url is None or url == "") and text_type is not TextType.TEXT:
+            text_type_member = coerce_enum(TextType, text_type)
+            if text_type_member is TextType.LINK:
+                raise ValueError("URL must be provided for link TextNode")
+            if text_type_member is TextType.IMAGE:
+                raise ValueError("URL must be provided for image TextNode")
 
         self.text = text
         self.text_type = text_type
@@ -65,34 +109,89 @@ class TextNode:
         return f'TextNode("{self.text}", {self.text_type}, "{self.url}")'
 
 
+TEXT_NODE_CONVERTERS = {
+    TextType.TEXT: lambda node: LeafNode(node.text),
+    TextType.BOLD: lambda node: LeafNode(node.text, "b"),
+    TextType.ITALIC: lambda node: LeafNode(node.text, "i"),
+    TextType.CODE: lambda node: LeafNode(node.text, "code"),
+    TextType.LINK: lambda node: LeafNode(node.text, "a", {'href': node.url}),
+    TextType.IMAGE: lambda node: LeafNode('', "img", {'src': node.url, 'alt': node.text}),
+}
+
+
 def text_node_to_html_node(text_node: TextNode) -> LeafNode:
-    match text_node.text_type:
-        case TextType.TEXT:
-            return LeafNode(text_node.text)
-        case TextType.BOLD:
-            return LeafNode(text_node.text, "b")
-        case TextType.ITALIC:
-            return LeafNode(text_node.text, "i")
-        case TextType.CODE:
-            return LeafNode(text_node.text, "code")
-        case TextType.LINK:
-            return LeafNode(text_node.text, "a", {'href': text_node.url})
-        case TextType.IMAGE:
-            return LeafNode('', "img", {'src': text_node.url, 'alt': text_node.text})
-        case _:
-            raise TypeError(f'Invalid text type')
+    # members hit the table directly, loose ints and names are coerced first
+    convert = TEXT_NODE_CONVERTERS.get(text_node.text_type)
+    if convert is None:
+        convert = TEXT_NODE_CONVERTERS.get(coerce_enum(TextType, text_node.text_type))
+        if convert is None:
+            raise TypeError('Invalid text type')
+    return convert(text_node)
 
 
-def text_to_textnodes(text: str) -> list[TextNode]:
-    node = TextNode(text, TextType.TEXT)
-    temp = split_nodes_delimiter([node], '**', TextType.BOLD)
-    temp1 = split_nodes_delimiter(temp, '*', TextType.ITALIC)
-    temp2 = split_nodes_delimiter(temp1, '`', TextType.CODE)
-    temp3 = split_nodes_link(temp2)
-    temp4 = split_nodes_image(temp3)
+INLINE_DELIMITERS = {'**': TextType.BOLD, '*': TextType.ITALIC, '`': TextType.CODE}
 
-    remove_empty_values = lambda node: node.text != ''
-    return list(filter(remove_empty_values, temp4))
+
+def text_to_textnodes(text: str) -> list[TextNode]:
+    nodes = []
+    found_at = {}
+
+    def find_next(needle: str, start: int) -> int:
+        # remembers the last hit per needle, so lookups that fail again and again never rescan the same text
+        found = found_at.get(needle)
+        if found is None or found != -1 and found < start:
+            found = text.find(needle, start)
+            found_at[needle] = found
+        return found
+
+    def find_link_end(bracket: int) -> tuple[int, int]:
+        # mirrors the [text](url) regexes: the first "](" then the first ")", neither across a newline,
+        # except that the text may not open another bracket, so "[a] ![b](c)" is plain text and an image
+        middle = find_next('](', bracket + 1)
+        if middle == -1:
+            return -1, -1
+        inner_bracket = find_next('[', bracket + 1)
+        if inner_bracket != -1 and inner_bracket < middle:
+            return -1, -1
+        end = find_next(')', middle + 2)
+        newline = find_next('\n', bracket)
+        if end == -1 or newline != -1 and newline < end:
+            return -1, -1
+        return middle, end
+
+    def append(node: TextNode) -> None:
+        if node.text != '':
+            nodes.append(node)
+
+    text_start = 0
+    pos = 0
+    while (marker := INLINE_MARKER_REGEX.search(text, pos)) is not None:
+        start = marker.start()
+        token = marker.group()
+
+        if token in INLINE_DELIMITERS:
+            close = find_next(token, start + len(token))
+            if close == -1:
+                raise Exception('Odd or missing amount of delimiters')
+            append(TextNode(text[text_start:start], TextType.TEXT))
+            append(TextNode(text[start + len(token):close], INLINE_DELIMITERS[token]))
+            pos = text_start = close + len(token)
+            continue
+
+        bracket = start + len(token) - 1
+        middle, end = find_link_end(bracket)
+        if middle == -1:
+            # not a link or image after all, the bracket stays part of the plain text
+            pos = bracket + 1
+            continue
+        text_type = TextType.IMAGE if token == '![' else TextType.LINK
+        span_node = TextNode(text[bracket + 1:middle], text_type, text[middle + 2:end])
+        append(TextNode(text[text_start:start], TextType.TEXT))
+        append(span_node)
+        pos = text_start = end + 1
+
+    append(TextNode(text[text_start:], TextType.TEXT))
+    return nodes
 
 
 def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type: TextType) -> list[TextNode]:
@@ -124,69 +223,46 @@ def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type:
     return list(filter(remove_empty_values, new_nodes))
 
 
-def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
+def split_nodes_matching(old_nodes: list[TextNode], regex: re.Pattern, text_type: TextType) -> list[TextNode]:
     new_nodes = []
-    delimiter_template = "![{}]({})"
-
-    def split_nodes(node: TextNode) -> None:
-        images = extract_markdown_images(node.text)
-        if images:
-            split_text = node.text.split(delimiter_template.format(images[0][0], images[0][1]), maxsplit=1)
-            first_string = split_text.pop(0)
-            first_img = images.pop(0)
-            new_nodes.append(TextNode(first_string, TextType.TEXT))
-            new_nodes.append(TextNode(text=first_img[0], text_type=TextType.IMAGE, url=first_img[1]))
-
-            if split_text[0]:
-                remainder = TextNode(split_text[-1], TextType.TEXT)
-                split_nodes(remainder)
-            return
-        else:
-            new_nodes.append(node)
-
     for old_node in old_nodes:
-        split_nodes(old_node)
+        if old_node.text_type is not TextType.TEXT:
+            new_nodes.append(old_node)
+            continue
+
+        # matches are sliced out by their spans in one pass, so the cost doesn't grow with the square of the links
+        text = old_node.text
+        position = 0
+        for match in regex.finditer(text):
+            if match.start() > position:
+                new_nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
+        if position == 0:
+            new_nodes.append(old_node)
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
     return new_nodes
 
 
-def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
-    new_nodes = []
-    delimiter_template = "[{}]({})"
-
-    def split_nodes(node: TextNode) -> None:
-        links = extract_markdown_links(node.text)
-        if links:
-            split_text = node.text.split(delimiter_template.format(links[0][0], links[0][1]), maxsplit=1)
-            first_string = split_text.pop(0)
-            first_link = links.pop(0)
-            new_nodes.append(TextNode(first_string, TextType.TEXT))
-            new_nodes.append(TextNode(text=first_link[0], text_type=TextType.LINK, url=first_link[1]))
-
-            if split_text[0]:
-                remainder = TextNode(split_text[-1], TextType.TEXT)
-                split_nodes(remainder)
-            return
-        else:
-            new_nodes.append(node)
+def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
+    return split_nodes_matching(old_nodes, IMAGE_REGEX, TextType.IMAGE)
 
-    for old_node in old_nodes:
-        split_nodes(old_node)
-    return new_nodes
+
+def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
+    return split_nodes_matching(old_nodes, LINK_REGEX, TextType.LINK)
 
 
 def extract_markdown_images(text: str) -> list[tuple[str, str]]:
-    img_regex = re.compile(r"!\[(.*?)]\((.*?)\)")
-    return re.findall(img_regex, text)
+    return IMAGE_REGEX.findall(text)
 
 
 def extract_markdown_links(text: str) -> list[tuple[str, str]]:
-    link_regex = re.compile(r"(?<!!)\[(.*?)]\((.*?)\)")
-    return re.findall(link_regex, text)
+    return LINK_REGEX.findall(text)
 
 
 def markdown_to_blocks(markdown: str) -> list[str]:
-    block_regex = re.compile(r"\n{2,}")
-    blocks = re.split(block_regex, markdown)
+    blocks = BLOCK_SEPARATOR_REGEX.split(markdown)
     while '' in blocks:
         blocks.remove('')
     if blocks == []:
@@ -195,140 +271,234 @@ def markdown_to_blocks(markdown: str) -> list[str]:
     return list(map(lambda x: x.strip(), blocks))
 
 
-def block_to_block_type(block: str) -> BlockType:
-    header_regex = re.compile(r"^(#{1,6}) (?!#).*$")
-    code_regex = re.compile(r"`{3}[\s\S]+?`{3}")
-    quote_block_regex = re.compile(r"^>.*(\n>.*)*", re.MULTILINE)
-    unordered_list_regex = re.compile(r"^[*-] .*(\n[*-] .*)*$", re.MULTILINE)
-    ordered_list_regex = re.compile(r"^\d\. .*(\n\d\. .*)*$", re.MULTILINE)
-
-    def contains_pattern(pattern: re.Pattern, block: str) -> bool:
-        search_result = re.search(pattern, block)
-        return bool(search_result)
-
-    def is_valid_pattern(pattern: re.Pattern, block: str) -> bool:
-        check_line = lambda block: contains_pattern(pattern, block)
-        block_list = block.strip().splitlines()
-        if pattern == ordered_list_regex:
-            return all(list(map(check_line, block_list))) and is_valid_ordered_list(block)
-        return all(list(map(check_line, block_list)))
-
-    def is_valid_ordered_list(block: str) -> bool:
-        result = []
-        split_ordered_list = block.strip().splitlines()
-        ordered_list = list(enumerate(split_ordered_list, start=1))
-        valid_list_item = lambda li: li[0] == int(li[1][0])
-        return all(list(map(valid_list_item, ordered_list)))
+def iter_markdown_blocks(fp: TextIO, chunk_size: int = 1 << 16) -> Iterator[str]:
+    buffer = ''
+    found_block = False
+    while chunk := fp.read(chunk_size):
+        # trailing newlines may be the start of a separator that continues in this chunk, so rescan them
+        scan_from = len(buffer)
+        while scan_from and buffer[scan_from - 1] == '\n':
+            scan_from -= 1
+        buffer += chunk
+
+        block_start = 0
+        for separator in BLOCK_SEPARATOR_REGEX.finditer(buffer, scan_from):
+            if separator.end() == len(buffer):
+                break
+            if separator.start() > block_start:
+                found_block = True
+                yield buffer[block_start:separator.start()].strip()
+            block_start = separator.end()
+        buffer = buffer[block_start:]
+
+    # whatever is left once the file is exhausted is the final block, possibly followed by a separator
+    for block in BLOCK_SEPARATOR_REGEX.split(buffer):
+        if block:
+            found_block = True
+            yield block.strip()
+    if not found_block:
+        raise Exception('Empty blocks: Invalid Markdown')
 
-    if contains_pattern(header_regex, block):
+
+def block_to_block_type(block: str) -> BlockType:
+    if HEADING_REGEX.search(block):
         return BlockType.HEADING
-    if contains_pattern(code_regex, block):
+    if CODE_BLOCK_REGEX.search(block):
         return BlockType.CODEBLOCK
-    if contains_pattern(quote_block_regex, block) and is_valid_pattern(quote_block_regex, block):
-        return BlockType.QUOTE
-    if contains_pattern(unordered_list_regex, block) and is_valid_pattern(unordered_list_regex, block):
-        return BlockType.UNORDERED_LIST
-    if contains_pattern(ordered_list_regex, block) and is_valid_pattern(ordered_list_regex, block):
-        return BlockType.ORDERED_LIST
+
+    # quotes and lists need every line to carry the same marker, so the first line picks the candidate
+    # and a single pass over the lines confirms it
+    lines = block.strip().splitlines()
+    if not lines:
+        return BlockType.PARAGRAPH
+    first_line = lines[0]
+    if first_line.startswith('>'):
+        if all(line.startswith('>') for line in lines):
+            return BlockType.QUOTE
+    elif first_line[:2] in ('* ', '- '):
+        if all(line[:2] in ('* ', '- ') for line in lines):
+            return BlockType.UNORDERED_LIST
+    elif ORDERED_LIST_ITEM_REGEX.match(first_line):
+        if all(
+                ORDERED_LIST_ITEM_REGEX.match(line) and int(line[0]) == number
+                for number, line in enumerate(lines, start=1)
+        ):
+            return BlockType.ORDERED_LIST
     return BlockType.PARAGRAPH
 
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
-    def header_block_to_html_node(markdown: str) -> ParentNode:
-        header_count = markdown.count('#')
-        header_text = markdown.lstrip('# ')
-        html_node = ParentNode(
-            f"h{header_count}",
-            [LeafNode(header_text)]
-        )
-        return html_node
-
-    def code_block_to_html_node(markdown: str) -> ParentNode:
-        raw_code = markdown.strip('`\n ')  # removes sorrounding backticks, whitespace and new lines
-        code_leaf_node = LeafNode(raw_code, "code")
-        html_node = ParentNode(
-            "pre",
-            [code_leaf_node]
-        )
-        return html_node
-
-    def quote_block_to_html_node(markdown: str) -> ParentNode:
-        strip_quote_markdown = lambda qt: qt.lstrip('> ')
-        quote_text = markdown.splitlines()
-        stripped_quote_text = '\n'.join(list(map(strip_quote_markdown, quote_text)))
-        text_nodes = text_to_textnodes(stripped_quote_text)
-        quote_leaf_nodes = list(map(text_node_to_html_node, text_nodes))
-        html_node = ParentNode(
-            "blockquote",
-            quote_leaf_nodes
-        )
-        return html_node
-
-    def ordered_list_block_to_html_node(markdown: str) -> ParentNode:
-        remove_number = lambda li: li.split(' ', maxsplit=1)[1]
-        markdown_list = list(map(remove_number, markdown.splitlines()))
-        list_nodes = []
-        for li in markdown_list:
-            leaf_nodes = list(map(text_node_to_html_node, text_to_textnodes(li)))
-            node = ParentNode(
-                "li",
-                leaf_nodes
-            )
-            list_nodes.append(node)
-
-        html_list_node = ParentNode(
-            "ol",
-            list_nodes
-        )
-        return html_list_node
-
-    def unordered_list_block_to_html_node(markdown: str) -> ParentNode:
-        remove_bullet = lambda li: li.split(' ', maxsplit=1)[1]
-        markdown_list = list(map(remove_bullet, markdown.splitlines()))
-        list_nodes = []
-        for li in markdown_list:
-            leaf_nodes = list(map(text_node_to_html_node, text_to_textnodes(li)))
-            node = ParentNode(
-                "li",
-                leaf_nodes
-            )
-            list_nodes.append(node)
-
-        html_list_node = ParentNode(
-            "ul",
-            list_nodes
+def header_block_to_html_node(markdown: str) -> ParentNode:
+    header_count = markdown.count('#')
+    header_text = markdown.lstrip('# ')
+    html_node = ParentNode(
+        f"h{header_count}",
+        [LeafNode(header_text)]
+    )
+    return html_node
+
+
+def code_block_to_html_node(markdown: str) -> ParentNode:
+    raw_code = markdown.strip('`\n ')  # removes sorrounding backticks, whitespace and new lines
+    code_leaf_node = LeafNode(raw_code, "code")
+    html_node = ParentNode(
+        "pre",
+        [code_leaf_node]
+    )
+    return html_node
+
+
+def quote_block_to_html_node(markdown: str) -> ParentNode:
+    strip_quote_markdown = lambda qt: qt.lstrip('> ')
+    quote_text = markdown.splitlines()
+    stripped_quote_text = '\n'.join(list(map(strip_quote_markdown, quote_text)))
+    text_nodes = text_to_textnodes(stripped_quote_text)
+    quote_leaf_nodes = list(map(text_node_to_html_node, text_nodes))
+    html_node = ParentNode(
+        "blockquote",
+        quote_leaf_nodes
+    )
+    return html_node
+
+
+def ordered_list_block_to_html_node(markdown: str) -> ParentNode:
+    remove_number = lambda li: li.split(' ', maxsplit=1)[1]
+    markdown_list = list(map(remove_number, markdown.splitlines()))
+    list_nodes = []
+    for li in markdown_list:
+        leaf_nodes = list(map(text_node_to_html_node, text_to_textnodes(li)))
+        node = ParentNode(
+            "li",
+            leaf_nodes
         )
-        return html_list_node
-
-    def paragraph_block_to_html_node(markdown: str) -> ParentNode:
-        leaf_nodes = list(map(text_node_to_html_node, text_to_textnodes(markdown)))
-        html_node = ParentNode(
-            'p',
+        list_nodes.append(node)
+
+    html_list_node = ParentNode(
+        "ol",
+        list_nodes
+    )
+    return html_list_node
+
+
+def unordered_list_block_to_html_node(markdown: str) -> ParentNode:
+    remove_bullet = lambda li: li.split(' ', maxsplit=1)[1]
+    markdown_list = list(map(remove_bullet, markdown.splitlines()))
+    list_nodes = []
+    for li in markdown_list:
+        leaf_nodes = list(map(text_node_to_html_node, text_to_textnodes(li)))
+        node = ParentNode(
+            "li",
             leaf_nodes
         )
+        list_nodes.append(node)
+
+    html_list_node = ParentNode(
+        "ul",
+        list_nodes
+    )
+    return html_list_node
+
+
+def paragraph_block_to_html_node(markdown: str) -> ParentNode:
+    leaf_nodes = list(map(text_node_to_html_node, text_to_textnodes(markdown)))
+    html_node = ParentNode(
+        'p',
+        leaf_nodes
+    )
+
+    return html_node
+
+
+BLOCK_CONVERTERS = {
+    BlockType.HEADING: header_block_to_html_node,
+    BlockType.CODEBLOCK: code_block_to_html_node,
+    BlockType.QUOTE: quote_block_to_html_node,
+    BlockType.ORDERED_LIST: ordered_list_block_to_html_node,
+    BlockType.UNORDERED_LIST: unordered_list_block_to_html_node,
+    BlockType.PARAGRAPH: paragraph_block_to_html_node,
+}
+
+
+def markdown_router(block: str, type: BlockType) -> ParentNode:
+    convert = BLOCK_CONVERTERS.get(type)
+    if convert is None:
+        convert = BLOCK_CONVERTERS.get(coerce_enum(BlockType, type))
+        if convert is None:
+            return None
+    return convert(block)
+
 
-        return html_node
-
-    def markdown_router(block: str, type: BlockType) -> ParentNode:
-        match type:
-            case BlockType.HEADING:
-                return header_block_to_html_node(block)
-            case BlockType.CODEBLOCK:
-                return code_block_to_html_node(block)
-            case BlockType.QUOTE:
-                return quote_block_to_html_node(block)
-            case BlockType.ORDERED_LIST:
-                return ordered_list_block_to_html_node(block)
-            case BlockType.UNORDERED_LIST:
-                return unordered_list_block_to_html_node(block)
-            case BlockType.PARAGRAPH:
-                return paragraph_block_to_html_node(block)
+BlockCacheInfo = namedtuple('BlockCacheInfo', ['hits', 'misses', 'maxsize', 'currsize', 'bytes'])
 
+
+class BlockCache:
+    def __init__(self, maxsize: int, max_bytes: int):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nodes = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, block: str) -> ParentNode:
+        node = self.nodes.get(block)
+        if node is not None:
+            self.nodes.move_to_end(block)
+            self.hits += 1
+            return node
+        self.misses += 1
+        node = markdown_router(block, block_to_block_type(block))
+        if node is None or len(block) > self.max_bytes:
+            return node
+        self.nodes[block] = node
+        self.bytes += len(block)
+        while len(self.nodes) > self.maxsize or self.bytes > self.max_bytes:
+            evicted, _ = self.nodes.popitem(last=False)
+            self.bytes -= len(evicted)
+        return node
+
+    def info(self) -> BlockCacheInfo:
+        return BlockCacheInfo(self.hits, self.misses, self.maxsize, len(self.nodes), self.bytes)
+
+    def clear(self) -> None:
+        self.nodes.clear()
+        self.bytes = self.hits = self.misses = 0
+
+
+BLOCK_CACHE = BlockCache(BLOCK_CACHE_SIZE, BLOCK_CACHE_BYTES)
+
+
+def block_to_html_node(block: str) -> ParentNode:
+    # the same block always renders to the same tree, so repeated blocks across the build share one node
+    return BLOCK_CACHE.get(block)
+
+
+def block_cache_info() -> BlockCacheInfo:
+    return BLOCK_CACHE.info()
+
+
+def block_cache_clear() -> None:
+    BLOCK_CACHE.clear()
+
+
+def markdown_to_html_node(markdown: str) -> ParentNode:
+    # the children are the memoized block nodes, shared with every other page that has the same block,
+    # so the returned tree must be treated as read-only
     html_nodes = []
     blocks = markdown_to_blocks(markdown)
 
     for block in blocks:
-        block_type = block_to_block_type(block)
-        html_nodes.append(markdown_router(block, block_type))
+        html_nodes.append(block_to_html_node(block))
 
     return ParentNode('div', html_nodes)
+
+
+def iter_markdown_html(fp: TextIO, visit: Callable[[HTMLNode], None] = None) -> Iterator[str]:
+    # streamed documents bypass the block memo so a huge page never pins its blocks in memory
+    yield '<div>'
+    for block in iter_markdown_blocks(fp):
+        node = markdown_router(block, block_to_block_type(block))
+        if visit is not None:
+            # lets the caller index each block's tree before it is dropped
+            visit(node)
+        yield from node.iter_html()
+    yield '</div>'
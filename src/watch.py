@@ -0,0 +1,76 @@
+from pathlib import Path
+from typing import Callable
+import os
+import time
+
+
+def scan_mtimes(roots: list[Path]) -> dict[str, tuple[int, int]]:
+    index = {}
+    stack = [str(root) for root in roots]
+    while stack:
+        path = stack.pop()
+        try:
+            if os.path.isdir(path):
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            stat = entry.stat()
+                            index[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            else:
+                stat = os.stat(path)
+                index[path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            # the file went away between listing and stat, the next scan will report it as removed
+            continue
+    return index
+
+
+def changed_paths(old: dict[str, tuple[int, int]], new: dict[str, tuple[int, int]]) -> list[str]:
+    return sorted(path for path in old.keys() | new.keys() if old.get(path) != new.get(path))
+
+
+def wait_for_changes(
+    index: dict[str, tuple[int, int]],
+    roots: list[Path],
+    interval: float = 0.5,
+    debounce: float = 0.2,
+) -> tuple[dict[str, tuple[int, int]], list[str]]:
+    while True:
+        time.sleep(interval)
+        current = scan_mtimes(roots)
+        if current != index:
+            break
+
+    # editors and sync tools touch several files per save, so wait for the tree to settle before building
+    while True:
+        time.sleep(debounce)
+        settled = scan_mtimes(roots)
+        if settled == current:
+            break
+        current = settled
+    return current, changed_paths(index, current)
+
+
+def watch(build: Callable[[], None], roots: list[Path], interval: float = 0.5, debounce: float = 0.2) -> None:
+    index = scan_mtimes(roots)
+    print(f"Watching {', '.join(str(root) for root in roots)} for changes...")
+    while True:
+        index, changed = wait_for_changes(index, roots, interval, debounce)
+        print(f"Detected {len(changed)} changed files: {', '.join(changed[:5])}{'...' if len(changed) > 5 else ''}")
+        started = time.perf_counter()
+        try:
+            build()
+        except Exception as e:
+            print(f"Rebuild failed: {type(e).__name__}: {e}")
+            continue
+
+        # latency is measured from the newest save we picked up, not from when polling noticed it
+        newest_save = max((index[path][0] for path in changed if path in index), default=None)
+        build_ms = (time.perf_counter() - started) * 1000
+        if newest_save is None:
+            print(f"Rebuilt in {build_ms:.0f} ms")
+        else:
+            latency_ms = (time.time_ns() - newest_save) / 1e6
+            print(f"Rebuilt in {build_ms:.0f} ms, {latency_ms:.0f} ms from save to written files")